@@ -5,6 +5,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from typing import Dict, Any
 from pydantic import BaseModel, EmailStr
+import asyncio
 import logging
 
 from app.core.auth import (
@@ -76,26 +77,25 @@ class LoginRequest(BaseModel):
     email: str
     password: str
 
-def log_audit_action(
+async def log_audit_action(
     db: Session, 
     user_id: int, 
     action: str, 
+    request: Request,
     resource: str = None,
-    ip_address: str = None,
-    user_agent: str = None,
     extra_data: dict = None
 ):
-    """Log audit action for compliance"""
-    audit_log = AuditLog(
+    """Log audit action for compliance, committed before returning from a worker thread so the event loop is not blocked"""
+    await asyncio.to_thread(
+        get_audit_service(db).log_action,
         user_id=user_id,
         action=action,
+        request=request,
         resource=resource,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        extra_data=extra_data
+        resource_type="USER",
+        extra_data=extra_data,
+        synchronous=True
     )
-    db.add(audit_log)
-    db.commit()
 
 @router.post("/register", response_model=UserResponse)
 async def register(
@@ -134,13 +134,12 @@ async def register(
     db.refresh(new_user)
     
     # Log audit action
-    log_audit_action(
+    await log_audit_action(
         db=db,
         user_id=current_user.id,
         action="CREATE_USER",
         resource=f"user:{new_user.id}",
-        ip_address=request.client.host,
-        user_agent=request.headers.get("user-agent"),
+        request=request,
         extra_data={
             "created_user_email": new_user.email,
             "created_user_role": new_user.role
@@ -159,32 +158,16 @@ async def login(
     
     user = authenticate_user(db, login_data.email, login_data.password)
     if not user:
-        # Log failed login attempt with enhanced audit service
-        try:
-            audit_service = get_audit_service(db)
-            audit_service.log_authentication(
-                user_id=None,
-                action="LOGIN_FAILED",
-                request=request,
-                username=login_data.email,
-                success=False,
-                failure_reason="invalid_credentials"
-            )
-        except Exception as audit_error:
-            logger.warning(f"Enhanced audit logging failed for failed login: {str(audit_error)}")
-            # Fallback to basic logging
-            try:
-                log_audit_action(
-                    db=db,
-                    user_id=None,
-                    action="LOGIN_FAILED",
-                    resource=login_data.email,
-                    ip_address=request.client.host,
-                    user_agent=request.headers.get("user-agent"),
-                    extra_data={"reason": "invalid_credentials"}
-                )
-            except Exception as fallback_error:
-                logger.error(f"Both enhanced and basic audit logging failed: {str(fallback_error)}")
+        # Log failed login attempt with enhanced audit service (blocking write, kept off the event loop)
+        await asyncio.to_thread(
+            get_audit_service(db).log_authentication,
+            user_id=None,
+            action="LOGIN_FAILED",
+            request=request,
+            username=login_data.email,
+            success=False,
+            failure_reason="invalid_credentials"
+        )
         
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -207,29 +190,15 @@ async def login(
         subject=user.id, expires_delta=access_token_expires
     )
     
-    # Log successful login with enhanced audit service
-    try:
-        audit_service = get_audit_service(db)
-        audit_service.log_authentication(
-            user_id=user.id,
-            action="LOGIN_SUCCESS",
-            request=request,
-            username=user.email,
-            success=True
-        )
-    except Exception as audit_error:
-        logger.warning(f"Enhanced audit logging failed for successful login: {str(audit_error)}")
-        # Fallback to basic logging
-        try:
-            log_audit_action(
-                db=db,
-                user_id=user.id,
-                action="LOGIN_SUCCESS",
-                ip_address=request.client.host,
-                user_agent=request.headers.get("user-agent")
-            )
-        except Exception as fallback_error:
-            logger.error(f"Both enhanced and basic audit logging failed: {str(fallback_error)}")
+    # Log successful login with enhanced audit service (blocking write, kept off the event loop)
+    await asyncio.to_thread(
+        get_audit_service(db).log_authentication,
+        user_id=user.id,
+        action="LOGIN_SUCCESS",
+        request=request,
+        username=user.email,
+        success=True
+    )
     
     return Token(
         access_token=access_token,
@@ -245,29 +214,15 @@ async def logout(
 ) -> Dict[str, str]:
     """Logout user (log audit action)"""
     
-    # Log logout with enhanced audit service
-    try:
-        audit_service = get_audit_service(db)
-        audit_service.log_authentication(
-            user_id=current_user.id,
-            action="LOGOUT",
-            request=request,
-            username=current_user.email,
-            success=True
-        )
-    except Exception as audit_error:
-        logger.warning(f"Enhanced audit logging failed for logout: {str(audit_error)}")
-        # Fallback to basic logging
-        try:
-            log_audit_action(
-                db=db,
-                user_id=current_user.id,
-                action="LOGOUT",
-                ip_address=request.client.host,
-                user_agent=request.headers.get("user-agent")
-            )
-        except Exception as fallback_error:
-            logger.error(f"Both enhanced and basic audit logging failed: {str(fallback_error)}")
+    # Log logout with enhanced audit service (blocking write, kept off the event loop)
+    await asyncio.to_thread(
+        get_audit_service(db).log_authentication,
+        user_id=current_user.id,
+        action="LOGOUT",
+        request=request,
+        username=current_user.email,
+        success=True
+    )
     
     return {"message": "Successfully logged out"}
 
@@ -389,13 +344,12 @@ async def update_user(
         if old_value != new_value:
             changes[field] = {"old": old_value, "new": new_value}
     
-    log_audit_action(
+    await log_audit_action(
         db=db,
         user_id=current_user.id,
         action="UPDATE_USER",
         resource=f"user:{user.id}",
-        ip_address=request.client.host,
-        user_agent=request.headers.get("user-agent"),
+        request=request,
         extra_data={
             "updated_user_email": user.email,
             "changes": changes
@@ -431,13 +385,12 @@ async def delete_user(
     db.commit()
     
     # Log audit action
-    log_audit_action(
+    await log_audit_action(
         db=db,
         user_id=current_user.id,
         action="DEACTIVATE_USER",
         resource=f"user:{user.id}",
-        ip_address=request.client.host,
-        user_agent=request.headers.get("user-agent"),
+        request=request,
         extra_data={"deactivated_user_email": user.email}
     )
     
@@ -516,12 +469,11 @@ async def update_profile(
         if old_value != new_value:
             changes[field] = {"old": old_value, "new": new_value}
     
-    log_audit_action(
+    await log_audit_action(
         db=db,
         user_id=current_user.id,
         action="UPDATE_PROFILE",
-        ip_address=request.client.host,
-        user_agent=request.headers.get("user-agent"),
+        request=request,
         extra_data={"changes": changes}
     )
     
@@ -549,12 +501,11 @@ async def change_password(
     db.commit()
     
     # Log audit action
-    log_audit_action(
+    await log_audit_action(
         db=db,
         user_id=current_user.id,
         action="CHANGE_PASSWORD",
-        ip_address=request.client.host,
-        user_agent=request.headers.get("user-agent")
+        request=request
     )
     
     return {"message": "Password changed successfully"}
@@ -601,13 +552,12 @@ async def activate_user(
     db.commit()
     
     # Log audit action
-    log_audit_action(
+    await log_audit_action(
         db=db,
         user_id=current_user.id,
         action="ACTIVATE_USER",
         resource=f"user:{user.id}",
-        ip_address=request.client.host,
-        user_agent=request.headers.get("user-agent"),
+        request=request,
         extra_data={"activated_user_email": user.email}
     )
     
@@ -642,13 +592,12 @@ async def deactivate_user(
     db.commit()
     
     # Log audit action
-    log_audit_action(
+    await log_audit_action(
         db=db,
         user_id=current_user.id,
         action="DEACTIVATE_USER",
         resource=f"user:{user.id}",
-        ip_address=request.client.host,
-        user_agent=request.headers.get("user-agent"),
+        request=request,
         extra_data={"deactivated_user_email": user.email}
     )
     
@@ -676,13 +625,12 @@ async def reset_user_password(
     db.commit()
     
     # Log audit action
-    log_audit_action(
+    await log_audit_action(
         db=db,
         user_id=current_user.id,
         action="RESET_USER_PASSWORD",
         resource=f"user:{user.id}",
-        ip_address=request.client.host,
-        user_agent=request.headers.get("user-agent"),
+        request=request,
         extra_data={"reset_user_email": user.email}
     )
     
@@ -768,12 +716,11 @@ async def bulk_activate_users(
         db.commit()
         
         # Log audit action
-        log_audit_action(
+        await log_audit_action(
             db=db,
             user_id=current_user.id,
             action="BULK_ACTIVATE_USERS",
-            ip_address=request.client.host,
-            user_agent=request.headers.get("user-agent"),
+            request=request,
             extra_data={
                 "activated_users": activated_users,
                 "count": len(activated_users)
@@ -818,12 +765,11 @@ async def bulk_deactivate_users(
         db.commit()
         
         # Log audit action
-        log_audit_action(
+        await log_audit_action(
             db=db,
             user_id=current_user.id,
             action="BULK_DEACTIVATE_USERS",
-            ip_address=request.client.host,
-            user_agent=request.headers.get("user-agent"),
+            request=request,
             extra_data={
                 "deactivated_users": deactivated_users,
                 "count": len(deactivated_users)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends, Request, Query
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import or_, and_, func
 from datetime import datetime, date
 import logging
@@ -9,11 +9,12 @@ import logging
 from app.database import get_db
 from app.models import (
     SupervisedEntity, EntityCategory, EntityStatus, EntityDirector, 
-    EntityLBCContact, RiskScore, RiskLevel, User, AuditLog
+    EntityLBCContact, RiskScore, RiskLevel, User
 )
 from app.core.auth import get_current_user
 from app.core.permissions import require_analyst_or_above, require_compliance_officer_or_above, require_admin
 from app.services.elasticsearch_service import elasticsearch_service
+from app.services.audit_service import get_audit_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -170,39 +171,41 @@ async def list_entities(
         # Get total count
         total = query.count()
         
+        # Child counts and the current risk level come from correlated subqueries, so a page is one
+        # query of plain rows instead of entity, director, contact and risk score instances
+        directors_count = db.query(func.count(EntityDirector.id))\
+            .filter(EntityDirector.entity_id == SupervisedEntity.id)\
+            .correlate(SupervisedEntity).scalar_subquery()
+        lbc_contacts_count = db.query(func.count(EntityLBCContact.id))\
+            .filter(EntityLBCContact.entity_id == SupervisedEntity.id)\
+            .correlate(SupervisedEntity).scalar_subquery()
+        current_risk_level = db.query(RiskScore.risk_level)\
+            .filter(RiskScore.entity_id == SupervisedEntity.id, RiskScore.is_current == True)\
+            .order_by(RiskScore.scoring_date.desc()).limit(1)\
+            .correlate(SupervisedEntity).scalar_subquery()
+        
         # Apply pagination and get results
-        entities = query.order_by(SupervisedEntity.denomination.asc()).offset(skip).limit(limit).all()
-        
-        # Enhance with additional data
-        entity_responses = []
-        for entity in entities:
-            # Get current risk score
-            current_risk_score = (
-                db.query(RiskScore)
-                .filter(RiskScore.entity_id == entity.id, RiskScore.is_current == True)
-                .order_by(RiskScore.scoring_date.desc())
-                .first()
-            )
-            
-            entity_data = {
-                "id": entity.id,
-                "denomination": entity.denomination,
-                "commercial_name": entity.commercial_name,
-                "category": entity.category,
-                "registration_number": entity.registration_number,
-                "status": entity.status,
-                "created_at": entity.created_at,
-                "current_risk_level": current_risk_score.risk_level if current_risk_score else None,
-                "directors_count": len(entity.directors),
-                "lbc_contacts_count": len(entity.lbc_contacts)
-            }
-            entity_responses.append(entity_data)
+        entities = query.with_entities(
+            SupervisedEntity.id,
+            SupervisedEntity.denomination,
+            SupervisedEntity.commercial_name,
+            SupervisedEntity.category,
+            SupervisedEntity.registration_number,
+            SupervisedEntity.status,
+            SupervisedEntity.created_at,
+            current_risk_level.label("current_risk_level"),
+            directors_count.label("directors_count"),
+            lbc_contacts_count.label("lbc_contacts_count")
+        ).order_by(SupervisedEntity.denomination.asc()).offset(skip).limit(limit).all()
+        
+        entity_responses = [entity._asdict() for entity in entities]
         
         # Log the action
-        audit_log = AuditLog(
+        get_audit_service(db).log_action(
             user_id=current_user.id,
             action="LIST_ENTITIES",
-            resource=f"entities",
+            resource="entities",
+            resource_type="ENTITY",
             extra_data={
                 "filters": {
                     "category": category.value if category else None,
@@ -213,8 +216,6 @@ async def list_entities(
                 "total": total
             }
         )
-        db.add(audit_log)
-        db.commit()
         
         return {
             "entities": entity_responses,
@@ -263,19 +264,19 @@ async def create_entity(
         db.add(db_entity)
         db.flush()  # Get the ID
         
+        db.commit()
+        
         # Log the action
-        audit_log = AuditLog(
+        get_audit_service(db).log_action(
             user_id=current_user.id,
             action="CREATE_ENTITY",
+            request=http_request,
             resource=f"entity:{db_entity.id}",
-            ip_address=http_request.client.host,
-            user_agent=http_request.headers.get("user-agent"),
+            resource_type="ENTITY",
             extra_data={
-                "entity_data": entity_data.model_dump(exclude_unset=True)
+                "entity_data": entity_data.model_dump(mode="json", exclude_unset=True)
             }
         )
-        db.add(audit_log)
-        db.commit()
         
         # Refresh to get relationships
         db.refresh(db_entity)
@@ -312,9 +313,9 @@ async def get_entity(
         entity = (
             db.query(SupervisedEntity)
             .options(
-                joinedload(SupervisedEntity.directors),
-                joinedload(SupervisedEntity.lbc_contacts),
-                joinedload(SupervisedEntity.risk_scores)
+                selectinload(SupervisedEntity.directors),
+                selectinload(SupervisedEntity.lbc_contacts),
+                selectinload(SupervisedEntity.risk_scores)
             )
             .filter(SupervisedEntity.id == entity_id)
             .first()
@@ -324,13 +325,12 @@ async def get_entity(
             raise HTTPException(status_code=404, detail="Entity not found")
         
         # Log access
-        audit_log = AuditLog(
+        get_audit_service(db).log_action(
             user_id=current_user.id,
             action="VIEW_ENTITY",
-            resource=f"entity:{entity_id}"
+            resource=f"entity:{entity_id}",
+            resource_type="ENTITY"
         )
-        db.add(audit_log)
-        db.commit()
         
         return _build_entity_detail_response(entity, db)
         
@@ -368,20 +368,20 @@ async def update_entity(
         for field, value in update_data.items():
             setattr(entity, field, value)
         
+        db.commit()
+        
         # Log the action
-        audit_log = AuditLog(
+        get_audit_service(db).log_action(
             user_id=current_user.id,
             action="UPDATE_ENTITY",
+            request=http_request,
             resource=f"entity:{entity_id}",
-            ip_address=http_request.client.host,
-            user_agent=http_request.headers.get("user-agent"),
+            resource_type="ENTITY",
             extra_data={
                 "original_data": original_data,
-                "updated_data": update_data
+                "updated_data": entity_data.model_dump(mode="json", exclude_unset=True)
             }
         )
-        db.add(audit_log)
-        db.commit()
         
         # Reindex in Elasticsearch after update
         try:
@@ -419,19 +419,19 @@ async def delete_entity(
         # Soft delete - change status instead of actual deletion
         entity.status = EntityStatus.INACTIVE
         
+        db.commit()
+        
         # Log the action
-        audit_log = AuditLog(
+        get_audit_service(db).log_action(
             user_id=current_user.id,
             action="DELETE_ENTITY",
+            request=http_request,
             resource=f"entity:{entity_id}",
-            ip_address=http_request.client.host,
-            user_agent=http_request.headers.get("user-agent"),
+            resource_type="ENTITY",
             extra_data={
                 "entity_denomination": entity.denomination
             }
         )
-        db.add(audit_log)
-        db.commit()
         
         return {"message": "Entity deactivated successfully"}
         
@@ -625,12 +625,12 @@ def _build_entity_detail_response(entity: SupervisedEntity, db: Session) -> Dict
     if current_risk_score:
         risk_score_data = {
             "id": current_risk_score.id,
-            "score_type": current_risk_score.score_type.value,
+            "score_type": current_risk_score.score_type,
             "score_value": current_risk_score.final_score,
-            "risk_level": current_risk_score.risk_level.value,
+            "risk_level": current_risk_score.risk_level,
             "scoring_date": current_risk_score.scoring_date,
             "domain_scores": current_risk_score.domain_scores,
-            "status": current_risk_score.status.value
+            "status": current_risk_score.status
         }
     
     return {
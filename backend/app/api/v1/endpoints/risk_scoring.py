@@ -8,11 +8,12 @@ import logging
 from app.database import get_db
 from app.models import (
     SupervisedEntity, RiskScore, ScoreType, RiskLevel, ScoreStatus,
-    ScoringDomain, ScoringDomainAnalysis, User, AuditLog
+    ScoringDomain, ScoringDomainAnalysis, User
 )
 from app.core.auth import get_current_user
 from app.core.permissions import require_analyst_or_above, require_compliance_officer_or_above
 from app.services.risk_scoring_engine import RiskScoringEngine, ScoringInput
+from app.services.audit_service import get_audit_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -114,12 +115,12 @@ async def calculate_risk_score(
         )
         
         # Log the action
-        audit_log = AuditLog(
+        get_audit_service(db).log_action(
             user_id=current_user.id,
             action="CALCULATE_RISK_SCORE",
+            request=http_request,
             resource=f"entity:{request.entity_id}",
-            ip_address=http_request.client.host,
-            user_agent=http_request.headers.get("user-agent"),
+            resource_type="RISK_SCORE",
             extra_data={
                 "score_type": request.score_type.value,
                 "calculated_score": result.final_score,
@@ -127,8 +128,6 @@ async def calculate_risk_score(
                 "confidence_level": result.confidence_level
             }
         )
-        db.add(audit_log)
-        db.commit()
         
         # Calculate matrix position if net risk
         matrix_position = None
@@ -298,13 +297,15 @@ async def apply_expert_adjustment(
         else:
             score.risk_level = RiskLevel.LOW
         
+        db.commit()
+        
         # Log the action
-        audit_log = AuditLog(
+        get_audit_service(db).log_action(
             user_id=current_user.id,
             action="EXPERT_ADJUSTMENT",
+            request=http_request,
             resource=f"risk_score:{score_id}",
-            ip_address=http_request.client.host,
-            user_agent=http_request.headers.get("user-agent"),
+            resource_type="RISK_SCORE",
             extra_data={
                 "entity_id": score.entity_id,
                 "original_adjustment": original_adjustment,
@@ -314,8 +315,6 @@ async def apply_expert_adjustment(
                 "new_final_score": new_final_score
             }
         )
-        db.add(audit_log)
-        db.commit()
         
         return {
             "message": "Expert adjustment applied successfully",
@@ -323,7 +322,7 @@ async def apply_expert_adjustment(
             "original_score": score.score_value,
             "adjustment": adjustment_request.adjustment,
             "final_score": score.final_score,
-            "new_risk_level": score.risk_level.value,
+            "new_risk_level": score.risk_level,
             "adjusted_by": current_user.full_name,
             "adjustment_date": score.adjustment_date
         }
@@ -358,20 +357,21 @@ async def approve_risk_score(
         score.approved_by = current_user.id
         score.approval_date = datetime.utcnow()
         
+        db.commit()
+        
         # Log the action
-        audit_log = AuditLog(
+        get_audit_service(db).log_action(
             user_id=current_user.id,
             action="APPROVE_RISK_SCORE",
+            request=http_request,
             resource=f"risk_score:{score_id}",
-            ip_address=http_request.client.host,
+            resource_type="RISK_SCORE",
             extra_data={
                 "entity_id": score.entity_id,
-                "score_type": score.score_type.value,
+                "score_type": score.score_type,
                 "final_score": score.final_score
             }
         )
-        db.add(audit_log)
-        db.commit()
         
         return {
             "message": "Risk score approved successfully",
@@ -437,17 +437,17 @@ async def get_risk_matrix(
             "has_complete_assessment": bool(inherent_score and dmr_score),
             "inherent_risk": {
                 "score": inherent_score.final_score if inherent_score else None,
-                "level": inherent_score.risk_level.value if inherent_score else None,
+                "level": inherent_score.risk_level if inherent_score else None,
                 "date": inherent_score.scoring_date if inherent_score else None
             },
             "dmr_score": {
                 "score": dmr_score.final_score if dmr_score else None,
-                "level": dmr_score.risk_level.value if dmr_score else None,
+                "level": dmr_score.risk_level if dmr_score else None,
                 "date": dmr_score.scoring_date if dmr_score else None
             },
             "net_risk": {
                 "score": net_score.final_score if net_score else None,
-                "level": net_score.risk_level.value if net_score else None,
+                "level": net_score.risk_level if net_score else None,
                 "date": net_score.scoring_date if net_score else None
             }
         }
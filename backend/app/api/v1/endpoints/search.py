@@ -1,36 +1,59 @@
 # backend/app/api/v1/endpoints/search.py - Updated with authentication and audit logging
 
-from fastapi import APIRouter, HTTPException, Depends, Request, UploadFile, File
-from fastapi.responses import StreamingResponse
-from typing import Dict, Any, List, Optional
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Depends, Request, UploadFile, File, BackgroundTasks
+from fastapi.responses import StreamingResponse, ORJSONResponse, Response
+from typing import Dict, Any, Iterable, List, Optional, Tuple, BinaryIO
+from pydantic import BaseModel, ConfigDict, Field
+import csv
+import functools
+import hashlib
 import io
-from sqlalchemy.orm import Session
+import itertools
+from sqlalchemy import func, literal_column, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session, joinedload, undefer
 import httpx
 import asyncio
-import json
+from datetime import datetime, timedelta
 import logging
+import os
+import re
+import threading
+import zlib
+import numpy as np
+import orjson
+import xlsxwriter
+from app.core.cache import async_ttl_cache
+from app.core.circuit_breaker import CircuitBreaker
 from app.core.config import settings
+from app.core.csv_export import CSV_ROWS_PER_CHUNK, iter_csv_chunks
+from app.core.http_client import get_http_client, upstream_timeout
 from app.database import get_db
 from app.models.search_history import SearchHistory
 from app.models.search_notes import SearchNote
 from app.models.starred_entity import StarredEntity
 from app.models.user import User
-from app.models.audit_log import AuditLog
 from app.core.auth import get_current_user
 from app.core.permissions import require_analyst_or_above, require_compliance_officer_or_above, can_search_entities
 from app.services.moroccan_entities import moroccan_entities_service
-from app.services.fuzzy_matching import fuzzy_matching_service, FuzzyMatchingService
-from app.services.batch_processing import batch_processing_service
-from app.services.audit_service import get_audit_service
+from app.services.fuzzy_matching import fuzzy_matching_service
+from app.services.batch_processing import batch_processing_service, BatchJobResult
+from app.services.audit_service import audit_log_writer
+from app.services.search_history_service import (
+    get_history_cache_version, get_cached_history_page, cache_history_page, invalidate_history_cache,
+    get_cached_analytics, cache_analytics, ANALYTICS_CACHE_TTL_SECONDS, search_history_writer
+)
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)  # orjson-encoded responses for the search endpoints
 
 class SearchRequest(BaseModel):
+    # Immutable once validated: the serialized request keys in-flight search coalescing
+    model_config = ConfigDict(frozen=True)
+    
     query: str
     dataset: str = "default"
-    limit: int = 10
+    limit: int = Field(10, le=200)  # Capped to keep upstream pages and response size bounded
     offset: int = 0
     
     # Official OpenSanctions API parameters (from OpenAPI spec)
@@ -101,48 +124,203 @@ class SearchNotesRequest(BaseModel):
 class StarredEntityNotesRequest(BaseModel):
     notes: str
 
+# Upstream timeouts: 1s connect/pool, 5s write; only the read phase gets the longer budget
+SEARCH_TIMEOUT = upstream_timeout(settings.OPENSANCTIONS_TIMEOUT)
+LOOKUP_TIMEOUT = upstream_timeout(10.0)
+HEALTH_CHECK_TIMEOUT = upstream_timeout(2.0)  # A healthy probe answers in milliseconds
+
+# Trips after repeated OpenSanctions timeouts/5xx so searches fall back immediately during outages
+opensanctions_breaker = CircuitBreaker(
+    "opensanctions",
+    fail_max=settings.OPENSANCTIONS_BREAKER_FAIL_MAX,
+    reset_timeout=settings.OPENSANCTIONS_BREAKER_RESET_SECONDS
+)
+
+BULK_SEARCH_MAX_QUERIES = 50
+
+class BulkSearchRequest(BaseModel):
+    queries: List[SearchRequest]
+
 @router.post("/entities")
 async def search_entities(
     request: SearchRequest, 
     http_request: Request,
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(require_analyst_or_above)
 ) -> Dict[str, Any]:
     """Enhanced search with multi-strategy approach using OpenSanctions fuzzy + fallback"""
     """Search for entities using OpenSanctions API with better error handling"""
     
+    response_data, upstream_count = await run_entity_search(request)
+    # History and audit writes happen after the response has been sent
+    background_tasks.add_task(record_entity_search, http_request, current_user, request, response_data, upstream_count)
+    # Encode the decoded upstream payload once with orjson, skipping FastAPI's response validation pass
+    return ORJSONResponse(response_data)
+
+@router.post("/entities/bulk")
+async def bulk_search_entities(
+    bulk_request: BulkSearchRequest,
+    http_request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(require_analyst_or_above)
+) -> Dict[str, Any]:
+    """Run several entity searches concurrently; results are returned in input order"""
+    
+    if len(bulk_request.queries) > BULK_SEARCH_MAX_QUERIES:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_SEARCH_MAX_QUERIES} queries per bulk search")
+    
+    outcomes = await asyncio.gather(
+        *(run_entity_search(search_request) for search_request in bulk_request.queries),
+        return_exceptions=True
+    )
+    
+    results = []
+    for search_request, outcome in zip(bulk_request.queries, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"Bulk search failed for query '{search_request.query}': {str(outcome)}")
+            outcome = (await generate_fallback_response(search_request, {
+                "status": "unexpected_error",
+                "message": str(outcome)
+            }), None)
+        response_data, upstream_count = outcome
+        background_tasks.add_task(record_entity_search, http_request, current_user, search_request, response_data, upstream_count)
+        results.append(response_data)
+    
+    return ORJSONResponse({
+        "results": results,
+        "count": len(results)
+    })
+
+async def record_entity_search(
+    http_request: Request,
+    current_user: User,
+    request: SearchRequest,
+    response_data: Dict[str, Any],
+    upstream_count: Optional[int]
+):
+    """Save a completed entity search to history and, for OpenSanctions hits, the audit log"""
+    
+    # Short-circuited searches never reached OpenSanctions and are not recorded
+    if response_data.get("opensanctions_status") == "circuit_open" or response_data.get("status") == "empty_query":
+        return
+    
+    if upstream_count is None:
+        # Save fallback search to history
+        save_search_to_history(request, response_data["results"], "mock", current_user.id)
+        return
+    
+    # Save search to history (using OpenSanctions results only)
+    save_search_to_history(request, response_data["results"], "opensanctions", current_user.id)
+    
+    # Log basic audit action (fallback to simple logging)
+    try:
+        audit_log_writer.enqueue(
+            user_id=current_user.id,
+            action="SEARCH_ENTITIES",
+            resource=f"query:{request.query}",
+            ip_address=http_request.client.host,
+            user_agent=http_request.headers.get("user-agent"),
+            extra_data={
+                "dataset": request.dataset,
+                "results_count": len(response_data["results"]),
+                "opensanctions_results": upstream_count,
+                "source": "opensanctions_pure"
+            }
+        )
+    except Exception as audit_error:
+        logger.warning(f"Audit logging failed for search: {str(audit_error)}")
+        # Continue with search response even if audit logging fails
+
+# Searches currently talking to OpenSanctions, keyed by the serialized request
+_inflight_searches: Dict[str, asyncio.Future] = {}
+
+async def run_entity_search(request: SearchRequest) -> Tuple[Dict[str, Any], Optional[int]]:
+    """
+    Run one entity search against OpenSanctions, falling back to Moroccan/mock data
+    
+    Has no database side effects. Returns the response body and, for OpenSanctions
+    hits, the number of upstream results before pagination (None for fallbacks).
+    Identical concurrent searches are coalesced: only the first caller goes upstream
+    and the others await its result.
+    """
+    key = request.model_dump_json()
+    inflight = _inflight_searches.get(key)
+    if inflight is not None:
+        try:
+            # Shielded so a cancelled waiter doesn't cancel the shared search
+            return await asyncio.shield(inflight)
+        except asyncio.CancelledError:
+            if not inflight.cancelled():
+                raise
+            # The leading request was cancelled - run the search ourselves
+            return await _run_entity_search(request)
+    
+    future = asyncio.get_running_loop().create_future()
+    _inflight_searches[key] = future
+    try:
+        result = await _run_entity_search(request)
+        future.set_result(result)
+        return result
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # Mark retrieved so unawaited failures aren't logged as never retrieved
+        raise
+    finally:
+        _inflight_searches.pop(key, None)
+
+async def _run_entity_search(request: SearchRequest) -> Tuple[Dict[str, Any], Optional[int]]:
+    """Search OpenSanctions for one request (uncoalesced), falling back to Moroccan/mock data"""
+    
     opensanctions_url = settings.OPENSANCTIONS_BASE_URL
     
-    # First, check if OpenSanctions is healthy
-    opensanctions_status = await check_opensanctions_health()
+    # Build enhanced search query from individual fields
+    search_terms = [request.query] if request.query else []
+    
+    # Add specific field searches to enhance the query
+    if request.first_name:
+        search_terms.append(request.first_name)
+    if request.last_name:
+        search_terms.append(request.last_name)
+    if request.place_of_birth:
+        search_terms.append(request.place_of_birth)
+    if request.passport_number:
+        search_terms.append(request.passport_number)
+    if request.id_number:
+        search_terms.append(request.id_number)
+    if request.role:
+        search_terms.append(request.role)
+    
+    # Combine all search terms
+    enhanced_query = " ".join(search_terms).strip()
+    if not enhanced_query:
+        enhanced_query = request.query or ""
     
-    if opensanctions_status["status"] != "healthy":
-        logger.warning(f"OpenSanctions not healthy: {opensanctions_status['message']}")
-        return generate_fallback_response(request, opensanctions_status)
+    # Nothing to search for (e.g. a keystroke search before anything is typed) - skip the upstream call
+    if not enhanced_query.strip():
+        return {
+            "results": [],
+            "total": {"value": 0},
+            "query": request.query,
+            "dataset": request.dataset,
+            "source": "none",
+            "status": "empty_query",
+            "note": "Empty query - no search performed"
+        }, None
+    
+    # While OpenSanctions keeps failing, serve the fallback without waiting on it
+    if not opensanctions_breaker.allow_request():
+        logger.warning("OpenSanctions circuit open - skipping upstream search")
+        return await generate_fallback_response(request, {
+            "status": "circuit_open",
+            "message": "OpenSanctions API is failing repeatedly - requests paused until it recovers"
+        }), None
     
+    # No health precheck: an unavailable upstream surfaces as a timeout, connection
+    # error or 5xx/404 on the search call itself and falls back to mock results below
     try:
-        # Build enhanced search query from individual fields
-        search_terms = [request.query] if request.query else []
-        
-        # Add specific field searches to enhance the query
-        if request.first_name:
-            search_terms.append(request.first_name)
-        if request.last_name:
-            search_terms.append(request.last_name)
-        if request.place_of_birth:
-            search_terms.append(request.place_of_birth)
-        if request.passport_number:
-            search_terms.append(request.passport_number)
-        if request.id_number:
-            search_terms.append(request.id_number)
-        if request.role:
-            search_terms.append(request.role)
-        
-        # Combine all search terms
-        enhanced_query = " ".join(search_terms).strip()
-        if not enhanced_query:
-            enhanced_query = request.query or ""
-        
         # Prepare search parameters using ONLY official OpenSanctions API parameters
         params = {
             "q": enhanced_query,
@@ -191,283 +369,278 @@ async def search_entities(
         logger.info(f"Searching OpenSanctions API: {opensanctions_url}/search/{request.dataset}")
         logger.debug(f"OpenSanctions API parameters: {params}")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # Try matching endpoint first for better fuzzy matching results
-            response = None
-            try:
-                logger.info(f"Trying OpenSanctions matching endpoint: {opensanctions_url}/match/{request.dataset}")
-                
-                # Build matching query payload
-                match_query = {"name": request.query}
-                
-                # Add additional fields if available
-                if request.schema:
-                    match_query["schema"] = request.schema
-                if request.countries:
-                    match_query["country"] = request.countries[0] if isinstance(request.countries, list) else request.countries
-                
-                match_payload = {
-                    "queries": [match_query],
-                    "limit": request.limit,
-                    "threshold": 0.4,  # Lower threshold for more fuzzy results
-                    "dataset": request.dataset
-                }
-                
-                # Add dataset filters to payload if specified
-                if request.include_dataset:
-                    match_payload["include_dataset"] = request.include_dataset
-                if request.exclude_dataset:
-                    match_payload["exclude_dataset"] = request.exclude_dataset
-                if request.changed_since:
-                    match_payload["changed_since"] = request.changed_since
-                elif request.date_from:
-                    match_payload["changed_since"] = request.date_from
-                
-                match_response = await client.post(
-                    f"{opensanctions_url}/match/{request.dataset}",
-                    json=match_payload
-                )
-                
-                logger.debug(f"OpenSanctions matching API response status: {match_response.status_code}")
-                
-                if match_response.status_code == 200:
-                    match_data = match_response.json()
-                    match_results = match_data.get("results", [])
-                    
-                    # Convert matching results to search format
-                    if match_results and len(match_results) > 0:
-                        # Get the first query's results (we only send one query)
-                        query_matches = match_results[0].get("results", [])
-                        
-                        if len(query_matches) > 0:
-                            # Convert to search response format
-                            search_format_data = {
-                                "results": query_matches,
-                                "total": {"value": len(query_matches)},
-                                "dataset": request.dataset
-                            }
-                            response = type('Response', (), {
-                                'status_code': 200,
-                                'json': lambda: search_format_data
-                            })()
-                            logger.info(f"Matching endpoint returned {len(query_matches)} results")
-                        
-                # If matching fails or returns no results, fallback to search
-                if not response or response.status_code != 200:
-                    logger.info(f"Falling back to search endpoint: {opensanctions_url}/search/{request.dataset}")
-                    response = await client.get(
-                        f"{opensanctions_url}/search/{request.dataset}",
-                        params=params
-                    )
-                    logger.debug(f"OpenSanctions search API response status: {response.status_code}")
-                
-                if response.status_code != 200:
-                    logger.error(f"OpenSanctions API error {response.status_code}: {getattr(response, 'text', 'Unknown error')}")
-                    
-            except httpx.RequestError as e:
-                logger.error(f"OpenSanctions API request error: {str(e)}")
-                raise HTTPException(status_code=503, detail=f"OpenSanctions API unavailable: {str(e)}")
-            except Exception as e:
-                logger.error(f"Unexpected error calling OpenSanctions API: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"Search service error: {str(e)}")
+        client = get_http_client()
+        # Try matching endpoint first for better fuzzy matching results
+        response = None
+        match_search_data = None
+        try:
+            logger.info(f"Trying OpenSanctions matching endpoint: {opensanctions_url}/match/{request.dataset}")
             
-            # If we get few results, try additional search strategies
-            if response.status_code == 200:
-                initial_data = response.json()
-                initial_results = initial_data.get("results", [])
-                
-                # Only enhance results if user requested more than what was returned AND we got fewer than 5 results
-                should_enhance = len(initial_results) < min(5, request.limit) and request.limit > len(initial_results)
+            # Build matching query payload
+            match_query = {"name": request.query}
+            
+            # Add additional fields if available
+            if request.schema:
+                match_query["schema"] = request.schema
+            if request.countries:
+                match_query["country"] = request.countries[0] if isinstance(request.countries, list) else request.countries
+            
+            match_payload = {
+                "queries": [match_query],
+                "limit": request.limit,
+                "threshold": 0.4,  # Lower threshold for more fuzzy results
+                "dataset": request.dataset
+            }
+            
+            # Add dataset filters to payload if specified
+            if request.include_dataset:
+                match_payload["include_dataset"] = request.include_dataset
+            if request.exclude_dataset:
+                match_payload["exclude_dataset"] = request.exclude_dataset
+            if request.changed_since:
+                match_payload["changed_since"] = request.changed_since
+            elif request.date_from:
+                match_payload["changed_since"] = request.date_from
+            
+            match_response = await client.post(
+                f"{opensanctions_url}/match/{request.dataset}",
+                json=match_payload,
+                timeout=SEARCH_TIMEOUT
+            )
+            
+            logger.debug(f"OpenSanctions matching API response status: {match_response.status_code}")
+            
+            if match_response.status_code == 200:
+                match_data = orjson.loads(match_response.content)
+                match_results = match_data.get("results", [])
                 
-                if should_enhance:
-                    # Calculate how many additional results we can add while respecting the limit
-                    max_additional = request.limit - len(initial_results)
-                    
-                    # Generate query variations for better matching
-                    query_variations = fuzzy_matching_service.extract_name_variations(request.query)
-                    additional_results = []
+                # Convert matching results to search format
+                if match_results and len(match_results) > 0:
+                    # Get the first query's results (we only send one query)
+                    query_matches = match_results[0].get("results", [])
                     
-                    for variation in query_variations[:3]:  # Try up to 3 variations
-                        if variation != request.query and len(variation.strip()) > 2 and len(additional_results) < max_additional:
-                            logger.info(f"Trying search variation: {variation}")
-                            var_params = {**params, "q": variation, "limit": max_additional}
-                            var_response = await client.get(
-                                f"{opensanctions_url}/search/{request.dataset}",
-                                params=var_params
-                            )
-                            
-                            if var_response.status_code == 200:
-                                var_data = var_response.json()
-                                var_results = var_data.get("results", [])
-                                # Add results that aren't already in initial_results
-                                for result in var_results:
-                                    if len(additional_results) >= max_additional:
-                                        break
-                                    if not any(r.get("id") == result.get("id") for r in initial_results):
-                                        additional_results.append({
-                                            **result,
-                                            "search_variation": variation,
-                                            "is_variation_result": True
-                                        })
+                    if len(query_matches) > 0:
+                        # Convert to search response format
+                        match_search_data = {
+                            "results": query_matches,
+                            "total": {"value": len(query_matches)},
+                            "dataset": request.dataset
+                        }
+                        response = type('Response', (), {'status_code': 200})()
+                        logger.info(f"Matching endpoint returned {len(query_matches)} results")
                     
-                    # Combine results, respecting the user's limit
-                    if additional_results:
-                        additional_count = min(len(additional_results), max_additional)
-                        initial_results.extend(additional_results[:additional_count])
-                        initial_data["results"] = initial_results
-                        initial_data["total"]["value"] = len(initial_results)
-                        logger.info(f"Enhanced search found {additional_count} additional results (respecting limit={request.limit})")
-                else:
-                    logger.info(f"Skipping enhancement: {len(initial_results)} results already meet user's limit of {request.limit}")
+            # If matching fails or returns no results, fallback to search
+            if not response or response.status_code != 200:
+                logger.info(f"Falling back to search endpoint: {opensanctions_url}/search/{request.dataset}")
+                response = await client.get(
+                    f"{opensanctions_url}/search/{request.dataset}",
+                    params=params,
+                    timeout=SEARCH_TIMEOUT
+                )
+                logger.debug(f"OpenSanctions search API response status: {response.status_code}")
+            
+            if response.status_code != 200:
+                logger.error(f"OpenSanctions API error {response.status_code}: {getattr(response, 'text', 'Unknown error')}")
                 
-                # Continue with the enhanced results
-                response._content = json.dumps(initial_data).encode()
+        except (httpx.TimeoutException, httpx.ConnectError):
+            # Handled by the fallback branches of the outer try
+            raise
+        except httpx.TransportError as e:
+            # Connection resets, protocol errors, etc. count towards opening the circuit
+            logger.error(f"OpenSanctions API transport error: {str(e)}")
+            opensanctions_breaker.record_failure()
+            raise HTTPException(status_code=503, detail=f"OpenSanctions API unavailable: {str(e)}")
+        except httpx.RequestError as e:
+            logger.error(f"OpenSanctions API request error: {str(e)}")
+            raise HTTPException(status_code=503, detail=f"OpenSanctions API unavailable: {str(e)}")
+        except Exception as e:
+            logger.error(f"Unexpected error calling OpenSanctions API: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Search service error: {str(e)}")
+        
+        # If we get few results, try additional search strategies
+        if response.status_code == 200:
+            initial_data = match_search_data if match_search_data is not None else orjson.loads(response.content)
+            initial_results = initial_data.get("results", [])
             
-            logger.info(f"OpenSanctions response status: {response.status_code}")
+            # Only enhance results if user requested more than what was returned AND we got fewer than 5 results
+            should_enhance = len(initial_results) < min(5, request.limit) and request.limit > len(initial_results)
             
-            if response.status_code == 200:
-                opensanctions_data = response.json()
+            if should_enhance:
+                # Calculate how many additional results we can add while respecting the limit
+                max_additional = request.limit - len(initial_results)
                 
-                # Return pure OpenSanctions results without any backend processing
-                opensanctions_results = opensanctions_data.get("results", [])
+                # Generate query variations for better matching
+                query_variations = fuzzy_matching_service.extract_name_variations(request.query)
+                additional_results = []
                 
-                # Apply only OpenSanctions native pagination
-                start_idx = request.offset
-                end_idx = start_idx + request.limit if request.limit else len(opensanctions_results)
-                paginated_results = opensanctions_results[start_idx:end_idx]
-                
-                response_data = {
-                    "results": paginated_results,
-                    "total": opensanctions_data.get("total", {"value": len(opensanctions_results)}),
-                    "query": request.query,
-                    "dataset": request.dataset,
-                    "source": "opensanctions",
-                    "api_url": f"{opensanctions_url}/search/{request.dataset}",
-                    "status": "success",
-                    "note": "Pure OpenSanctions API results without backend processing"
-                }
-                
-                # Save search to history (using OpenSanctions results only)
-                await save_search_to_history(db, request, paginated_results, "opensanctions", current_user.id)
-                
-                # Log basic audit action (fallback to simple logging)
-                try:
-                    audit_log = AuditLog(
-                        user_id=current_user.id,
-                        action="SEARCH_ENTITIES",
-                        resource=f"query:{request.query}",
-                        ip_address=http_request.client.host,
-                        user_agent=http_request.headers.get("user-agent"),
-                        extra_data={
-                            "dataset": request.dataset,
-                            "results_count": len(paginated_results),
-                            "opensanctions_results": len(opensanctions_results),
-                            "source": "opensanctions_pure"
-                        }
-                    )
-                    db.add(audit_log)
-                    db.commit()
-                except Exception as audit_error:
-                    logger.warning(f"Audit logging failed for search: {str(audit_error)}")
-                    # Continue with search response even if audit logging fails
-                
-                return response_data
-                
-            elif response.status_code == 500:
-                # Handle 500 errors specifically
-                logger.warning("OpenSanctions returned 500 - likely still initializing")
-                error_detail = "OpenSanctions API is still initializing (HTTP 500)"
-                
-                try:
-                    error_response = response.json()
-                    error_detail = error_response.get("detail", error_detail)
-                except:
-                    pass
-                
-                fallback_response = generate_fallback_response(request, {
-                    "status": "initializing", 
-                    "message": error_detail,
-                    "http_status": 500
-                })
-                # Save fallback search to history
-                mock_results = fallback_response["results"]
-                await save_search_to_history(db, request, mock_results, "mock", current_user.id)
-                return fallback_response
-                
-            elif response.status_code == 404:
-                logger.warning(f"Dataset '{request.dataset}' not found")
-                fallback_response = generate_fallback_response(request, {
-                    "status": "dataset_not_found",
-                    "message": f"Dataset '{request.dataset}' not available",
-                    "http_status": 404
-                })
-                mock_results = fallback_response["results"]
-                await save_search_to_history(db, request, mock_results, "mock", current_user.id)
-                return fallback_response
+                for variation in query_variations[:3]:  # Try up to 3 variations
+                    if variation != request.query and len(variation.strip()) > 2 and len(additional_results) < max_additional:
+                        logger.info(f"Trying search variation: {variation}")
+                        var_params = {**params, "q": variation, "limit": max_additional}
+                        var_response = await client.get(
+                            f"{opensanctions_url}/search/{request.dataset}",
+                            params=var_params,
+                            timeout=SEARCH_TIMEOUT
+                        )
+                        
+                        if var_response.status_code == 200:
+                            var_data = orjson.loads(var_response.content)
+                            var_results = var_data.get("results", [])
+                            # Add results that aren't already in initial_results
+                            for result in var_results:
+                                if len(additional_results) >= max_additional:
+                                    break
+                                if not any(r.get("id") == result.get("id") for r in initial_results):
+                                    additional_results.append({
+                                        **result,
+                                        "search_variation": variation,
+                                        "is_variation_result": True
+                                    })
                 
+                # Combine results, respecting the user's limit
+                if additional_results:
+                    additional_count = min(len(additional_results), max_additional)
+                    initial_results.extend(additional_results[:additional_count])
+                    initial_data["results"] = initial_results
+                    initial_data["total"]["value"] = len(initial_results)
+                    logger.info(f"Enhanced search found {additional_count} additional results (respecting limit={request.limit})")
             else:
-                logger.warning(f"OpenSanctions API returned unexpected status {response.status_code}")
-                fallback_response = generate_fallback_response(request, {
-                    "status": "api_error",
-                    "message": f"API returned status {response.status_code}",
-                    "http_status": response.status_code
-                })
-                mock_results = fallback_response["results"]
-                await save_search_to_history(db, request, mock_results, "mock", current_user.id)
-                return fallback_response
-                
+                logger.info(f"Skipping enhancement: {len(initial_results)} results already meet user's limit of {request.limit}")
+        
+        logger.info(f"OpenSanctions response status: {response.status_code}")
+        if response.status_code >= 500:
+            opensanctions_breaker.record_failure()
+        else:
+            opensanctions_breaker.record_success()
+        
+        if response.status_code == 200:
+            # Continue with the (possibly enhanced) decoded results
+            opensanctions_data = initial_data
+            
+            # Return pure OpenSanctions results without any backend processing
+            opensanctions_results = opensanctions_data.get("results", [])
+            
+            # Apply only OpenSanctions native pagination
+            start_idx = request.offset
+            end_idx = start_idx + request.limit if request.limit else len(opensanctions_results)
+            paginated_results = opensanctions_results[start_idx:end_idx]
+            
+            response_data = {
+                "results": paginated_results,
+                "total": opensanctions_data.get("total", {"value": len(opensanctions_results)}),
+                "query": request.query,
+                "dataset": request.dataset,
+                "source": "opensanctions",
+                "api_url": f"{opensanctions_url}/search/{request.dataset}",
+                "status": "success",
+                "note": "Pure OpenSanctions API results without backend processing"
+            }
+            
+            return response_data, len(opensanctions_results)
+            
+        elif response.status_code == 500:
+            # Handle 500 errors specifically
+            logger.warning("OpenSanctions returned 500 - likely still initializing")
+            error_detail = "OpenSanctions API is still initializing (HTTP 500)"
+            
+            try:
+                error_response = response.json()
+                error_detail = error_response.get("detail", error_detail)
+            except:
+                pass
+            
+            fallback_response = await generate_fallback_response(request, {
+                "status": "initializing", 
+                "message": error_detail,
+                "http_status": 500
+            })
+            return fallback_response, None
+            
+        elif response.status_code == 404:
+            logger.warning(f"Dataset '{request.dataset}' not found")
+            fallback_response = await generate_fallback_response(request, {
+                "status": "dataset_not_found",
+                "message": f"Dataset '{request.dataset}' not available",
+                "http_status": 404
+            })
+            return fallback_response, None
+            
+        else:
+            logger.warning(f"OpenSanctions API returned unexpected status {response.status_code}")
+            fallback_response = await generate_fallback_response(request, {
+                "status": "api_error",
+                "message": f"API returned status {response.status_code}",
+                "http_status": response.status_code
+            })
+            return fallback_response, None
+            
     except httpx.TimeoutException:
         logger.error("OpenSanctions API timeout")
-        fallback_response = generate_fallback_response(request, {
+        opensanctions_breaker.record_failure()
+        fallback_response = await generate_fallback_response(request, {
             "status": "timeout",
             "message": "OpenSanctions API timeout - service may be overloaded"
         })
-        mock_results = fallback_response["results"]
-        await save_search_to_history(db, request, mock_results, "mock", current_user.id)
-        return fallback_response
+        return fallback_response, None
         
     except httpx.ConnectError:
         logger.error("Cannot connect to OpenSanctions API")
-        fallback_response = generate_fallback_response(request, {
+        opensanctions_breaker.record_failure()
+        fallback_response = await generate_fallback_response(request, {
             "status": "connection_error",
             "message": "Cannot connect to OpenSanctions API - service may be down"
         })
-        mock_results = fallback_response["results"]
-        await save_search_to_history(db, request, mock_results, "mock", current_user.id)
-        return fallback_response
+        return fallback_response, None
+        
+    except httpx.TransportError as e:
+        # e.g. a search variation request hit a connection reset
+        logger.error(f"OpenSanctions API transport error: {str(e)}")
+        opensanctions_breaker.record_failure()
+        fallback_response = await generate_fallback_response(request, {
+            "status": "connection_error",
+            "message": f"OpenSanctions API connection failed: {str(e)}"
+        })
+        return fallback_response, None
         
     except Exception as e:
         logger.error(f"Unexpected error calling OpenSanctions API: {str(e)}")
-        fallback_response = generate_fallback_response(request, {
+        fallback_response = await generate_fallback_response(request, {
             "status": "unexpected_error",
             "message": str(e)
         })
-        mock_results = fallback_response["results"]
-        await save_search_to_history(db, request, mock_results, "mock", current_user.id)
-        return fallback_response
+        return fallback_response, None
+
+UPSTREAM_CACHE_TTL_SECONDS = 15
+HEALTHY_CACHE_TTL_SECONDS = 5
+UNHEALTHY_CACHE_TTL_SECONDS = 1
+
+def health_cache_ttl(result: Dict[str, Any]) -> float:
+    """Keep healthy results a little longer and failures only briefly so recovery is seen quickly"""
+    return HEALTHY_CACHE_TTL_SECONDS if result.get("status") == "healthy" else UNHEALTHY_CACHE_TTL_SECONDS
 
+@async_ttl_cache(ttl=HEALTHY_CACHE_TTL_SECONDS, ttl_for=health_cache_ttl)
 async def check_opensanctions_health() -> Dict[str, Any]:
-    """Check if OpenSanctions API is healthy"""
+    """Check if OpenSanctions API is healthy (cached briefly so bursts share one probe)"""
     
     try:
         opensanctions_url = settings.OPENSANCTIONS_BASE_URL
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # Try the health endpoint first
-            health_response = await client.get(f"{opensanctions_url}/healthz")
+        client = get_http_client()
+        # Try the health endpoint first
+        health_response = await client.get(f"{opensanctions_url}/healthz", timeout=HEALTH_CHECK_TIMEOUT)
+        
+        if health_response.status_code == 200:
+            return {
+                "status": "healthy",
+                "message": "OpenSanctions API is ready"
+            }
+        else:
+            return {
+                "status": "unhealthy",
+                "message": f"Health check returned {health_response.status_code}",
+                "http_status": health_response.status_code
+            }
             
-            if health_response.status_code == 200:
-                return {
-                    "status": "healthy",
-                    "message": "OpenSanctions API is ready"
-                }
-            else:
-                return {
-                    "status": "unhealthy",
-                    "message": f"Health check returned {health_response.status_code}",
-                    "http_status": health_response.status_code
-                }
-                
     except httpx.TimeoutException:
         return {
             "status": "timeout",
@@ -484,8 +657,8 @@ async def check_opensanctions_health() -> Dict[str, Any]:
             "message": f"Health check failed: {str(e)}"
         }
 
-async def save_search_to_history(db: Session, request: SearchRequest, results: List[Dict], source: str, user_id: int):
-    """Save search results to history database"""
+def save_search_to_history(request: SearchRequest, results: List[Dict], source: str, user_id: int):
+    """Queue search results for the history database (written in batches by search_history_writer)"""
     try:
         # Calculate risk metrics
         relevance_scores = [r.get("score", 0) * 100 if r.get("score") else 0 for r in results]
@@ -497,8 +670,8 @@ async def save_search_to_history(db: Session, request: SearchRequest, results: L
         # Determine search type
         search_type = determine_search_type(request.query)
         
-        # Create history entry
-        history_entry = SearchHistory(
+        # Queue history entry
+        search_history_writer.enqueue(
             query=request.query,
             search_type=search_type,
             results_count=len(results),
@@ -509,33 +682,37 @@ async def save_search_to_history(db: Session, request: SearchRequest, results: L
             user_id=user_id
         )
         
-        db.add(history_entry)
-        db.commit()
-        db.refresh(history_entry)
-        
-        logger.info(f"Saved search to history: {history_entry.id}")
-        
     except Exception as e:
-        logger.error(f"Failed to save search to history: {e}")
-        db.rollback()
+        logger.error(f"Failed to queue search for history: {e}")
+
+# Company indicators (with their common word forms, e.g. Corporation, Companies, Banking), matched
+# as whole words in a single pass over the query so names like "Vincent" are not taken for "inc"
+COMPANY_INDICATORS_RE = re.compile(
+    r"\b(?:ltd|inc(?:orporated)?|corp\w*|llc|compan(?:y|ies)|bank\w*|groups?|holdings?)\b", re.IGNORECASE
+)
 
 def determine_search_type(query: str) -> str:
     """Determine if search is for Person or Company based on query"""
-    company_indicators = ["ltd", "inc", "corp", "llc", "company", "bank", "group", "holdings"]
-    query_lower = query.lower()
-    
-    if any(indicator in query_lower for indicator in company_indicators):
+    if COMPANY_INDICATORS_RE.search(query):
         return "Company"
     return "Person"
 
-def generate_fallback_response(request: SearchRequest, error_info: Dict[str, Any]) -> Dict[str, Any]:
+# Above this many entities, CPU-bound scoring runs in a worker thread so it can't stall the event loop
+CPU_OFFLOAD_THRESHOLD = 200
+
+async def generate_fallback_response(request: SearchRequest, error_info: Dict[str, Any]) -> Dict[str, Any]:
     """Generate fallback response with Moroccan entities and mock data"""
     
     # Always try to get Moroccan entities first
-    moroccan_matches = moroccan_entities_service.search_entities(
-        request.query, 
-        schema_filter=request.schema
-    )
+    if len(moroccan_entities_service.entities) > CPU_OFFLOAD_THRESHOLD:
+        moroccan_matches = await asyncio.to_thread(
+            moroccan_entities_service.search_entities, request.query, schema_filter=request.schema
+        )
+    else:
+        moroccan_matches = moroccan_entities_service.search_entities(
+            request.query, 
+            schema_filter=request.schema
+        )
     
     # If no Moroccan matches, use mock data
     if not moroccan_matches:
@@ -574,57 +751,128 @@ def generate_fallback_response(request: SearchRequest, error_info: Dict[str, Any
         "troubleshooting": get_troubleshooting_tips(error_info["status"])
     }
 
+TROUBLESHOOTING_TIPS = {
+    "initializing": (
+        "OpenSanctions is still starting up (can take 10-15 minutes)",
+        "Check logs: docker-compose logs opensanctions-api",
+        "Wait for data indexing to complete"
+    ),
+    "connection_error": (
+        "Check if OpenSanctions container is running: docker-compose ps",
+        "Verify network connectivity between containers",
+        "Try restarting: docker-compose restart opensanctions-api"
+    ),
+    "timeout": (
+        "OpenSanctions may be overloaded or slow",
+        "Check system resources (CPU/Memory)",
+        "Try restarting the service"
+    ),
+    "unhealthy": (
+        "OpenSanctions health check failed",
+        "Check Elasticsearch status: curl http://localhost:9200/_cluster/health",
+        "Check OpenSanctions logs for errors"
+    ),
+    "dataset_not_found": (
+        "The requested dataset may not be available",
+        "Try using 'default' dataset",
+        "Check available datasets: curl http://localhost:9000/datasets"
+    )
+}
+
+DEFAULT_TROUBLESHOOTING_TIPS = ("Check OpenSanctions logs and documentation",)
+
 def get_troubleshooting_tips(status: str) -> List[str]:
     """Get troubleshooting tips based on error status"""
-    
-    tips = {
-        "initializing": [
-            "OpenSanctions is still starting up (can take 10-15 minutes)",
-            "Check logs: docker-compose logs opensanctions-api",
-            "Wait for data indexing to complete"
-        ],
-        "connection_error": [
-            "Check if OpenSanctions container is running: docker-compose ps",
-            "Verify network connectivity between containers",
-            "Try restarting: docker-compose restart opensanctions-api"
-        ],
-        "timeout": [
-            "OpenSanctions may be overloaded or slow",
-            "Check system resources (CPU/Memory)",
-            "Try restarting the service"
-        ],
-        "unhealthy": [
-            "OpenSanctions health check failed",
-            "Check Elasticsearch status: curl http://localhost:9200/_cluster/health",
-            "Check OpenSanctions logs for errors"
-        ],
-        "dataset_not_found": [
-            "The requested dataset may not be available",
-            "Try using 'default' dataset",
-            "Check available datasets: curl http://localhost:9000/datasets"
-        ]
-    }
-    
-    return tips.get(status, ["Check OpenSanctions logs and documentation"])
+    return list(TROUBLESHOOTING_TIPS.get(status, DEFAULT_TROUBLESHOOTING_TIPS))
+
+DATASETS_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+ANALYTICS_CACHE_CONTROL = f"private, max-age={ANALYTICS_CACHE_TTL_SECONDS}"
+
+def not_modified_response(http_request: Request, etag: str, cache_control: str) -> Optional[Response]:
+    """304 when the client already has the version tagged etag, else None"""
+    if http_request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    return None
+
+def conditional_json_response(
+    http_request: Request, body: Dict[str, Any], cache_control: str, etag: Optional[str] = None
+) -> Response:
+    """Serialize body once, tag it with an ETag (a content hash unless one is given) and answer 304 when the client already has that version"""
+    content = orjson.dumps(body, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    if etag is None:
+        etag = f'"{hashlib.blake2b(content, digest_size=8).hexdigest()}"'
+    not_modified = not_modified_response(http_request, etag, cache_control)
+    if not_modified is not None:
+        return not_modified
+    return Response(content=content, media_type="application/json", headers={"ETag": etag, "Cache-Control": cache_control})
+
+# Column projections for the list endpoints: rows come back as tuples instead of ORM instances
+HISTORY_LIST_COLUMNS = (
+    SearchHistory.id,
+    SearchHistory.query,
+    SearchHistory.search_type,
+    SearchHistory.results_count,
+    SearchHistory.risk_level,
+    SearchHistory.relevance_score,
+    SearchHistory.created_at,
+    SearchHistory.data_source,
+    SearchHistory.execution_time_ms
+)
+NOTE_COLUMNS = (
+    SearchNote.id,
+    SearchNote.entity_id,
+    SearchNote.entity_name,
+    SearchNote.note_text,
+    SearchNote.risk_assessment,
+    SearchNote.action_taken,
+    SearchNote.created_at,
+    SearchNote.updated_at
+)
 
 @router.get("/history")
 async def get_search_history(
+    http_request: Request,
     limit: int = 50, 
     offset: int = 0, 
+    before_created_at: Optional[datetime] = None,
+    before_id: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
-    """Get search history with pagination"""
+    """
+    Get search history with pagination
+    
+    Pass back next_cursor (before_created_at + before_id) to fetch the following page;
+    offset paging is kept for older clients but gets slower the deeper the page.
+    """
     
     try:
-        # Filter by current user only
-        total = db.query(SearchHistory).filter(SearchHistory.user_id == current_user.id).count()
-        searches = db.query(SearchHistory)\
-            .filter(SearchHistory.user_id == current_user.id)\
-            .order_by(SearchHistory.created_at.desc())\
-            .offset(offset)\
-            .limit(limit)\
-            .all()
+        use_cursor = before_created_at is not None and before_id is not None
+        
+        # First and offset pages are served from Redis until the user's history changes
+        if not use_cursor:
+            cache_version = await get_history_cache_version(current_user.id)
+            cached_page = await get_cached_history_page(current_user.id, cache_version, limit, offset)
+            if cached_page is not None:
+                return conditional_json_response(http_request, cached_page, cache_control="private, no-cache")
+        
+        def query_page():
+            # Filter by current user only; plain COUNT and column rows, no ORM object hydration
+            total = db.query(func.count(SearchHistory.id)).filter(SearchHistory.user_id == current_user.id).scalar()
+            searches = db.query(*HISTORY_LIST_COLUMNS)\
+                .filter(SearchHistory.user_id == current_user.id)\
+                .order_by(SearchHistory.created_at.desc(), SearchHistory.id.desc())
+            if use_cursor:
+                # Keyset page: seek straight past the last row the client has seen
+                searches = searches.filter(
+                    tuple_(SearchHistory.created_at, SearchHistory.id) < tuple_(before_created_at, before_id)
+                )
+            else:
+                searches = searches.offset(offset)
+            return total, searches.limit(limit).all()
+        
+        # Blocking DB round trips run in a worker thread so the event loop keeps serving other requests
+        total, searches = await asyncio.to_thread(query_page)
         
         items = [
             {
@@ -634,24 +882,33 @@ async def get_search_history(
                 "results_count": search.results_count,
                 "risk_level": search.risk_level,
                 "relevance_score": search.relevance_score,
-                "created_at": search.created_at.isoformat(),
+                "created_at": search.created_at,  # orjson encodes datetimes as ISO 8601
                 "data_source": search.data_source,
                 "execution_time_ms": search.execution_time_ms,
-                "is_starred": getattr(search, 'is_starred', False),
-                "tags": getattr(search, 'tags', None)
+                "is_starred": False,  # Not tracked on search_history rows
+                "tags": None
             }
             for search in searches
         ]
         
-        return {
+        page = {
             "items": items,
             "total": total,
             "page": (offset // limit) + 1,
             "pages": (total + limit - 1) // limit,
             "limit": limit,
             "offset": offset,
+            "next_cursor": {
+                "before_created_at": searches[-1].created_at.isoformat(),
+                "before_id": searches[-1].id
+            } if len(searches) == limit else None,
             "source": "database"
         }
+        if not use_cursor:
+            await cache_history_page(current_user.id, cache_version, limit, offset, page)
+        
+        # History is per user and changes with every search: always revalidate, but skip the body on a match
+        return conditional_json_response(http_request, page, cache_control="private, no-cache")
         
     except Exception as e:
         logger.error(f"Failed to get search history: {e}")
@@ -667,7 +924,7 @@ async def get_search_history(
         }
 
 @router.post("/notes")
-async def add_note(
+def add_note(
     note_request: NoteRequest, 
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -711,7 +968,7 @@ async def add_note(
         raise HTTPException(status_code=500, detail="Failed to add note")
 
 @router.get("/notes/{search_history_id}")
-async def get_notes(
+def get_notes(
     search_history_id: int, 
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -719,14 +976,14 @@ async def get_notes(
     """Get all notes for a specific search history"""
     try:
         # Verify search belongs to current user and get notes from that search
-        search_history = db.query(SearchHistory).filter(
+        search_history = db.query(SearchHistory.id).filter(
             SearchHistory.id == search_history_id,
             SearchHistory.user_id == current_user.id
         ).first()
         if not search_history:
             raise HTTPException(status_code=404, detail="Search history not found")
         
-        notes = db.query(SearchNote).filter(
+        notes = db.query(*NOTE_COLUMNS).filter(
             SearchNote.search_history_id == search_history_id,
             SearchNote.user_id == current_user.id
         ).all()
@@ -740,8 +997,8 @@ async def get_notes(
                     "note_text": note.note_text,
                     "risk_assessment": note.risk_assessment,
                     "action_taken": note.action_taken,
-                    "created_at": note.created_at.isoformat(),
-                    "updated_at": note.updated_at.isoformat()
+                    "created_at": note.created_at,
+                    "updated_at": note.updated_at
                 }
                 for note in notes
             ],
@@ -753,36 +1010,59 @@ async def get_notes(
         raise HTTPException(status_code=500, detail="Failed to retrieve notes")
 
 @router.get("/history/{history_id}/details")
-async def get_search_details(
+def get_search_details(
     history_id: int, 
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Get detailed search results with notes"""
     try:
-        search_history = db.query(SearchHistory).filter(
+        # Notes for this search, one JSON array per entity (ordered by creation)
+        entity_notes = db.query(
+            SearchNote.search_history_id,
+            SearchNote.entity_id,
+            func.json_agg(aggregate_order_by(func.json_build_object(
+                "id", SearchNote.id,
+                "note_text", SearchNote.note_text,
+                "risk_assessment", SearchNote.risk_assessment,
+                "action_taken", SearchNote.action_taken,
+                "created_at", SearchNote.created_at,
+                "updated_at", SearchNote.updated_at
+            ), SearchNote.id)).label("notes"),
+            func.count(SearchNote.id).label("notes_count")
+        ).filter(
+            SearchNote.search_history_id == history_id
+        ).group_by(SearchNote.search_history_id, SearchNote.entity_id).subquery()
+        
+        # One round trip: the search row plus its notes already grouped by entity_id in Postgres
+        search_history = db.query(
+            SearchHistory.id,
+            SearchHistory.query,
+            SearchHistory.search_type,
+            SearchHistory.results_count,
+            SearchHistory.risk_level,
+            SearchHistory.relevance_score,
+            SearchHistory.data_source,
+            SearchHistory.created_at,
+            SearchHistory.results_data,
+            func.coalesce(
+                func.json_object_agg(entity_notes.c.entity_id, entity_notes.c.notes).filter(entity_notes.c.entity_id.isnot(None)),
+                literal_column("'{}'::json")
+            ).label("notes_by_entity"),
+            func.coalesce(func.sum(entity_notes.c.notes_count), 0).label("total_notes")
+        ).outerjoin(
+            entity_notes, entity_notes.c.search_history_id == SearchHistory.id
+        ).filter(
             SearchHistory.id == history_id,
             SearchHistory.user_id == current_user.id
-        ).first()
+        ).group_by(SearchHistory.id).first()
         if not search_history:
             raise HTTPException(status_code=404, detail="Search history not found")
         
-        # Get notes for this search
-        notes = db.query(SearchNote).filter(SearchNote.search_history_id == history_id).all()
-        
-        # Group notes by entity_id
-        notes_by_entity = {}
-        for note in notes:
-            if note.entity_id not in notes_by_entity:
-                notes_by_entity[note.entity_id] = []
-            notes_by_entity[note.entity_id].append({
-                "id": note.id,
-                "note_text": note.note_text,
-                "risk_assessment": note.risk_assessment,
-                "action_taken": note.action_taken,
-                "created_at": note.created_at.isoformat(),
-                "updated_at": note.updated_at.isoformat()
-            })
+        results_data = batch_processing_service.load_batch_results(db, search_history.id, search_history.results_data)
+        if results_data is None:
+            # The rest of the search stays viewable without its batch results
+            logger.warning(f"Batch results artifact for search {search_history.id} is missing")
         
         return {
             "search_history": {
@@ -794,10 +1074,10 @@ async def get_search_details(
                 "relevance_score": search_history.relevance_score,
                 "data_source": search_history.data_source,
                 "created_at": search_history.created_at.isoformat(),
-                "results_data": search_history.results_data or []
+                "results_data": results_data
             },
-            "notes_by_entity": notes_by_entity,
-            "total_notes": len(notes)
+            "notes_by_entity": search_history.notes_by_entity,
+            "total_notes": int(search_history.total_notes)
         }
         
     except HTTPException:
@@ -808,7 +1088,7 @@ async def get_search_details(
 
 
 @router.post("/entities/star")
-async def star_entity(
+def star_entity(
     request: StarEntityRequest, 
     http_request: Request,
     db: Session = Depends(get_db),
@@ -858,7 +1138,7 @@ async def star_entity(
         
         # Log blacklist action (basic audit)
         try:
-            audit_log = AuditLog(
+            audit_log_writer.enqueue(
                 user_id=current_user.id,
                 action="BLACKLIST_ADD",
                 resource=f"entity:{request.entity_id}",
@@ -870,8 +1150,6 @@ async def star_entity(
                     "relevance_score": request.relevance_score
                 }
             )
-            db.add(audit_log)
-            db.commit()
         except Exception as audit_error:
             logger.warning(f"Audit logging failed for blacklist add: {str(audit_error)}")
         
@@ -891,7 +1169,7 @@ async def star_entity(
         raise HTTPException(status_code=500, detail="Failed to star entity")
 
 @router.delete("/entities/star/{entity_id}/search/{search_history_id}")
-async def unstar_entity(
+def unstar_entity(
     entity_id: str, 
     search_history_id: int, 
     http_request: Request,
@@ -918,7 +1196,7 @@ async def unstar_entity(
         
         # Log blacklist removal action (basic audit)
         try:
-            audit_log = AuditLog(
+            audit_log_writer.enqueue(
                 user_id=current_user.id,
                 action="BLACKLIST_REMOVE",
                 resource=f"entity:{entity_id}",
@@ -928,8 +1206,6 @@ async def unstar_entity(
                     "entity_name": entity_name
                 }
             )
-            db.add(audit_log)
-            db.commit()
         except Exception as audit_error:
             logger.warning(f"Audit logging failed for blacklist remove: {str(audit_error)}")
         
@@ -947,7 +1223,7 @@ async def unstar_entity(
         raise HTTPException(status_code=500, detail="Failed to unstar entity")
 
 @router.get("/entities/starred")
-async def get_starred_entities(
+def get_starred_entities(
     limit: int = 50, 
     offset: int = 0, 
     db: Session = Depends(get_db),
@@ -956,8 +1232,6 @@ async def get_starred_entities(
     """Get all starred entities with search context"""
     
     try:
-        from sqlalchemy.orm import joinedload
-        
         total = db.query(StarredEntity).filter(StarredEntity.user_id == current_user.id).count()
         starred_entities = db.query(StarredEntity)\
             .filter(StarredEntity.user_id == current_user.id)\
@@ -1011,7 +1285,7 @@ async def get_starred_entities(
         }
 
 @router.get("/entities/starred/search/{search_history_id}")
-async def get_starred_entities_for_search(
+def get_starred_entities_for_search(
     search_history_id: int, 
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -1045,7 +1319,7 @@ async def get_starred_entities_for_search(
         }
 
 @router.put("/entities/star/{starred_entity_id}/notes")
-async def update_starred_entity_notes(
+def update_starred_entity_notes(
     starred_entity_id: int,
     request: StarredEntityNotesRequest,
     db: Session = Depends(get_db),
@@ -1082,7 +1356,7 @@ async def update_starred_entity_notes(
         raise HTTPException(status_code=500, detail="Failed to update notes")
 
 @router.get("/reports/starred-entities")
-async def generate_starred_entities_report(
+def generate_starred_entities_report(
     format: str = "json",
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -1090,9 +1364,6 @@ async def generate_starred_entities_report(
     """Generate comprehensive report of all starred entities"""
     
     try:
-        from datetime import datetime
-        from sqlalchemy.orm import joinedload
-        
         # Get current user's starred entities with search context
         starred_entities = db.query(StarredEntity)\
             .filter(StarredEntity.user_id == current_user.id)\
@@ -1171,81 +1442,97 @@ async def generate_starred_entities_report(
 
 @router.get("/analytics")
 async def get_search_analytics(
+    http_request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
-    """Get comprehensive search analytics"""
+    """Get comprehensive search analytics (cached per user for a minute or until their history changes)"""
     try:
-        from sqlalchemy import func, text
-        from datetime import datetime, timedelta
-        
-        # Basic stats - filtered by current user
-        total_searches = db.query(SearchHistory).filter(SearchHistory.user_id == current_user.id).count()
-        starred_entities_count = db.query(StarredEntity).filter(StarredEntity.user_id == current_user.id).count()
-        
-        # Risk level distribution - filtered by current user
-        risk_stats = db.query(
-            SearchHistory.risk_level,
-            func.count(SearchHistory.id).label('count')
-        ).filter(SearchHistory.user_id == current_user.id).group_by(SearchHistory.risk_level).all()
+        cache_version = await get_history_cache_version(current_user.id)
+        cached_analytics = await get_cached_analytics(current_user.id, cache_version)
+        if cached_analytics is not None:
+            return conditional_json_response(http_request, cached_analytics, cache_control=ANALYTICS_CACHE_CONTROL)
         
-        # Data source stats - filtered by current user
-        source_stats = db.query(
-            SearchHistory.data_source,
-            func.count(SearchHistory.id).label('count')
-        ).filter(SearchHistory.user_id == current_user.id).group_by(SearchHistory.data_source).all()
-        
-        # Recent activity (last 7 days) - filtered by current user
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_activity = db.query(
-            func.date(SearchHistory.created_at).label('date'),
-            func.count(SearchHistory.id).label('count')
-        ).filter(
-            SearchHistory.created_at >= week_ago,
-            SearchHistory.user_id == current_user.id
-        ).group_by(func.date(SearchHistory.created_at)).all()
+        def compute_analytics():
+            user_searches = SearchHistory.user_id == current_user.id
         
-        # Top queries - filtered by current user
-        top_queries = db.query(
-            SearchHistory.query,
-            func.count(SearchHistory.id).label('count'),
-            func.max(SearchHistory.created_at).label('last_searched')
-        ).filter(SearchHistory.user_id == current_user.id).group_by(SearchHistory.query).order_by(func.count(SearchHistory.id).desc()).limit(10).all()
-        
-        # Average risk scores - filtered by current user
-        avg_risk_score = db.query(func.avg(SearchHistory.risk_score)).filter(SearchHistory.user_id == current_user.id).scalar() or 0
+            # Summary scalars in one round trip - filtered by current user
+            starred_entities_subquery = db.query(func.count(StarredEntity.id)).filter(
+                StarredEntity.user_id == current_user.id
+            ).scalar_subquery()
+            total_searches, starred_entities_count, avg_risk_score, avg_execution_time = db.query(
+                func.count(SearchHistory.id),
+                starred_entities_subquery,
+                func.avg(SearchHistory.relevance_score),
+                func.avg(SearchHistory.execution_time_ms)
+            ).filter(user_searches).one()
+            avg_risk_score = avg_risk_score or 0
+            avg_execution_time = avg_execution_time or 0
+        
+            # Risk level and data source distributions from a single group-by - filtered by current user
+            risk_source_stats = db.query(
+                SearchHistory.risk_level,
+                SearchHistory.data_source,
+                func.count(SearchHistory.id).label('count')
+            ).filter(user_searches).group_by(SearchHistory.risk_level, SearchHistory.data_source).all()
+            risk_counts: Dict[str, int] = {}
+            source_counts: Dict[str, int] = {}
+            for row in risk_source_stats:
+                risk_counts[row.risk_level] = risk_counts.get(row.risk_level, 0) + row.count
+                source_counts[row.data_source] = source_counts.get(row.data_source, 0) + row.count
+        
+            # Recent activity (last 7 days) - filtered by current user
+            week_ago = datetime.utcnow() - timedelta(days=7)
+            recent_activity = db.query(
+                func.date(SearchHistory.created_at).label('date'),
+                func.count(SearchHistory.id).label('count')
+            ).filter(
+                SearchHistory.created_at >= week_ago,
+                user_searches
+            ).group_by(func.date(SearchHistory.created_at)).all()
+        
+            # Top queries - filtered by current user
+            top_queries = db.query(
+                SearchHistory.query,
+                func.count(SearchHistory.id).label('count'),
+                func.max(SearchHistory.created_at).label('last_searched')
+            ).filter(user_searches).group_by(SearchHistory.query).order_by(func.count(SearchHistory.id).desc()).limit(10).all()
+        
+            analytics = {
+                "summary": {
+                    "total_searches": total_searches,
+                    "starred_entities": starred_entities_count,
+                    "avg_risk_score": round(float(avg_risk_score), 2),
+                    "avg_execution_time_ms": round(float(avg_execution_time), 2)
+                },
+                "risk_distribution": [
+                    {"level": level, "count": count}
+                    for level, count in risk_counts.items()
+                ],
+                "data_sources": [
+                    {"source": source, "count": count}
+                    for source, count in source_counts.items()
+                ],
+                "recent_activity": [
+                    {"date": str(a.date), "count": a.count}
+                    for a in recent_activity
+                ],
+                "top_queries": [
+                    {
+                        "query": q.query,
+                        "count": q.count,
+                        "last_searched": q.last_searched.isoformat()
+                    }
+                    for q in top_queries
+                ]
+            }
+            return analytics
         
-        # Performance stats - filtered by current user
-        avg_execution_time = db.query(func.avg(SearchHistory.execution_time_ms)).filter(SearchHistory.user_id == current_user.id).scalar() or 0
+        # Blocking DB round trips run in a worker thread so the event loop keeps serving other requests
+        analytics = await asyncio.to_thread(compute_analytics)
+        await cache_analytics(current_user.id, cache_version, analytics)
         
-        return {
-            "summary": {
-                "total_searches": total_searches,
-                "starred_entities": starred_entities_count,
-                "avg_risk_score": round(float(avg_risk_score), 2),
-                "avg_execution_time_ms": round(float(avg_execution_time), 2)
-            },
-            "risk_distribution": [
-                {"level": r.risk_level, "count": r.count}
-                for r in risk_stats
-            ],
-            "data_sources": [
-                {"source": s.data_source, "count": s.count}
-                for s in source_stats
-            ],
-            "recent_activity": [
-                {"date": str(a.date), "count": a.count}
-                for a in recent_activity
-            ],
-            "top_queries": [
-                {
-                    "query": q.query,
-                    "count": q.count,
-                    "last_searched": q.last_searched.isoformat()
-                }
-                for q in top_queries
-            ]
-        }
+        return conditional_json_response(http_request, analytics, cache_control=ANALYTICS_CACHE_CONTROL)
         
     except Exception as e:
         logger.error(f"Failed to get analytics: {e}")
@@ -1257,30 +1544,33 @@ async def get_search_analytics(
             "top_queries": []
         }
 
+@async_ttl_cache(ttl=UPSTREAM_CACHE_TTL_SECONDS)
+async def fetch_opensanctions_datasets() -> Dict[str, Any]:
+    """Fetch the dataset catalogue from OpenSanctions (cached briefly; failures raise and are not cached)"""
+    client = get_http_client()
+    response = await client.get(f"{settings.OPENSANCTIONS_BASE_URL}/datasets", timeout=LOOKUP_TIMEOUT)
+    
+    if response.status_code != 200:
+        raise Exception(f"Datasets API returned status {response.status_code}")
+    return orjson.loads(response.content)
+
 @router.get("/datasets")
-async def get_available_datasets():
+async def get_available_datasets(http_request: Request):
     """Get available datasets from OpenSanctions with fallback"""
     
     try:
-        opensanctions_url = settings.OPENSANCTIONS_BASE_URL
-        
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(f"{opensanctions_url}/datasets")
+        datasets_data = await fetch_opensanctions_datasets()
+        return conditional_json_response(http_request, {
+            **datasets_data,
+            "source": "opensanctions",
+            "status": "success"
+        }, cache_control=DATASETS_CACHE_CONTROL)
             
-            if response.status_code == 200:
-                datasets_data = response.json()
-                return {
-                    **datasets_data,
-                    "source": "opensanctions",
-                    "status": "success"
-                }
-            else:
-                raise Exception(f"Datasets API returned status {response.status_code}")
-                
     except Exception as e:
         logger.error(f"Error fetching datasets: {str(e)}")
         
-        return {
+        # Fallback is revalidated every time so clients pick up the real list once upstream recovers
+        return conditional_json_response(http_request, {
             "datasets": [
                 {"name": "default", "title": "All Datasets", "description": "Combined sanctions and PEP data"},
                 {"name": "sanctions", "title": "Sanctions Lists", "description": "International sanctions lists"},
@@ -1291,17 +1581,25 @@ async def get_available_datasets():
             "status": "fallback",
             "error": str(e),
             "note": "OpenSanctions datasets API unavailable - showing default options"
-        }
+        }, cache_control="no-cache")
 
 @router.get("/status")
 async def get_opensanctions_status():
     """Get detailed OpenSanctions status for debugging"""
     
-    # Check OpenSanctions health
-    opensanctions_health = await check_opensanctions_health()
+    # Check OpenSanctions and Elasticsearch health concurrently
+    opensanctions_health, elasticsearch_health = await asyncio.gather(
+        check_opensanctions_health(),
+        check_elasticsearch_health(),
+        return_exceptions=True
+    )
+    if isinstance(opensanctions_health, Exception):
+        opensanctions_health = {"status": "error", "message": f"Health check failed: {str(opensanctions_health)}"}
+    if isinstance(elasticsearch_health, Exception):
+        elasticsearch_health = {"status": "error", "message": f"Cannot connect to Elasticsearch: {str(elasticsearch_health)}"}
     
-    # Check Elasticsearch health
-    elasticsearch_health = await check_elasticsearch_health()
+    # Searches are short-circuited to the fallback while the circuit is not closed
+    opensanctions_health = {**opensanctions_health, "circuit": opensanctions_breaker.snapshot()}
     
     return {
         "opensanctions": opensanctions_health,
@@ -1310,30 +1608,38 @@ async def get_opensanctions_status():
             "status": "healthy",
             "message": "Backend API is operational"
         },
-        "overall_status": "healthy" if opensanctions_health["status"] == "healthy" else "degraded"
+        "overall_status": "healthy" if (
+            opensanctions_health["status"] == "healthy" and opensanctions_breaker.state == CircuitBreaker.CLOSED
+        ) else "degraded"
     }
 
+@async_ttl_cache(ttl=HEALTHY_CACHE_TTL_SECONDS, ttl_for=health_cache_ttl)
 async def check_elasticsearch_health() -> Dict[str, Any]:
-    """Check Elasticsearch health"""
+    """Check Elasticsearch health (cached briefly so bursts share one probe)"""
     
     try:
         # Try to connect to Elasticsearch through the OpenSanctions network
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get("http://opensanctions-index:9200/_cluster/health")
+        client = get_http_client()
+        # local=true answers from the receiving node's cluster state instead of asking the master
+        response = await client.get(
+            "http://opensanctions-index:9200/_cluster/health",
+            params={"local": "true"},
+            timeout=HEALTH_CHECK_TIMEOUT
+        )
+        
+        if response.status_code == 200:
+            es_data = response.json()
+            return {
+                "status": "healthy" if es_data.get("status") in ["green", "yellow"] else "unhealthy",
+                "cluster_status": es_data.get("status"),
+                "message": f"Elasticsearch cluster is {es_data.get('status')}"
+            }
+        else:
+            return {
+                "status": "unhealthy",
+                "message": f"Elasticsearch returned {response.status_code}"
+            }
             
-            if response.status_code == 200:
-                es_data = response.json()
-                return {
-                    "status": "healthy" if es_data.get("status") in ["green", "yellow"] else "unhealthy",
-                    "cluster_status": es_data.get("status"),
-                    "message": f"Elasticsearch cluster is {es_data.get('status')}"
-                }
-            else:
-                return {
-                    "status": "unhealthy",
-                    "message": f"Elasticsearch returned {response.status_code}"
-                }
-                
     except Exception as e:
         return {
             "status": "error",
@@ -1341,65 +1647,67 @@ async def check_elasticsearch_health() -> Dict[str, Any]:
         }
 
 
+# High risk countries according to FATF and Morocco
+HIGH_RISK_COUNTRIES = frozenset(("IR", "KP", "MM", "AF"))
+HIGH_RISK_COUNTRY_WEIGHT = 20
+# PEP +15, sanctions +25, criminal activity +20
+TOPIC_RISK_WEIGHTS = {"pep": 15, "sanction": 25, "crime": 20}
+
+# Integer codes for bucketing risk levels with np.bincount (unknown levels count as LOW)
+RISK_LEVEL_CODES = {"LOW": 0, "MEDIUM": 1, "HIGH": 2}
+RISK_LEVELS_BY_CODE = ("LOW", "MEDIUM", "HIGH")
+RISK_SCORE_THRESHOLDS = [50, 80]  # MEDIUM and HIGH lower bounds, as in get_risk_level
+RECOMMENDED_ACTIONS_BY_CODE = (
+    "Standard Processing - Low risk entity",
+    "Standard Due Diligence Required - Additional verification recommended",
+    "Enhanced Due Diligence Required - Consider blocking transaction"
+)
+
+def risk_code(score: float) -> int:
+    """0/1/2 index into RISK_LEVELS_BY_CODE and RECOMMENDED_ACTIONS_BY_CODE"""
+    return (score >= RISK_SCORE_THRESHOLDS[0]) + (score >= RISK_SCORE_THRESHOLDS[1])
+
+def morocco_risk_adjustment(properties: Dict[str, Any]) -> int:
+    """Points added to the match score for high risk countries and risk topics"""
+    adjustment = HIGH_RISK_COUNTRY_WEIGHT * (not HIGH_RISK_COUNTRIES.isdisjoint(properties.get("country") or ()))
+    return adjustment + sum(TOPIC_RISK_WEIGHTS.get(topic, 0) for topic in set(properties.get("topics") or ()))
+
 # Keep the existing helper functions (enhance_entity_for_morocco, generate_mock_results, etc.)
 def enhance_entity_for_morocco(entity: Dict[str, Any]) -> Dict[str, Any]:
     """Enhance entity data with Morocco-specific risk assessment"""
-    
-    base_score = entity.get("score", 0.5) * 100
-    morocco_risk_factors = 0
-    
-    properties = entity.get("properties", {})
-    
-    # High risk countries according to FATF and Morocco
-    high_risk_countries = ["IR", "KP", "MM", "AF"]
-    if any(country in high_risk_countries for country in properties.get("country", [])):
-        morocco_risk_factors += 20
-        
-    # PEP status
-    if "pep" in properties.get("topics", []):
-        morocco_risk_factors += 15
-        
-    # Sanctions
-    if "sanction" in properties.get("topics", []):
-        morocco_risk_factors += 25
-        
-    # Criminal activity
-    if "crime" in properties.get("topics", []):
-        morocco_risk_factors += 20
-    
+    score = float(entity.get("score", 0.5)) * 100 + morocco_risk_adjustment(entity.get("properties", {}))
+    code = risk_code(score)
     return {
         **entity,
-        "morocco_risk_score": min(base_score + morocco_risk_factors, 100),
-        "risk_level": get_risk_level(base_score + morocco_risk_factors),
-        "recommended_action": get_recommended_action(base_score + morocco_risk_factors)
+        "morocco_risk_score": min(score, 100),
+        "risk_level": RISK_LEVELS_BY_CODE[code],
+        "recommended_action": RECOMMENDED_ACTIONS_BY_CODE[code]
     }
 
 def get_risk_level(score: float) -> str:
-    if score >= 80: return "HIGH"
-    elif score >= 50: return "MEDIUM"
-    else: return "LOW"
+    return RISK_LEVELS_BY_CODE[risk_code(score)]
 
 def get_risk_level_from_opensanctions_score(score: float) -> str:
     """Convert OpenSanctions score (0.0-1.0) to risk level without modification"""
-    score_percent = score * 100
-    if score_percent >= 80: return "HIGH"
-    elif score_percent >= 50: return "MEDIUM"
-    else: return "LOW"
+    return RISK_LEVELS_BY_CODE[risk_code(score * 100)]
 
 def get_recommended_action(score: float) -> str:
-    if score >= 80:
-        return "Enhanced Due Diligence Required - Consider blocking transaction"
-    elif score >= 50:
-        return "Standard Due Diligence Required - Additional verification recommended"
-    else:
-        return "Standard Processing - Low risk entity"
+    return RECOMMENDED_ACTIONS_BY_CODE[risk_code(score)]
 
 def generate_mock_results(query: str) -> List[Dict[str, Any]]:
     """Generate mock results when OpenSanctions is unavailable"""
+    # Decode a fresh copy from the cached template so callers can mutate the results freely
+    return orjson.loads(_mock_results_template(query))
+
+@functools.lru_cache(maxsize=1024)
+def _mock_results_template(query: str) -> bytes:
+    """Build the mock results for a query once, stored as immutable orjson bytes"""
     
+    # crc32 is stable across workers and restarts (str hash() is salted per process), so mock IDs stay consistent
+    query_suffix = zlib.crc32(query.encode()) % 1000
     mock_entities = [
         {
-            "id": f"mock-1-{hash(query) % 1000}",
+            "id": f"mock-1-{query_suffix}",
             "caption": query or "Sample Entity",
             "schema": "Person",
             "score": 0.85,
@@ -1414,7 +1722,7 @@ def generate_mock_results(query: str) -> List[Dict[str, Any]]:
             "recommended_action": "Enhanced Due Diligence Required"
         },
         {
-            "id": f"mock-2-{hash(query) % 1000}",
+            "id": f"mock-2-{query_suffix}",
             "caption": f"{query} Trading LLC" if query else "Sample Company",
             "schema": "Company",
             "score": 0.65,
@@ -1430,7 +1738,7 @@ def generate_mock_results(query: str) -> List[Dict[str, Any]]:
         }
     ]
     
-    return mock_entities
+    return orjson.dumps(mock_entities)
 
 # Enhanced Report Management Endpoints
 
@@ -1454,6 +1762,7 @@ async def delete_search_history(
         # Delete will cascade to starred_entities and search_notes due to foreign key constraints
         db.delete(search)
         db.commit()
+        await invalidate_history_cache(current_user.id)
         
         logger.info(f"Deleted search history: {search_id}")
         return {
@@ -1470,7 +1779,7 @@ async def delete_search_history(
         raise HTTPException(status_code=500, detail="Failed to delete search")
 
 @router.put("/history/{search_id}/notes")
-async def update_search_notes(
+def update_search_notes(
     search_id: int,
     request: SearchNotesRequest,
     db: Session = Depends(get_db),
@@ -1506,7 +1815,7 @@ async def update_search_notes(
         raise HTTPException(status_code=500, detail="Failed to update notes")
 
 @router.get("/reports/starred-entities/enhanced")
-async def generate_enhanced_starred_report(
+def generate_enhanced_starred_report(
     format: str = "json",
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -1514,8 +1823,6 @@ async def generate_enhanced_starred_report(
     """Generate enhanced report with full OpenSanctions details"""
     
     try:
-        from sqlalchemy.orm import joinedload
-        
         # Get current user's starred entities with full context
         starred_entities = db.query(StarredEntity)\
             .filter(StarredEntity.user_id == current_user.id)\
@@ -1525,6 +1832,7 @@ async def generate_enhanced_starred_report(
         
         # Get current user's search history with full data
         search_histories = db.query(SearchHistory)\
+            .options(undefer(SearchHistory.results_data))\
             .filter(SearchHistory.user_id == current_user.id)\
             .order_by(SearchHistory.created_at.desc())\
             .all()
@@ -1680,18 +1988,13 @@ async def generate_enhanced_starred_report(
         raise HTTPException(status_code=500, detail="Failed to generate enhanced report")
 
 @router.get("/reports/starred-entities/csv")
-async def export_starred_entities_csv(
+def export_starred_entities_csv(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Export starred entities report as CSV"""
     
     try:
-        from fastapi.responses import StreamingResponse
-        import csv
-        import io
-        from sqlalchemy.orm import joinedload
-        
         # Get current user's starred entities
         starred_entities = db.query(StarredEntity)\
             .filter(StarredEntity.user_id == current_user.id)\
@@ -1823,17 +2126,13 @@ async def export_starred_entities_csv(
         raise HTTPException(status_code=500, detail="Failed to export CSV")
 
 @router.get("/reports/starred-entities/pdf")
-async def export_starred_entities_pdf(
+def export_starred_entities_pdf(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Export starred entities report as PDF"""
     
     try:
-        from fastapi.responses import StreamingResponse
-        from datetime import datetime
-        import io
-        
         try:
             from reportlab.lib.pagesizes import letter, A4
             from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
@@ -1843,8 +2142,6 @@ async def export_starred_entities_pdf(
         except ImportError:
             raise HTTPException(status_code=500, detail="PDF generation library not available. Please install reportlab.")
         
-        from sqlalchemy.orm import joinedload
-        
         # Get current user's starred entities
         starred_entities = db.query(StarredEntity)\
             .filter(StarredEntity.user_id == current_user.id)\
@@ -2055,35 +2352,57 @@ async def export_starred_entities_pdf(
         logger.error(f"Failed to export PDF: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to export PDF: {str(e)}")
 
+FILTER_OPTIONS_CACHE_CONTROL = "public, no-cache"
+
+def facets_cache_ttl(result: Tuple[Dict[str, Any], str]) -> float:
+    """Keep fetched facets for the upstream TTL and an unavailable (empty) result only briefly"""
+    return UPSTREAM_CACHE_TTL_SECONDS if result[0] else UNHEALTHY_CACHE_TTL_SECONDS
+
+@async_ttl_cache(ttl=UPSTREAM_CACHE_TTL_SECONDS, ttl_for=facets_cache_ttl)
+async def fetch_opensanctions_facets() -> Tuple[Dict[str, Any], str]:
+    """OpenSanctions topic/dataset/country facets ({} while OpenSanctions is unavailable) and their digest"""
+    # The health probe and the facets query run concurrently; the facets are only used when the probe is healthy
+    client = get_http_client()
+    opensanctions_status, response = await asyncio.gather(
+        check_opensanctions_health(),
+        client.get(f"{settings.OPENSANCTIONS_BASE_URL}/search/default?q=&limit=1", timeout=LOOKUP_TIMEOUT),
+        return_exceptions=True
+    )
+    
+    if (
+        not isinstance(opensanctions_status, Exception)
+        and opensanctions_status["status"] == "healthy"
+        and not isinstance(response, Exception)
+        and response.status_code == 200
+    ):
+        facets = orjson.loads(response.content).get("facets", {})
+    else:
+        facets = {}
+    
+    digest = hashlib.blake2b(orjson.dumps(facets, option=orjson.OPT_SORT_KEYS), digest_size=8).hexdigest()
+    return facets, digest
+
 @router.get("/filter-options")
-async def get_filter_options() -> Dict[str, Any]:
+async def get_filter_options(http_request: Request):
     """Get available filter options for enhanced search"""
     
     try:
-        # Get available topics and datasets from OpenSanctions
-        opensanctions_status = await check_opensanctions_health()
-        
-        if opensanctions_status["status"] == "healthy":
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(f"{settings.OPENSANCTIONS_BASE_URL}/search/default?q=&limit=1")
-                if response.status_code == 200:
-                    data = response.json()
-                    facets = data.get("facets", {})
-                else:
-                    facets = {}
-        else:
-            facets = {}
+        facets, facets_digest = await fetch_opensanctions_facets()
         
-        # Get Moroccan-specific options
-        moroccan_options = get_moroccan_filter_options()
+        # The response is fully determined by the Moroccan entities version and the cached facets, so the
+        # ETag is known before the body is built and a revalidating client gets its 304 straight away
+        etag = _filter_options_etag(facets_digest)
+        not_modified = not_modified_response(http_request, etag, FILTER_OPTIONS_CACHE_CONTROL)
+        if not_modified is not None:
+            return not_modified
         
-        return {
+        return conditional_json_response(http_request, {
             "opensanctions": {
                 "topics": facets.get("topics", {}).get("values", []),
                 "datasets": facets.get("datasets", {}).get("values", []),
                 "countries": facets.get("countries", {}).get("values", [])
             },
-            "moroccan": moroccan_options,
+            "moroccan": get_moroccan_filter_options(),
             "schemas": [
                 {"name": "Person", "label": "Person", "count": 0},
                 {"name": "Company", "label": "Company", "count": 0},
@@ -2098,7 +2417,7 @@ async def get_filter_options() -> Dict[str, Any]:
                 {"name": "OR", "label": "Any (OR)"},
                 {"name": "AND", "label": "All (AND)"}
             ]
-        }
+        }, cache_control=FILTER_OPTIONS_CACHE_CONTROL, etag=etag)
         
     except Exception as e:
         logger.error(f"Error getting filter options: {e}")
@@ -2110,75 +2429,14 @@ async def get_filter_options() -> Dict[str, Any]:
             "filter_operators": []
         }
 
+def _filter_options_etag(facets_digest: str) -> str:
+    """ETag for /filter-options derived from the Moroccan entities version and the OpenSanctions facets digest"""
+    version = moroccan_entities_service.get_entities_version()
+    return f'"{hashlib.blake2b(f"{version}|{facets_digest}".encode(), digest_size=8).hexdigest()}"'
+
 def get_moroccan_filter_options() -> Dict[str, Any]:
     """Get Morocco-specific filter options"""
-    
-    # Get statistics from Moroccan entities service
-    service = moroccan_entities_service
-    all_entities = service.get_all_entities()
-    
-    # Collect unique values
-    parties = set()
-    regions = set()
-    risk_levels = {"HIGH": 0, "MEDIUM": 0, "LOW": 0}
-    position_types = {"parliament": 0, "regional": 0, "municipal": 0}
-    mandate_years = set()
-    
-    for entity in all_entities:
-        properties = entity.get("properties", {})
-        
-        # Collect political parties
-        for party in properties.get("politicalParty", []):
-            if party:
-                parties.add(party)
-        
-        # Collect regions
-        for region in properties.get("region", []):
-            if region:
-                regions.add(region)
-        
-        # Count risk levels
-        risk = entity.get("risk_level", "LOW")
-        if risk in risk_levels:
-            risk_levels[risk] += 1
-        
-        # Count position types
-        datasets = entity.get("datasets", [])
-        if any("parliament" in ds for ds in datasets):
-            position_types["parliament"] += 1
-        elif any("regional" in ds for ds in datasets):
-            position_types["regional"] += 1
-        elif any("communal" in ds for ds in datasets):
-            position_types["municipal"] += 1
-        
-        # Collect mandate years
-        for mandate in properties.get("mandate", []):
-            if mandate and len(mandate) == 4 and mandate.isdigit():
-                mandate_years.add(mandate)
-    
-    return {
-        "political_parties": [
-            {"name": party, "label": party, "count": 0} 
-            for party in sorted(parties)
-        ],
-        "regions": [
-            {"name": region, "label": region, "count": 0} 
-            for region in sorted(regions)
-        ],
-        "risk_levels": [
-            {"name": level, "label": level, "count": count} 
-            for level, count in risk_levels.items()
-        ],
-        "position_types": [
-            {"name": "parliament", "label": "Parliament Members", "count": position_types["parliament"]},
-            {"name": "regional", "label": "Regional Officials", "count": position_types["regional"]},
-            {"name": "municipal", "label": "Municipal Officials", "count": position_types["municipal"]}
-        ],
-        "mandate_years": [
-            {"name": year, "label": year, "count": 0} 
-            for year in sorted(mandate_years, reverse=True)
-        ]
-    }
+    return moroccan_entities_service.get_filter_options()
 
 # Batch Processing Models
 class BatchValidateRequest(BaseModel):
@@ -2188,35 +2446,49 @@ class BatchProcessRequest(BaseModel):
     dataset: str = "default"
     template_type: str = "screening"
 
-from datetime import datetime
-
 # Batch Processing Endpoints
 
+EXCEL_UPLOAD_EXTENSIONS = {'.xlsx', '.xls'}
+BATCH_PREVIEW_SIZE = 5  # Results/errors returned inline; the full set is available via export
+
+def _excel_upload(file: UploadFile = File(...)) -> UploadFile:
+    """Reject non-Excel uploads by extension before the body is read"""
+    if os.path.splitext(file.filename or '')[1].lower() not in EXCEL_UPLOAD_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Only Excel files (.xlsx, .xls) are supported")
+    return file
+
+def _spooled_upload(file: UploadFile) -> Tuple[BinaryIO, int]:
+    """Return the upload's spooled temporary file rewound to the start, plus its size in bytes.
+    
+    Starlette already spools multipart uploads to a SpooledTemporaryFile (on disk past 1MB),
+    so openpyxl reads straight from it instead of a second in-memory copy.
+    """
+    upload = file.file
+    upload.seek(0, os.SEEK_END)
+    file_size = upload.tell()
+    upload.seek(0)
+    return upload, file_size
+
 @router.post("/batch/validate")
-async def validate_batch_template(
-    file: UploadFile = File(...),
+def validate_batch_template(
+    file: UploadFile = Depends(_excel_upload),
     template_type: str = "screening",
     current_user: User = Depends(require_analyst_or_above)
 ) -> Dict[str, Any]:
     """Validate uploaded Excel template for batch processing"""
     
     try:
-        # Check file type
-        if not file.filename.endswith(('.xlsx', '.xls')):
-            raise HTTPException(status_code=400, detail="Only Excel files (.xlsx, .xls) are supported")
+        upload, file_size = _spooled_upload(file)
         
-        # Read file content
-        file_content = await file.read()
-        
-        if len(file_content) == 0:
+        if file_size == 0:
             raise HTTPException(status_code=400, detail="Uploaded file is empty")
         
         # Validate template
-        validation_result = batch_processing_service.validate_excel_template(file_content, template_type)
+        validation_result = batch_processing_service.validate_excel_template(upload, template_type)
         
         return {
             "filename": file.filename,
-            "file_size": len(file_content),
+            "file_size": file_size,
             "template_type": template_type,
             "validation": validation_result,
             "status": "validated"
@@ -2231,7 +2503,8 @@ async def validate_batch_template(
 @router.post("/batch/process")
 async def process_batch_screening(
     request: Request,
-    file: UploadFile = File(...),
+    background_tasks: BackgroundTasks,
+    file: UploadFile = Depends(_excel_upload),
     dataset: str = "default",
     template_type: str = "screening",
     changed_since: Optional[str] = None,
@@ -2244,25 +2517,18 @@ async def process_batch_screening(
     """Process batch screening for uploaded Excel file"""
     
     try:
-        # Validate file
-        if not file.filename.endswith(('.xlsx', '.xls')):
-            raise HTTPException(status_code=400, detail="Only Excel files (.xlsx, .xls) are supported")
-        
-        file_content = await file.read()
-        if len(file_content) == 0:
+        upload, file_size = _spooled_upload(file)
+        if file_size == 0:
             raise HTTPException(status_code=400, detail="Uploaded file is empty")
         
-        # Validate template first
-        validation_result = batch_processing_service.validate_excel_template(file_content, template_type)
+        # Validate template and parse entities from a single read of the workbook
+        validation_result, entities = batch_processing_service.validate_and_parse(upload, template_type)
         if not validation_result["valid"]:
             raise HTTPException(
                 status_code=400, 
                 detail=f"Template validation failed: {validation_result.get('error', 'Unknown validation error')}"
             )
         
-        # Parse entities from Excel
-        entities = batch_processing_service.parse_excel_data(file_content)
-        
         if len(entities) == 0:
             raise HTTPException(status_code=400, detail="No valid entities found in uploaded file")
         
@@ -2284,33 +2550,25 @@ async def process_batch_screening(
             entities, dataset, current_user.id, date_filters, limit
         )
         
-        # Save batch processing to search history
-        await save_batch_to_history(db, batch_result, file.filename, current_user.id)
-        
-        # Log basic audit action for batch processing (fallback)
-        try:
-            audit_log = AuditLog(
-                user_id=current_user.id,
-                action="BATCH_SCREENING",
-                resource=f"file:{file.filename}",
-                ip_address=request.client.host,
-                user_agent=request.headers.get("user-agent"),
-                extra_data={
-                    "filename": file.filename,
-                    "template_type": template_type,
-                    "dataset": dataset,
-                    "entities_count": len(entities),
-                    "successful_count": batch_result.successful_records,
-                    "failed_count": batch_result.failed_records,
-                    "processing_time_ms": batch_result.processing_time_ms,
-                    "job_id": batch_result.job_id
-                }
-            )
-            db.add(audit_log)
-            db.commit()
-        except Exception as audit_error:
-            logger.warning(f"Audit logging failed for batch processing: {str(audit_error)}")
-            # Continue with batch processing response even if audit logging fails
+        # Persist history after the response has been sent; the audit row goes to the queued writer
+        background_tasks.add_task(save_batch_to_history, db, batch_result, file.filename, current_user.id)
+        audit_log_writer.enqueue(
+            user_id=current_user.id,
+            action="BATCH_SCREENING",
+            resource=f"file:{file.filename}",
+            ip_address=request.client.host,
+            user_agent=request.headers.get("user-agent"),
+            extra_data={
+                "filename": file.filename,
+                "template_type": template_type,
+                "dataset": dataset,
+                "entities_count": len(entities),
+                "successful_count": batch_result.successful_records,
+                "failed_count": batch_result.failed_records,
+                "processing_time_ms": batch_result.processing_time_ms,
+                "job_id": batch_result.job_id
+            }
+        )
         
         return {
             "job_id": batch_result.job_id,
@@ -2325,10 +2583,10 @@ async def process_batch_screening(
                 "processing_time_ms": batch_result.processing_time_ms,
                 "status": batch_result.status
             },
-            "results_preview": batch_result.results[:5],  # First 5 results as preview
-            "errors_preview": batch_result.errors[:5],    # First 5 errors as preview
-            "has_more_results": len(batch_result.results) > 5,
-            "has_more_errors": len(batch_result.errors) > 5,
+            "results_preview": list(itertools.islice(batch_result.results, BATCH_PREVIEW_SIZE)),
+            "errors_preview": list(itertools.islice(batch_result.errors, BATCH_PREVIEW_SIZE)),
+            "has_more_results": batch_result.successful_records > BATCH_PREVIEW_SIZE,
+            "has_more_errors": batch_result.failed_records > BATCH_PREVIEW_SIZE,
             "status": "completed"
         }
         
@@ -2338,83 +2596,113 @@ async def process_batch_screening(
         logger.error(f"Error processing batch screening: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to process batch screening: {str(e)}")
 
+# Batch template definitions (columns and sample rows per template type)
+BATCH_TEMPLATES = {
+    "screening": {
+        "columns": ["name", "type"],
+        "sample_data": [
+            {"name": "John Smith", "type": "Person"},
+            {"name": "ACME Corporation", "type": "Company"},
+            {"name": "Example Organization", "type": "Organization"}
+        ]
+    },
+    "enhanced_screening": {
+        "columns": ["name", "type", "date_of_birth", "place_of_birth", "nationality", "country", "reference_id"],
+        "sample_data": [
+            {
+                "name": "John Smith", 
+                "type": "Person", 
+                "date_of_birth": "1980-01-01",
+                "place_of_birth": "New York, USA",
+                "nationality": "US",
+                "country": "US",
+                "reference_id": "REF001"
+            },
+            {
+                "name": "ACME Corporation", 
+                "type": "Company",
+                "date_of_birth": "",
+                "place_of_birth": "",
+                "nationality": "",
+                "country": "US",
+                "reference_id": "REF002"
+            }
+        ]
+    }
+}
+
+BATCH_TEMPLATE_INSTRUCTIONS = [
+    ["Field", "Description", "Required", "Valid Values"],
+    ["name", "Full name of person or entity", "Yes", "Any text"],
+    ["type", "Type of entity", "Yes", "Person, Company, Organization"],
+    ["date_of_birth", "Date of birth (for persons)", "No", "YYYY-MM-DD format"],
+    ["place_of_birth", "Place of birth (for persons)", "No", "Any text"],
+    ["nationality", "Nationality/citizenship", "No", "Country codes (US, FR, etc.)"],
+    ["country", "Current country", "No", "Country codes (US, FR, etc.)"],
+    ["reference_id", "Your internal reference", "No", "Any text"]
+]
+
+# Generated template workbooks are static, so build each one once per process
+_TEMPLATE_CACHE: Dict[str, bytes] = {}
+_TEMPLATE_CACHE_LOCK = threading.Lock()
+
+def _build_batch_template(template_type: str) -> bytes:
+    """Render the Excel template workbook for a template type"""
+    template_config = BATCH_TEMPLATES[template_type]
+    columns = template_config["columns"]
+    
+    # Create Excel file in memory; rows are written in order so constant_memory mode is safe
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, {
+        "constant_memory": True,
+        "strings_to_formulas": False,
+        "strings_to_urls": False
+    })
+    header_format = workbook.add_format({"bold": True, "border": 1})
+    
+    # Write template with sample data
+    template_sheet = workbook.add_worksheet("Template")
+    template_sheet.write_row(0, 0, columns, header_format)
+    for row_idx, sample in enumerate(template_config["sample_data"], start=1):
+        template_sheet.write_row(row_idx, 0, [sample.get(col, "") for col in columns])
+    
+    # Add instructions sheet
+    instructions_sheet = workbook.add_worksheet("Instructions")
+    instructions_sheet.write_row(0, 0, BATCH_TEMPLATE_INSTRUCTIONS[0], header_format)
+    for row_idx, instruction in enumerate(BATCH_TEMPLATE_INSTRUCTIONS[1:], start=1):
+        instructions_sheet.write_row(row_idx, 0, instruction)
+    
+    workbook.close()
+    return output.getvalue()
+
+def get_batch_template_bytes(template_type: str) -> bytes:
+    """Get the cached Excel template for a template type, building it on first use"""
+    if template_type not in BATCH_TEMPLATES:
+        template_type = "screening"
+    
+    content = _TEMPLATE_CACHE.get(template_type)
+    if content is None:
+        with _TEMPLATE_CACHE_LOCK:
+            content = _TEMPLATE_CACHE.get(template_type)
+            if content is None:
+                content = _build_batch_template(template_type)
+                _TEMPLATE_CACHE[template_type] = content
+    return content
+
 @router.get("/batch/template/download")
-async def download_batch_template(
+def download_batch_template(
     template_type: str = "screening",
     current_user: User = Depends(require_analyst_or_above)
 ):
     """Download Excel template for batch screening"""
     
     try:
-        import pandas as pd
-        
-        # Define template columns for different types
-        templates = {
-            "screening": {
-                "columns": ["name", "type"],
-                "sample_data": [
-                    {"name": "John Smith", "type": "Person"},
-                    {"name": "ACME Corporation", "type": "Company"},
-                    {"name": "Example Organization", "type": "Organization"}
-                ]
-            },
-            "enhanced_screening": {
-                "columns": ["name", "type", "date_of_birth", "place_of_birth", "nationality", "country", "reference_id"],
-                "sample_data": [
-                    {
-                        "name": "John Smith", 
-                        "type": "Person", 
-                        "date_of_birth": "1980-01-01",
-                        "place_of_birth": "New York, USA",
-                        "nationality": "US",
-                        "country": "US",
-                        "reference_id": "REF001"
-                    },
-                    {
-                        "name": "ACME Corporation", 
-                        "type": "Company",
-                        "date_of_birth": "",
-                        "place_of_birth": "",
-                        "nationality": "",
-                        "country": "US",
-                        "reference_id": "REF002"
-                    }
-                ]
-            }
-        }
-        
-        template_config = templates.get(template_type, templates["screening"])
-        
-        # Create DataFrame with sample data
-        df = pd.DataFrame(template_config["sample_data"])
-        
-        # Create Excel file in memory
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # Write template with sample data
-            df.to_excel(writer, sheet_name='Template', index=False)
-            
-            # Add instructions sheet
-            instructions = [
-                ["Field", "Description", "Required", "Valid Values"],
-                ["name", "Full name of person or entity", "Yes", "Any text"],
-                ["type", "Type of entity", "Yes", "Person, Company, Organization"],
-                ["date_of_birth", "Date of birth (for persons)", "No", "YYYY-MM-DD format"],
-                ["place_of_birth", "Place of birth (for persons)", "No", "Any text"],
-                ["nationality", "Nationality/citizenship", "No", "Country codes (US, FR, etc.)"],
-                ["country", "Current country", "No", "Country codes (US, FR, etc.)"],
-                ["reference_id", "Your internal reference", "No", "Any text"]
-            ]
-            
-            instructions_df = pd.DataFrame(instructions[1:], columns=instructions[0])
-            instructions_df.to_excel(writer, sheet_name='Instructions', index=False)
-        
-        output.seek(0)
+        content = get_batch_template_bytes(template_type)
         
         filename = f"sanctions_screening_template_{template_type}.xlsx"
         
         return StreamingResponse(
-            io.BytesIO(output.getvalue()),
+            io.BytesIO(content),
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
@@ -2423,8 +2711,42 @@ async def download_batch_template(
         logger.error(f"Error generating template: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate template: {str(e)}")
 
+def batch_result_csv_rows(results: Iterable[Dict[str, Any]]):
+    """Flatten batch screening results into CSV export rows.
+    
+    Consumes results lazily, CSV_ROWS_PER_CHUNK at a time; within each chunk the
+    highest-match scores are pulled into one NumPy column and scaled to
+    percentages in a single vectorized pass instead of per row.
+    """
+    results = iter(results)
+    while True:
+        chunk = list(itertools.islice(results, CSV_ROWS_PER_CHUNK))
+        if not chunk:
+            break
+        highest_matches = [result.get("highest_risk_match") or {} for result in chunk]
+        scores = np.fromiter(
+            (match.get("score") or 0 for match in highest_matches),
+            dtype=np.float64,
+            count=len(highest_matches)
+        )
+        percentages = np.round(scores * 100, 2).tolist()
+        
+        for result, highest_match, score, percentage in zip(chunk, highest_matches, scores.tolist(), percentages):
+            yield [
+                result.get("row_number", ""),
+                result.get("entity_name", ""),
+                result.get("entity_type", ""),
+                result.get("reference_id", ""),
+                result.get("status", ""),
+                result.get("results_count", 0),
+                highest_match.get("risk_level", ""),
+                percentage if score else "",
+                highest_match.get("caption", ""),
+                result.get("error", "")
+            ]
+
 @router.get("/batch/results/{job_id}/export")
-async def export_batch_results(
+def export_batch_results(
     job_id: str,
     format: str = "excel",  # excel, csv, json
     db: Session = Depends(get_db),
@@ -2434,9 +2756,9 @@ async def export_batch_results(
     
     try:
         # Get batch results from search history
-        search_history = db.query(SearchHistory).filter(
+        search_history = db.query(SearchHistory).options(undefer(SearchHistory.results_data)).filter(
             SearchHistory.user_id == current_user.id,
-            SearchHistory.data_source.like(f"%batch_{job_id}%")
+            SearchHistory.job_id == job_id
         ).first()
         
         if not search_history:
@@ -2446,22 +2768,53 @@ async def export_batch_results(
         if not batch_data:
             raise HTTPException(status_code=404, detail=f"No results found for batch job {job_id}")
         
-        # Reconstruct batch result (simplified version for export)
-        from app.services.batch_processing import BatchJobResult
-        batch_result = BatchJobResult(
-            job_id=job_id,
-            total_records=len(batch_data),
-            processed_records=len(batch_data),
-            successful_records=len([r for r in batch_data if r.get("status") == "success"]),
-            failed_records=len([r for r in batch_data if r.get("status") != "success"]),
-            results=[r for r in batch_data if r.get("status") == "success"],
-            errors=[r for r in batch_data if r.get("status") != "success"],
-            processing_time_ms=search_history.execution_time_ms or 0,
-            status="completed"
-        )
+        export_format = format.lower()
+        if export_format not in ("excel", "csv", "json"):
+            raise HTTPException(status_code=400, detail="Invalid format. Supported formats: excel, csv, json")
         
-        if format.lower() == "excel":
+        if isinstance(batch_data, dict) and batch_data.get("artifact"):
+            # Fetched before responding so a missing artifact is a 410, not a truncated stream
+            blob = batch_processing_service.get_results_artifact(db, search_history.id)
+            if blob is None:
+                raise HTTPException(status_code=410, detail=f"Results for batch job {job_id} are no longer available")
+            
+            # The artifact already is the JSON export document - stream it without parsing
+            if export_format == "json":
+                return StreamingResponse(
+                    batch_processing_service.iter_results_artifact(blob),
+                    media_type="application/json",
+                    headers={"Content-Disposition": f"attachment; filename=batch_results_{job_id}.json"}
+                )
+            
+            document = batch_processing_service.load_results_artifact(blob)
+            summary = batch_data.get("summary") or document["summary"]
+            results, errors = document["results"], document["errors"]
+        else:
+            # Legacy rows keep the full results inline - split them in a single pass
+            results, errors = [], []
+            for result in batch_data:
+                (results if result.get("status") == "success" else errors).append(result)
+            summary = {
+                "total_records": len(batch_data),
+                "successful_records": len(results),
+                "failed_records": len(errors),
+                "processing_time_ms": search_history.execution_time_ms or 0,
+                "status": "completed"
+            }
+        
+        if export_format == "excel":
             # Generate Excel export
+            batch_result = BatchJobResult(
+                job_id=job_id,
+                total_records=summary["total_records"],
+                processed_records=summary["total_records"],
+                successful_records=summary["successful_records"],
+                failed_records=summary["failed_records"],
+                results=results,
+                errors=errors,
+                processing_time_ms=summary["processing_time_ms"],
+                status=summary["status"]
+            )
             excel_content = batch_processing_service.generate_results_excel(batch_result)
             
             return StreamingResponse(
@@ -2470,68 +2823,35 @@ async def export_batch_results(
                 headers={"Content-Disposition": f"attachment; filename=batch_results_{job_id}.xlsx"}
             )
             
-        elif format.lower() == "csv":
-            # Generate CSV export
-            import csv
-            output = io.StringIO()
-            writer = csv.writer(output)
-            
-            # Write headers
-            writer.writerow([
+        elif export_format == "csv":
+            # Generate CSV export, streamed to the client in chunks
+            headers = [
                 "Row Number", "Entity Name", "Entity Type", "Reference ID", 
                 "Status", "Matches Found", "Highest Risk Level", 
                 "Highest Match Score", "Highest Match Name", "Error"
-            ])
-            
-            # Write results
-            for result in batch_result.results + batch_result.errors:
-                highest_match = result.get("highest_risk_match", {})
-                writer.writerow([
-                    result.get("row_number", ""),
-                    result.get("entity_name", ""),
-                    result.get("entity_type", ""),
-                    result.get("reference_id", ""),
-                    result.get("status", ""),
-                    result.get("results_count", 0),
-                    highest_match.get("risk_level", ""),
-                    round(highest_match.get("score", 0) * 100, 2) if highest_match.get("score") else "",
-                    highest_match.get("caption", ""),
-                    result.get("error", "")
-                ])
-            
-            output.seek(0)
+            ]
             
             return StreamingResponse(
-                io.BytesIO(output.getvalue().encode()),
+                iter_csv_chunks(headers, batch_result_csv_rows(itertools.chain(results, errors))),
                 media_type="text/csv",
                 headers={"Content-Disposition": f"attachment; filename=batch_results_{job_id}.csv"}
             )
             
-        elif format.lower() == "json":
-            # Return JSON export
-            import json
-            json_content = json.dumps({
-                "job_id": batch_result.job_id,
-                "summary": {
-                    "total_records": batch_result.total_records,
-                    "successful_records": batch_result.successful_records,
-                    "failed_records": batch_result.failed_records,
-                    "processing_time_ms": batch_result.processing_time_ms,
-                    "status": batch_result.status
-                },
-                "results": batch_result.results,
-                "errors": batch_result.errors
-            }, indent=2)
+        else:
+            # Return JSON export (orjson serializes straight to bytes)
+            json_content = orjson.dumps({
+                "job_id": job_id,
+                "summary": summary,
+                "results": results,
+                "errors": errors
+            }, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
             
-            return StreamingResponse(
-                io.BytesIO(json_content.encode()),
+            return Response(
+                content=json_content,
                 media_type="application/json",
                 headers={"Content-Disposition": f"attachment; filename=batch_results_{job_id}.json"}
             )
             
-        else:
-            raise HTTPException(status_code=400, detail="Invalid format. Supported formats: excel, csv, json")
-            
     except HTTPException:
         raise
     except Exception as e:
@@ -2541,39 +2861,33 @@ async def export_batch_results(
 async def save_batch_to_history(db: Session, batch_result, filename: str, user_id: int):
     """Save batch processing results to search history"""
     try:
-        # Calculate risk metrics from batch results
-        risk_scores = []
-        high_risk_count = 0
-        medium_risk_count = 0
-        low_risk_count = 0
-        
-        all_results = batch_result.results + batch_result.errors
-        for result in all_results:
-            highest_match = result.get("highest_risk_match")
-            if highest_match:
-                score = highest_match.get("score", 0) * 100
-                risk_scores.append(score)
-                
-                risk_level = highest_match.get("risk_level", "LOW")
-                if risk_level == "HIGH":
-                    high_risk_count += 1
-                elif risk_level == "MEDIUM":
-                    medium_risk_count += 1
-                else:
-                    low_risk_count += 1
-        
-        avg_relevance = sum(risk_scores) / len(risk_scores) if risk_scores else 0
-        max_relevance = max(risk_scores) if risk_scores else 0
-        
-        # Determine overall risk level
-        if high_risk_count > 0:
-            overall_risk_level = "HIGH"
-        elif medium_risk_count > 0:
-            overall_risk_level = "MEDIUM"
-        else:
-            overall_risk_level = "LOW"
+        # Calculate risk metrics from batch results in vectorized form
+        highest_matches = [
+            result["highest_risk_match"]
+            for result in itertools.chain(batch_result.results, batch_result.errors)
+            if result.get("highest_risk_match")
+        ]
+        
+        risk_scores = np.fromiter(
+            (match.get("score", 0) * 100 for match in highest_matches),
+            dtype=np.float64, count=len(highest_matches)
+        )
+        risk_codes = np.fromiter(
+            (RISK_LEVEL_CODES.get(match.get("risk_level", "LOW"), 0) for match in highest_matches),
+            dtype=np.int8, count=len(highest_matches)
+        )
+        
+        avg_relevance = float(risk_scores.mean()) if risk_scores.size else 0
         
-        # Create history entry
+        # Overall risk level is the highest level seen across all matches
+        overall_risk_level = RISK_LEVELS_BY_CODE[int(risk_codes.max())] if risk_codes.size else "LOW"
+        
+        # Compressing a large batch is CPU-bound - keep it off the event loop
+        results_artifact, results_reference = await asyncio.to_thread(
+            batch_processing_service.build_results_artifact, batch_result
+        )
+        
+        # Create history entry; the artifact row is inserted in the same commit
         history_entry = SearchHistory(
             query=f"BATCH: {filename} ({batch_result.total_records} entities)",
             search_type="Batch",
@@ -2581,17 +2895,21 @@ async def save_batch_to_history(db: Session, batch_result, filename: str, user_i
             risk_level=overall_risk_level,
             relevance_score=avg_relevance,
             data_source=f"batch_{batch_result.job_id}",
+            job_id=batch_result.job_id,
             execution_time_ms=batch_result.processing_time_ms,
-            results_data=all_results,  # Store full batch results
+            results_data=results_reference,  # Summary reference; full results live in results_artifact
+            results_artifact=results_artifact,
             user_id=user_id
         )
         
         db.add(history_entry)
-        db.commit()
-        db.refresh(history_entry)
+        # The commit uploads the compressed blob - also off the event loop
+        await asyncio.to_thread(db.commit)
+        await asyncio.to_thread(db.refresh, history_entry)
+        await invalidate_history_cache(user_id)
         
         logger.info(f"Saved batch processing to history: {history_entry.id}")
         
     except Exception as e:
         logger.error(f"Failed to save batch to history: {e}")
-        db.rollback()
\ No newline at end of file
+        db.rollback()
@@ -4,20 +4,30 @@ Advanced Search History Management API Endpoints
 Provides comprehensive search history tracking, analytics, and management features
 """
 
+import asyncio
+import orjson
 from fastapi import APIRouter, HTTPException, Depends, Query, Request
-from typing import Dict, Any, List, Optional
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Dict, Any, Iterator, List, Literal, Optional
 from datetime import datetime, timedelta
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 from app.database import get_db
+from app.models.search_history import SearchHistory
+from app.models.search_notes import SearchNote
+from app.models.starred_entity import StarredEntity
 from app.models.user import User
 from app.core.auth import get_current_user
+from app.core.csv_export import iter_csv_chunks
 from app.core.permissions import require_analyst_or_above
-from app.services.search_history_service import get_search_history_service
+from app.services.search_history_service import (
+    get_search_history_service, invalidate_history_cache, get_history_cache_version, get_cached_analytics, cache_analytics
+)
 from app.services.audit_service import get_audit_service
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)  # orjson-encoded responses for the history endpoints
 
 class SearchHistoryFilter(BaseModel):
     query_filter: Optional[str] = None
@@ -31,13 +41,13 @@ class SearchHistoryFilter(BaseModel):
     min_results: Optional[int] = None
     max_results: Optional[int] = None
     sort_by: str = "created_at"
-    sort_order: str = "desc"
+    sort_order: Literal["asc", "desc"] = "desc"
 
 class BulkDeleteRequest(BaseModel):
     search_history_ids: List[int]
 
 @router.get("/advanced")
-async def get_advanced_search_history(
+def get_advanced_search_history(
     request: Request,
     limit: int = Query(50, le=1000, description="Maximum number of results"),
     offset: int = Query(0, description="Number of results to skip"),
@@ -52,13 +62,16 @@ async def get_advanced_search_history(
     min_results: Optional[int] = Query(None, description="Minimum number of results"),
     max_results: Optional[int] = Query(None, description="Maximum number of results"),
     sort_by: str = Query("created_at", description="Field to sort by"),
-    sort_order: str = Query("desc", description="Sort order (asc/desc)"),
+    sort_order: Literal["asc", "desc"] = Query("desc", description="Sort order (asc/desc)"),
+    before_created_at: Optional[datetime] = Query(None, description="Keyset cursor from next_cursor (created_at sort only)"),
+    before_id: Optional[int] = Query(None, description="Keyset cursor tiebreaker from next_cursor"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_analyst_or_above)
 ) -> Dict[str, Any]:
     """
     Get search history with advanced filtering and sorting options
-    Supports comprehensive filtering by various criteria
+    Supports comprehensive filtering by various criteria; when sorting by created_at,
+    pass back next_cursor instead of a growing offset to page through long histories
     """
     try:
         search_history_service = get_search_history_service(db)
@@ -78,7 +91,9 @@ async def get_advanced_search_history(
             min_results=min_results,
             max_results=max_results,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            before_created_at=before_created_at,
+            before_id=before_id
         )
         
         # Log analytics access
@@ -96,7 +111,8 @@ async def get_advanced_search_history(
             }
         )
         
-        return result
+        # Returned as a response so the items skip FastAPI's jsonable_encoder pass
+        return ORJSONResponse(result)
         
     except HTTPException:
         raise
@@ -115,11 +131,18 @@ async def get_search_analytics(
     Provides insights into search patterns, performance, and compliance metrics
     """
     try:
-        search_history_service = get_search_history_service(db)
-        analytics = search_history_service.get_search_analytics(
-            user_id=current_user.id,
-            days=days
-        )
+        # Dashboards poll this; serve from Redis until the TTL expires or the user's history changes
+        report = f"history_analytics:{days}"
+        cache_version = await get_history_cache_version(current_user.id)
+        analytics = await get_cached_analytics(current_user.id, cache_version, report)
+        if analytics is None:
+            search_history_service = get_search_history_service(db)
+            analytics = await asyncio.to_thread(
+                search_history_service.get_search_analytics,
+                user_id=current_user.id,
+                days=days
+            )
+            await cache_analytics(current_user.id, cache_version, analytics, report)
         
         # Log analytics access
         audit_service = get_audit_service(db)
@@ -136,7 +159,7 @@ async def get_search_analytics(
             }
         )
         
-        return analytics
+        return ORJSONResponse(analytics)
         
     except HTTPException:
         raise
@@ -144,7 +167,7 @@ async def get_search_analytics(
         raise HTTPException(status_code=500, detail=f"Failed to generate analytics: {str(e)}")
 
 @router.get("/similar/{search_id}")
-async def get_similar_searches(
+def get_similar_searches(
     search_id: int,
     limit: int = Query(10, le=50, description="Maximum number of similar searches"),
     db: Session = Depends(get_db),
@@ -156,7 +179,6 @@ async def get_similar_searches(
     """
     try:
         # First get the original search to extract the query
-        from app.models.search_history import SearchHistory
         original_search = db.query(SearchHistory).filter(
             SearchHistory.id == search_id,
             SearchHistory.user_id == current_user.id
@@ -172,7 +194,7 @@ async def get_similar_searches(
             limit=limit
         )
         
-        return similar_searches
+        return ORJSONResponse(similar_searches)
         
     except HTTPException:
         raise
@@ -191,27 +213,34 @@ async def delete_search_history(
     Removes the search and all associated notes and starred entities
     """
     try:
-        search_history_service = get_search_history_service(db)
-        success = search_history_service.delete_search_history(
-            user_id=current_user.id,
-            search_history_id=search_history_id
-        )
-        
-        if success:
-            # Log deletion action
-            audit_service = get_audit_service(db)
-            audit_service.log_action(
+        def delete_and_log() -> bool:
+            search_history_service = get_search_history_service(db)
+            success = search_history_service.delete_search_history(
                 user_id=current_user.id,
-                action="SEARCH_HISTORY_DELETE",
-                request=request,
-                resource=str(search_history_id),
-                resource_type="SEARCH_HISTORY",
-                success=True,
-                extra_data={
-                    "search_history_id": search_history_id
-                }
+                search_history_id=search_history_id
             )
             
+            if success:
+                # Log deletion action
+                audit_service = get_audit_service(db)
+                audit_service.log_action(
+                    user_id=current_user.id,
+                    action="SEARCH_HISTORY_DELETE",
+                    request=request,
+                    resource=str(search_history_id),
+                    resource_type="SEARCH_HISTORY",
+                    success=True,
+                    extra_data={
+                        "search_history_id": search_history_id
+                    }
+                )
+            return success
+        
+        # Blocking DB work runs in a worker thread; only the cache invalidation runs on the event loop
+        success = await asyncio.to_thread(delete_and_log)
+        await invalidate_history_cache(current_user.id)
+        
+        if success:
             return {"message": "Search history deleted successfully"}
         else:
             raise HTTPException(status_code=500, detail="Failed to delete search history")
@@ -233,27 +262,32 @@ async def bulk_delete_search_history(
     Useful for cleaning up old searches in batches
     """
     try:
-        search_history_service = get_search_history_service(db)
-        result = search_history_service.bulk_delete_search_history(
-            user_id=current_user.id,
-            search_history_ids=delete_request.search_history_ids
-        )
+        def delete_and_log() -> Dict[str, Any]:
+            search_history_service = get_search_history_service(db)
+            result = search_history_service.bulk_delete_search_history(
+                user_id=current_user.id,
+                search_history_ids=delete_request.search_history_ids
+            )
+            
+            # Log bulk deletion action
+            audit_service = get_audit_service(db)
+            audit_service.log_action(
+                user_id=current_user.id,
+                action="SEARCH_HISTORY_BULK_DELETE",
+                request=request,
+                resource=f"bulk_delete_{len(delete_request.search_history_ids)}_items",
+                resource_type="SEARCH_HISTORY",
+                success=result["success"],
+                extra_data={
+                    "total_requested": result["total_requested"],
+                    "deleted_count": result["deleted_count"],
+                    "failed_ids": result["failed_ids"]
+                }
+            )
+            return result
         
-        # Log bulk deletion action
-        audit_service = get_audit_service(db)
-        audit_service.log_action(
-            user_id=current_user.id,
-            action="SEARCH_HISTORY_BULK_DELETE",
-            request=request,
-            resource=f"bulk_delete_{len(delete_request.search_history_ids)}_items",
-            resource_type="SEARCH_HISTORY",
-            success=result["success"],
-            extra_data={
-                "total_requested": result["total_requested"],
-                "deleted_count": result["deleted_count"],
-                "failed_ids": result["failed_ids"]
-            }
-        )
+        result = await asyncio.to_thread(delete_and_log)
+        await invalidate_history_cache(current_user.id)
         
         return result
         
@@ -262,65 +296,63 @@ async def bulk_delete_search_history(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to bulk delete: {str(e)}")
 
+EXPORT_CSV_HEADERS = [
+    "id", "query", "search_type", "results_count", "risk_level", 
+    "created_at", "data_source", "execution_time_ms", "notes_count", 
+    "starred_count", "has_notes", "has_starred"
+]
+
+def iter_export_json(header: Dict[str, Any], items: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode {**header, "searches": [...]} incrementally, one item at a time"""
+    yield orjson.dumps(header)[:-1] + b',"searches":['
+    for index, item in enumerate(items):
+        yield (b"," if index else b"") + orjson.dumps(item)
+    yield b"]}"
+
 @router.get("/export")
-async def export_search_history(
+def export_search_history(
     request: Request,
-    format: str = Query("json", regex="^(json|csv)$", description="Export format"),
+    format: Literal["json", "csv"] = Query("json", description="Export format"),
     days: Optional[int] = Query(None, description="Number of days to export (all if not specified)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_analyst_or_above)
-) -> Dict[str, Any]:
+) -> StreamingResponse:
     """
     Export search history in various formats for compliance and analysis
-    Supports JSON and CSV formats
+    Supports JSON and CSV formats; rows are streamed straight from the database cursor
     """
     try:
         search_history_service = get_search_history_service(db)
         
-        # Get search history data
         date_from = datetime.utcnow() - timedelta(days=days) if days else None
+        total_searches = search_history_service.count_search_history(current_user.id, date_from)
+        items = search_history_service.iter_search_history_export(current_user.id, date_from)
         
-        history_data = search_history_service.get_search_history_with_filters(
+        # Log export action
+        audit_service = get_audit_service(db)
+        audit_service.log_export(
             user_id=current_user.id,
-            limit=10000,  # Large limit for export
-            offset=0,
-            date_from=date_from,
-            sort_by="created_at",
-            sort_order="desc"
+            export_type=format.upper(),
+            resource=f"search_history_{days or 'all'}days",
+            request=request,
+            record_count=total_searches
         )
         
+        filename = f"search_history_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{format}"
+        headers = {"Content-Disposition": f"attachment; filename={filename}"}
+        
         if format == "json":
-            export_data = {
+            header = {
                 "exported_at": datetime.utcnow().isoformat(),
                 "user_id": current_user.id,
                 "user_email": current_user.email,
                 "period_days": days,
-                "total_searches": history_data["total"],
-                "searches": history_data["items"]
-            }
-        else:  # CSV format
-            # For CSV, we'll return instructions on how to convert
-            export_data = {
-                "message": "CSV export format - convert JSON data to CSV using appropriate tools",
-                "csv_headers": [
-                    "id", "query", "search_type", "results_count", "risk_level", 
-                    "created_at", "data_source", "execution_time_ms", "notes_count", 
-                    "starred_count", "has_notes", "has_starred"
-                ],
-                "data": history_data["items"]
+                "total_searches": total_searches
             }
+            return StreamingResponse(iter_export_json(header, items), media_type="application/json", headers=headers)
         
-        # Log export action
-        audit_service = get_audit_service(db)
-        audit_service.log_export(
-            user_id=current_user.id,
-            export_type=format.upper(),
-            resource=f"search_history_{days or 'all'}days",
-            request=request,
-            record_count=history_data["total"]
-        )
-        
-        return export_data
+        rows = ([item[column] for column in EXPORT_CSV_HEADERS] for item in items)
+        return StreamingResponse(iter_csv_chunks(EXPORT_CSV_HEADERS, rows), media_type="text/csv", headers=headers)
         
     except HTTPException:
         raise
@@ -337,58 +369,53 @@ async def get_search_summary(
     Provides overview metrics for dashboard display
     """
     try:
-        from app.models.search_history import SearchHistory
-        from app.models.search_notes import SearchNote
-        from app.models.starred_entity import StarredEntity
-        from sqlalchemy import func
-        
-        # Basic counts
-        total_searches = db.query(SearchHistory).filter(
-            SearchHistory.user_id == current_user.id
-        ).count()
-        
-        # Searches in last 30 days
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_searches = db.query(SearchHistory).filter(
-            SearchHistory.user_id == current_user.id,
-            SearchHistory.created_at >= thirty_days_ago
-        ).count()
-        
-        # Total notes
-        total_notes = db.query(SearchNote).join(SearchHistory).filter(
-            SearchHistory.user_id == current_user.id
-        ).count()
+        # Dashboards poll this; serve from Redis until the TTL expires or the user's history changes
+        cache_version = await get_history_cache_version(current_user.id)
+        summary = await get_cached_analytics(current_user.id, cache_version, "summary")
+        if summary is not None:
+            return ORJSONResponse(summary)
         
-        # Total starred
-        total_starred = db.query(StarredEntity).join(SearchHistory).filter(
-            SearchHistory.user_id == current_user.id
-        ).count()
-        
-        # High risk searches
-        high_risk_searches = db.query(SearchHistory).filter(
-            SearchHistory.user_id == current_user.id,
-            SearchHistory.risk_level == 'HIGH'
-        ).count()
-        
-        # Most recent search
-        latest_search = db.query(SearchHistory).filter(
-            SearchHistory.user_id == current_user.id
-        ).order_by(SearchHistory.created_at.desc()).first()
+        def query_summary() -> Dict[str, Any]:
+            thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+            user_searches = SearchHistory.user_id == current_user.id
+            
+            # Notes and starred entities attached to the user's searches
+            notes_count = db.query(func.count(SearchNote.id)).join(SearchHistory).filter(user_searches).scalar_subquery()
+            starred_count = db.query(func.count(StarredEntity.id)).join(SearchHistory).filter(user_searches).scalar_subquery()
+            
+            # Most recent search as a JSON object (NULL when the user has no history)
+            latest_search_json = db.query(
+                func.json_build_object(
+                    "id", SearchHistory.id,
+                    "query", SearchHistory.query,
+                    "created_at", SearchHistory.created_at,
+                    "results_count", SearchHistory.results_count
+                )
+            ).filter(user_searches).order_by(SearchHistory.created_at.desc()).limit(1).scalar_subquery()
+            
+            # Every summary figure in one round trip, the counts via conditional aggregates over one scan
+            row = db.query(
+                func.count(SearchHistory.id).label("total_searches"),
+                func.count(SearchHistory.id).filter(SearchHistory.created_at >= thirty_days_ago).label("recent_searches"),
+                func.count(SearchHistory.id).filter(SearchHistory.risk_level == 'HIGH').label("high_risk_searches"),
+                notes_count.label("total_notes"),
+                starred_count.label("total_starred"),
+                latest_search_json.label("latest_search")
+            ).filter(user_searches).one()
+            
+            return {
+                "total_searches": row.total_searches,
+                "recent_searches_30d": row.recent_searches,
+                "total_notes": row.total_notes,
+                "total_starred": row.total_starred,
+                "high_risk_searches": row.high_risk_searches,
+                "latest_search": row.latest_search,
+                "generated_at": datetime.utcnow().isoformat()
+            }
         
-        return {
-            "total_searches": total_searches,
-            "recent_searches_30d": recent_searches,
-            "total_notes": total_notes,
-            "total_starred": total_starred,
-            "high_risk_searches": high_risk_searches,
-            "latest_search": {
-                "id": latest_search.id,
-                "query": latest_search.query,
-                "created_at": latest_search.created_at.isoformat(),
-                "results_count": latest_search.results_count
-            } if latest_search else None,
-            "generated_at": datetime.utcnow().isoformat()
-        }
+        summary = await asyncio.to_thread(query_summary)
+        await cache_analytics(current_user.id, cache_version, summary, "summary")
+        return ORJSONResponse(summary)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate summary: {str(e)}")
\ No newline at end of file
@@ -1,6 +1,8 @@
 # backend/app/core/auth.py
+import functools
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Union, Any
+from typing import Optional, Tuple, Union, Any
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
@@ -39,16 +41,30 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
-def decode_token(token: str) -> Optional[str]:
-    """Decode JWT token and return user ID"""
+@functools.lru_cache(maxsize=4096)
+def _verify_token(token: str) -> Optional[Tuple[Optional[str], Optional[float]]]:
+    """Verify a JWT once and return (subject, expiry timestamp); None if invalid
+
+    A token's signature and claims never change, so repeat requests with the same
+    bearer token skip the HMAC verification; expiry is re-checked on every call.
+    """
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=["HS256"]
         )
-        user_id: str = payload.get("sub")
-        return user_id
     except JWTError:
         return None
+    return payload.get("sub"), payload.get("exp")
+
+def decode_token(token: str) -> Optional[str]:
+    """Decode JWT token and return user ID"""
+    claims = _verify_token(token)
+    if claims is None:
+        return None
+    user_id, expires_at = claims
+    if expires_at is not None and expires_at <= time.time():
+        return None
+    return user_id
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -61,6 +77,8 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    # FastAPI resolves this dependency once per request even when several role checks depend on it;
+    # the user row is still read every request so deactivation and role changes apply immediately
     token = credentials.credentials
     user_id = decode_token(token)
     
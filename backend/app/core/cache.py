@@ -0,0 +1,65 @@
+# backend/app/core/cache.py
+"""
+Caching helpers: the shared async Redis client and small in-process caches
+for slow-changing upstream lookups
+"""
+import asyncio
+import functools
+import time
+from typing import Any, Awaitable, Callable, Optional, Tuple
+import redis.asyncio as redis_asyncio
+from app.core.config import settings
+
+_redis: Optional[redis_asyncio.Redis] = None
+
+def get_redis() -> redis_asyncio.Redis:
+    """Get the shared async Redis client, creating it on first use
+
+    Short socket timeouts keep a missing/unhealthy Redis from stalling requests;
+    callers treat cache errors as misses.
+    """
+    global _redis
+    if _redis is None:
+        _redis = redis_asyncio.from_url(settings.REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5)
+    return _redis
+
+async def close_redis() -> None:
+    """Close the shared Redis client"""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+def async_ttl_cache(ttl: float, ttl_for: Optional[Callable[[Any], float]] = None):
+    """
+    Cache the result of a parameterless coroutine function for ttl seconds
+
+    Concurrent callers share a single refresh, so at most one upstream call per
+    ttl reaches the network. Exceptions propagate and are never cached.
+    ttl_for, when given, picks the ttl from the result (e.g. shorter for failures).
+    """
+    def decorator(func: Callable[[], Awaitable[Any]]):
+        lock = asyncio.Lock()
+        cached: Optional[Tuple[Any, float]] = None
+
+        @functools.wraps(func)
+        async def wrapper():
+            nonlocal cached
+            if cached is not None and cached[1] > time.monotonic():
+                return cached[0]
+            async with lock:
+                # Another caller may have refreshed the value while we waited
+                if cached is not None and cached[1] > time.monotonic():
+                    return cached[0]
+                value = await func()
+                expires_in = ttl_for(value) if ttl_for is not None else ttl
+                cached = (value, time.monotonic() + expires_in)
+                return value
+
+        def cache_clear() -> None:
+            nonlocal cached
+            cached = None
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
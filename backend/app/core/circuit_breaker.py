@@ -0,0 +1,66 @@
+# backend/app/core/circuit_breaker.py
+"""
+Circuit breaker for upstream services
+Stops sending requests to a failing upstream so callers can fall back immediately
+instead of each waiting out a full timeout.
+"""
+import logging
+import time
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+class CircuitBreaker:
+    """
+    CLOSED -> OPEN after fail_max consecutive failures; while OPEN requests are
+    short-circuited. Once reset_timeout has passed a single probe request is let
+    through per reset_timeout window (HALF_OPEN): success closes the circuit,
+    failure keeps it open.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, fail_max: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failure_count = 0
+        self.opened_at = 0.0
+
+    def allow_request(self) -> bool:
+        """Whether a request to the upstream should be attempted"""
+        if self.state == self.CLOSED:
+            return True
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            # Let one probe through and restart the window for the next one
+            self.state = self.HALF_OPEN
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit '{self.name}' closed - upstream recovered")
+        self.state = self.CLOSED
+        self.failure_count = 0
+
+    def record_failure(self) -> None:
+        self.failure_count += 1
+        if self.state == self.HALF_OPEN or self.failure_count >= self.fail_max:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit '{self.name}' opened after {self.failure_count} consecutive failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current breaker state for status/diagnostic endpoints"""
+        retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)) if self.state != self.CLOSED else 0.0
+        return {
+            "state": self.state,
+            "failure_count": self.failure_count,
+            "fail_max": self.fail_max,
+            "retry_in_seconds": round(retry_in, 1)
+        }
@@ -0,0 +1,27 @@
+# backend/app/core/csv_export.py
+"""
+Streaming CSV export helpers shared by the export endpoints
+"""
+import csv
+import io
+import itertools
+from typing import Any, Iterable, Iterator, List
+
+CSV_ROWS_PER_CHUNK = 500
+
+def iter_csv_chunks(headers: List[str], rows: Iterable[Iterable[Any]]) -> Iterator[bytes]:
+    """Encode CSV rows incrementally, yielding one encoded chunk per CSV_ROWS_PER_CHUNK rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, CSV_ROWS_PER_CHUNK))
+        if not batch:
+            break
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
@@ -0,0 +1,50 @@
+# backend/app/core/http_client.py
+"""
+Shared outbound HTTP client
+A single pooled httpx.AsyncClient reused by every request, so calls to OpenSanctions
+and Elasticsearch ride on keep-alive connections instead of a new TCP/TLS handshake each time.
+With HTTP/2 enabled, concurrent calls to the same upstream multiplex over one connection.
+"""
+import importlib.util
+import logging
+from typing import Optional
+import httpx
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+HTTP_CLIENT_LIMITS = httpx.Limits(max_connections=1000, max_keepalive_connections=100, keepalive_expiry=60)
+def upstream_timeout(read: float) -> httpx.Timeout:
+    """Timeout that fails fast on connect/pool/write and only gives slow reads the long budget"""
+    return httpx.Timeout(connect=1.0, read=read, write=5.0, pool=1.0)
+
+HTTP_CLIENT_TIMEOUT = upstream_timeout(30.0)
+
+_client: Optional[httpx.AsyncClient] = None
+
+def _http2_enabled() -> bool:
+    """HTTP/2 needs the h2 package (httpx[http2]); without it fall back to HTTP/1.1 instead of failing"""
+    if not settings.HTTP_CLIENT_HTTP2:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP_CLIENT_HTTP2 is enabled but the h2 package is not installed - using HTTP/1.1")
+        return False
+    return True
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=_http2_enabled(),
+            limits=HTTP_CLIENT_LIMITS,
+            timeout=HTTP_CLIENT_TIMEOUT
+        )
+    return _client
+
+async def close_http_client() -> None:
+    """Close the shared client and its pooled connections"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -18,53 +18,46 @@ def require_role(allowed_roles: list[UserRole]):
         return wrapper
     return decorator
 
-# Role-based permission dependencies
-async def require_admin(current_user: User = Depends(get_current_user)) -> User:
-    """Require admin role"""
-    if current_user.role != UserRole.ADMIN.value and not current_user.is_superuser:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Admin privileges required"
-        )
-    return current_user
-
-async def require_compliance_officer_or_above(current_user: User = Depends(get_current_user)) -> User:
-    """Require compliance officer role or higher"""
-    allowed_roles = [UserRole.ADMIN.value, UserRole.COMPLIANCE_OFFICER.value]
-    if current_user.role not in allowed_roles and not current_user.is_superuser:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Compliance officer privileges or higher required"
-        )
-    return current_user
+# Role sets checked on every request, built once at import
+ADMIN_ROLES = frozenset((UserRole.ADMIN.value,))
+COMPLIANCE_OFFICER_OR_ABOVE_ROLES = ADMIN_ROLES | {UserRole.COMPLIANCE_OFFICER.value}
+ANALYST_OR_ABOVE_ROLES = COMPLIANCE_OFFICER_OR_ABOVE_ROLES | {UserRole.ANALYST.value}
+
+def require_roles(allowed_roles: frozenset, detail: str):
+    """Build a dependency that admits superusers and users whose role is in allowed_roles"""
+    async def dependency(current_user: User = Depends(get_current_user)) -> User:
+        if current_user.role not in allowed_roles and not current_user.is_superuser:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=detail
+            )
+        return current_user
+    return dependency
 
-async def require_analyst_or_above(current_user: User = Depends(get_current_user)) -> User:
-    """Require analyst role or higher"""
-    allowed_roles = [UserRole.ADMIN.value, UserRole.COMPLIANCE_OFFICER.value, UserRole.ANALYST.value]
-    if current_user.role not in allowed_roles and not current_user.is_superuser:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Analyst privileges or higher required"
-        )
-    return current_user
+# Role-based permission dependencies
+require_admin = require_roles(ADMIN_ROLES, "Admin privileges required")
+require_compliance_officer_or_above = require_roles(
+    COMPLIANCE_OFFICER_OR_ABOVE_ROLES, "Compliance officer privileges or higher required"
+)
+require_analyst_or_above = require_roles(ANALYST_OR_ABOVE_ROLES, "Analyst privileges or higher required")
 
 # Permission checking functions
 def can_export_reports(user: User) -> bool:
     """Check if user can export reports"""
-    return user.role in [UserRole.ADMIN.value, UserRole.COMPLIANCE_OFFICER.value] or user.is_superuser
+    return user.role in COMPLIANCE_OFFICER_OR_ABOVE_ROLES or user.is_superuser
 
 def can_manage_users(user: User) -> bool:
     """Check if user can manage other users"""
-    return user.role == UserRole.ADMIN.value or user.is_superuser
+    return user.role in ADMIN_ROLES or user.is_superuser
 
 def can_view_audit_logs(user: User) -> bool:
     """Check if user can view audit logs"""
-    return user.role == UserRole.ADMIN.value or user.is_superuser
+    return user.role in ADMIN_ROLES or user.is_superuser
 
 def can_search_entities(user: User) -> bool:
     """Check if user can search entities"""
-    return user.role in [UserRole.ADMIN.value, UserRole.COMPLIANCE_OFFICER.value, UserRole.ANALYST.value] or user.is_superuser
+    return user.role in ANALYST_OR_ABOVE_ROLES or user.is_superuser
 
 def can_star_entities(user: User) -> bool:
     """Check if user can star/bookmark entities"""
-    return user.role in [UserRole.ADMIN.value, UserRole.COMPLIANCE_OFFICER.value, UserRole.ANALYST.value] or user.is_superuser
\ No newline at end of file
+    return user.role in ANALYST_OR_ABOVE_ROLES or user.is_superuser
\ No newline at end of file
@@ -0,0 +1,165 @@
+# backend/app/core/queued_writer.py
+"""
+Queue-backed batched INSERTs for high-volume request paths
+Endpoints enqueue column dicts without touching the database; a single background
+task drains the queue and writes each batch with one multi-row INSERT and one commit.
+A batch that fails is retried in smaller parts, so only rows that cannot be written are dropped.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from sqlalchemy import insert
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+class QueuedInsertWriter:
+    """
+    Buffers rows for one model and flushes up to max_batch_size rows at a time, or
+    whatever has arrived flush_interval seconds after the first row of a batch.
+    after_write, when given, is awaited with each batch once it has been committed.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        model,
+        timestamp_column: Optional[str] = None,
+        max_batch_size: int = 500,
+        flush_interval: float = 0.1,
+        after_write: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None
+    ):
+        self.model = model
+        self.timestamp_column = timestamp_column
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.after_write = after_write
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._fallback_tasks: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Start the background writer on the running event loop"""
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush every queued row, then stop the writer"""
+        if self._task is None:
+            return
+        self._queue.put_nowait(self._STOP)
+        await self._task
+        self._task = None
+
+    def enqueue(self, **row: Any) -> None:
+        """
+        Queue one row (model column values); falls back to a direct write if the writer is not running
+
+        Safe to call from the event loop and from threadpool workers (sync endpoints).
+        """
+        if self.timestamp_column:
+            # Stamp at enqueue time so queueing delay does not skew the recorded time
+            row.setdefault(self.timestamp_column, datetime.utcnow())
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if self._task is None:
+            if running_loop is not None:
+                # Never block the event loop on the fallback write
+                task = running_loop.create_task(self._write_and_notify([row]))
+                self._fallback_tasks.add(task)
+                task.add_done_callback(self._fallback_tasks.discard)
+            else:
+                self._write_rows([row])  # No event loop (e.g. a script) - nothing to notify
+            return
+        if running_loop is self._loop:
+            self._queue.put_nowait(row)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, row)
+
+    def write_now(self, **row: Any) -> bool:
+        """Insert one row immediately in its own transaction, for rows that must not wait in the queue (blocking)"""
+        if self.timestamp_column:
+            row.setdefault(self.timestamp_column, datetime.utcnow())
+        return bool(self._write_rows([row]))
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            # Wait for the first row, then collect up to max_batch_size rows or until flush_interval elapses
+            rows = []
+            item = await self._queue.get()
+            deadline = asyncio.get_running_loop().time() + self.flush_interval
+            while True:
+                if item is self._STOP:
+                    stopping = True
+                    break
+                rows.append(item)
+                timeout = deadline - asyncio.get_running_loop().time()
+                if len(rows) >= self.max_batch_size or timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+            if rows:
+                await self._write_and_notify(rows)
+
+    async def _write_and_notify(self, rows: List[Dict[str, Any]]) -> None:
+        written = await asyncio.to_thread(self._write_rows, rows)
+        if written and self.after_write is not None:
+            try:
+                await self.after_write(written)
+            except Exception as e:
+                logger.warning(f"Post-write hook for {self.model.__tablename__} failed: {str(e)}")
+
+    def _write_rows(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Insert rows and return the ones that were committed
+
+        The whole batch is tried in one transaction first. If that fails, each column
+        group and then each row of a failing group is retried on its own, so a bad
+        row only drops itself.
+        """
+        # executemany needs the same columns in every row, so rows from different call sites are grouped
+        rows_by_columns: Dict[frozenset, List[Dict[str, Any]]] = {}
+        for row in rows:
+            rows_by_columns.setdefault(frozenset(row), []).append(row)
+        groups = list(rows_by_columns.values())
+        db = SessionLocal()
+        try:
+            if self._insert(db, groups):
+                return rows
+            written: List[Dict[str, Any]] = []
+            for group in groups:
+                if len(groups) > 1 and self._insert(db, [group]):
+                    written.extend(group)
+                    continue
+                for row in group:
+                    if self._insert(db, [[row]], log_row=row):
+                        written.append(row)
+            return written
+        finally:
+            db.close()
+
+    def _insert(self, db, groups: List[List[Dict[str, Any]]], log_row: Optional[Dict[str, Any]] = None) -> bool:
+        try:
+            for group in groups:
+                db.execute(insert(self.model), group)
+            db.commit()
+            return True
+        except Exception as e:
+            db.rollback()
+            if log_row is not None:
+                logger.error(f"Dropped queued {self.model.__tablename__} row {log_row!r}: {str(e)}")
+            else:
+                count = sum(len(group) for group in groups)
+                logger.warning(f"Failed to write {count} queued {self.model.__tablename__} rows, retrying in smaller parts: {str(e)}")
+            return False
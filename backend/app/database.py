@@ -4,7 +4,17 @@ from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
 # Create database engine
-engine = create_engine(settings.DATABASE_URL)
+# pool_pre_ping drops connections the server closed while idle; JIT is off because it only adds
+# compile time to the short OLTP queries this API runs
+engine = create_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=True,
+    query_cache_size=1200,
+    connect_args={"options": "-c jit=off"}
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create declarative base
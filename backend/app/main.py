@@ -1,17 +1,31 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import structlog
 
-from app.core.config import settings
+from app.core.config import settings, setup_logging
 from app.api.v1.router import api_router
+from app.core.cache import close_redis
+from app.core.http_client import get_http_client, close_http_client
+from app.services.audit_service import audit_log_writer
+from app.services.search_history_service import search_history_writer
 
 logger = structlog.get_logger()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    setup_logging()
     logger.info("Starting SanctionsGuard Pro API")
+    get_http_client()
+    audit_log_writer.start()
+    search_history_writer.start()
     yield
+    await search_history_writer.stop()
+    await audit_log_writer.stop()
+    await close_http_client()
+    await close_redis()
     logger.info("Shutting down SanctionsGuard Pro API")
 
 app = FastAPI(
@@ -20,15 +34,20 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# History exports and analytics are large, repetitive JSON/CSV; small responses are sent as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Added last so it is outermost: preflights are answered before reaching compression
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["authorization", "content-type"],
 )
 
 app.include_router(api_router, prefix="/api/v1")
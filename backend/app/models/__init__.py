@@ -1,5 +1,6 @@
 from .user import User
 from .search_history import SearchHistory
+from .batch_result_artifact import BatchResultArtifact
 from .search_notes import SearchNote
 from .starred_entity import StarredEntity
 from .audit_log import AuditLog
@@ -11,6 +12,7 @@ from .risk_score import RiskScore, RiskLevel, ScoreType, ScoreStatus, ScoringDom
 __all__ = [
     "User", 
     "SearchHistory", 
+    "BatchResultArtifact",
     "SearchNote", 
     "StarredEntity", 
     "AuditLog",
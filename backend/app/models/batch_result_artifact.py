@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, LargeBinary, DateTime, ForeignKey, func
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class BatchResultArtifact(Base):
+    """Full results of a batch screening job, stored as a gzip-compressed JSON export document"""
+    __tablename__ = "batch_result_artifacts"
+
+    # One artifact per batch search; removed with its search_history row by ON DELETE CASCADE
+    search_history_id = Column(Integer, ForeignKey("search_history.id", ondelete="CASCADE"), primary_key=True)
+    data = Column(LargeBinary, nullable=False)  # gzip(orjson({"job_id", "summary", "results", "errors"}))
+    size = Column(Integer, nullable=False)  # Compressed size in bytes
+    created_at = Column(DateTime, server_default=func.timezone("utc", func.now()))
+    
+    # Relationships
+    search_history = relationship("SearchHistory", back_populates="results_artifact")
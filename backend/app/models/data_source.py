@@ -1,8 +1,8 @@
 # backend/app/models/data_source.py
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.database import Base
-from datetime import datetime
 
 class DataSource(Base):
     __tablename__ = "data_sources"
@@ -14,12 +14,12 @@ class DataSource(Base):
     format = Column(String, default="json")  # json, xml, csv
     authentication_method = Column(String, default="none")  # none, api_key, oauth, basic
     api_key = Column(String)  # Encrypted API key
-    headers = Column(JSON)  # Additional headers
+    headers = Column(JSONB)  # Additional headers
     update_frequency = Column(Integer, default=24)  # Hours between updates
     priority = Column(Integer, default=1)  # 1 = highest priority
     enabled = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.timezone("utc", func.now()))
+    updated_at = Column(DateTime, server_default=func.timezone("utc", func.now()), onupdate=func.timezone("utc", func.now()))
     
     # Relationships
     sync_logs = relationship("DataSourceSyncLog", back_populates="data_source")
@@ -39,7 +39,7 @@ class DataSourceSyncLog(Base):
     deleted_records = Column(Integer, default=0)
     duration_seconds = Column(Integer)
     triggered_by = Column(String)  # user_id or 'system'
-    metadata = Column(JSON)  # Additional sync metadata
+    sync_metadata = Column("metadata", JSONB)  # Additional sync metadata; "metadata" is reserved on declarative models
     
     # Relationships
     data_source = relationship("DataSource", back_populates="sync_logs")
@@ -52,14 +52,19 @@ class EntitySource(Base):
     entity_id = Column(String, nullable=False, index=True)  # External entity ID
     data_source_id = Column(Integer, ForeignKey("data_sources.id"), nullable=False)
     source_entity_id = Column(String, nullable=False)  # ID in source system
-    first_seen = Column(DateTime, default=datetime.utcnow)
-    last_seen = Column(DateTime, default=datetime.utcnow)
-    last_modified = Column(DateTime, default=datetime.utcnow)
+    first_seen = Column(DateTime, server_default=func.timezone("utc", func.now()))
+    last_seen = Column(DateTime, server_default=func.timezone("utc", func.now()))
+    last_modified = Column(DateTime, server_default=func.timezone("utc", func.now()))
     entity_hash = Column(String, index=True)  # Hash for change detection
-    raw_data = Column(JSON)  # Original entity data from source
-    normalized_data = Column(JSON)  # Normalized entity data
+    raw_data = Column(JSONB)  # Original entity data from source
+    normalized_data = Column(JSONB)  # Normalized entity data
     is_active = Column(Boolean, default=True)
     
+    # One row per source record; also the conflict target for the sync upsert
+    __table_args__ = (
+        UniqueConstraint('data_source_id', 'source_entity_id', name='uq_entity_source_src'),
+    )
+    
     # Relationships
     data_source = relationship("DataSource")
 
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Index, and_, func, or_, text
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
@@ -36,7 +37,7 @@ class EntityDirector(Base):
     is_effective_director = Column(Boolean, default=False, index=True)
     appointment_date = Column(DateTime, nullable=False)
     end_date = Column(DateTime)  # Null if still active
-    is_active = Column(Boolean, default=True, index=True)
+    is_active = Column(Boolean, default=True)
     
     # Qualification and Experience
     education_background = Column(Text)
@@ -56,21 +57,29 @@ class EntityDirector(Base):
     responsibilities = Column(Text)
     
     # Metadata
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.timezone("utc", func.now()))
+    updated_at = Column(DateTime, server_default=func.timezone("utc", func.now()), onupdate=func.timezone("utc", func.now()))
     notes = Column(Text)
     
+    # Active directors per entity; the partial index skips former directors entirely
+    __table_args__ = (Index('idx_entity_directors_entity_active', 'entity_id', postgresql_where=text('is_active')),)
+    
     # Relationships
     entity = relationship("SupervisedEntity", back_populates="directors")
     
     def __repr__(self):
         return f"<EntityDirector(id={self.id}, name='{self.full_name}', position='{self.position_title}')>"
 
-    @property
+    @hybrid_property
     def is_current(self):
         """Check if director is currently active"""
         return self.is_active and (self.end_date is None or self.end_date > datetime.utcnow())
     
+    @is_current.expression
+    def is_current(cls):
+        # Same check in SQL, e.g. query(EntityDirector).filter(EntityDirector.is_current)
+        return and_(cls.is_active, or_(cls.end_date.is_(None), cls.end_date > func.timezone("utc", func.now())))
+    
     @property
     def tenure_years(self):
         """Calculate years in current position"""
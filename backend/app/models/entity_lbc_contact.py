@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Index, and_, case, func, or_, text
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from app.database import Base
-from datetime import datetime
+from datetime import datetime, timedelta
 
 class EntityLBCContact(Base):
     """
@@ -34,10 +35,10 @@ class EntityLBCContact(Base):
     direct_supervisor = Column(String(200))
     appointment_date = Column(DateTime, nullable=False)
     end_date = Column(DateTime)  # Null if still active
-    is_active = Column(Boolean, default=True, index=True)
+    is_active = Column(Boolean, default=True)
     
     # LBC/FT Specific Information
-    is_primary_contact = Column(Boolean, default=False, index=True)
+    is_primary_contact = Column(Boolean, default=False)
     is_compliance_officer = Column(Boolean, default=False)
     lbc_ft_certification = Column(String(200))
     certification_date = Column(DateTime)
@@ -67,22 +68,31 @@ class EntityLBCContact(Base):
     response_time_avg_hours = Column(Integer)  # Average response time in hours
     
     # Metadata
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.timezone("utc", func.now()))
+    updated_at = Column(DateTime, server_default=func.timezone("utc", func.now()), onupdate=func.timezone("utc", func.now()))
     notes = Column(Text)
     
+    # Active contacts per entity (primary first); the partial index skips former contacts entirely
+    __table_args__ = (
+        Index('idx_entity_lbc_contacts_entity_primary_active', 'entity_id', 'is_primary_contact', postgresql_where=text('is_active')),
+    )
+    
     # Relationships
     entity = relationship("SupervisedEntity", back_populates="lbc_contacts")
     
     def __repr__(self):
         return f"<EntityLBCContact(id={self.id}, name='{self.full_name}', entity_id={self.entity_id})>"
 
-    @property
+    @hybrid_property
     def is_current(self):
         """Check if contact is currently active"""
         return self.is_active and (self.end_date is None or self.end_date > datetime.utcnow())
     
-    @property
+    @is_current.expression
+    def is_current(cls):
+        return and_(cls.is_active, or_(cls.end_date.is_(None), cls.end_date > func.timezone("utc", func.now())))
+    
+    @hybrid_property
     def certification_status(self):
         """Check certification validity"""
         if not self.certification_date:
@@ -93,7 +103,15 @@ class EntityLBCContact(Base):
         
         return "valid"
     
-    @property
+    @certification_status.expression
+    def certification_status(cls):
+        return case(
+            (cls.certification_date.is_(None), "not_certified"),
+            (cls.certification_expiry < func.timezone("utc", func.now()), "expired"),
+            else_="valid"
+        )
+    
+    @hybrid_property
     def training_status(self):
         """Check training currency"""
         if not self.lbc_ft_training_completed:
@@ -111,6 +129,18 @@ class EntityLBCContact(Base):
         
         return "current"
     
+    @training_status.expression
+    def training_status(cls):
+        # Whole days since training > 365 / > 300, as in the Python property
+        now = func.timezone("utc", func.now())
+        return case(
+            (cls.lbc_ft_training_completed.isnot(True), "incomplete"),
+            (cls.last_training_date.is_(None), "unknown"),
+            (cls.last_training_date <= now - timedelta(days=366), "overdue"),
+            (cls.last_training_date <= now - timedelta(days=301), "due_soon"),
+            else_="current"
+        )
+    
     @property
     def contact_summary(self):
         """Get contact information summary"""
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Text, Boolean, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, CheckConstraint, Index, func, or_, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from app.database import Base
-from datetime import datetime
+from datetime import datetime, timedelta
 import enum
 
 class RiskLevel(str, enum.Enum):
@@ -10,6 +12,13 @@ class RiskLevel(str, enum.Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
+# Score bands of width 20 (0-19, 20-39, ..., 80+), indexed by min(max(int(score) // 20, 0), 4)
+_RISK_LEVEL_BY_BAND = (RiskLevel.LOW, RiskLevel.LOW, RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.CRITICAL)
+_SCORE_INTERPRETATION_BY_BAND = ("Poor", "Weak", "Adequate", "Good", "Excellent")
+
+def _score_band(score: float) -> int:
+    return min(max(int(score) // 20, 0), 4)
+
 class ScoreType(str, enum.Enum):
     INHERENT_RISK = "inherent_risk"  # Risque inhérent
     RISK_MANAGEMENT_DEVICE = "risk_management_device"  # DMR - Dispositif de maîtrise des risques
@@ -35,22 +44,22 @@ class RiskScore(Base):
     entity_id = Column(Integer, ForeignKey("supervised_entities.id"), nullable=False, index=True)
     
     # Scoring Information
-    score_type = Column(Enum(ScoreType, values_callable=lambda obj: [e.value for e in obj]), nullable=False, index=True)
+    score_type = Column(String(32), nullable=False, index=True)  # ScoreType value
     score_value = Column(Float, nullable=False)  # 0-100 scale
-    risk_level = Column(Enum(RiskLevel, values_callable=lambda obj: [e.value for e in obj]), nullable=False, index=True)
+    risk_level = Column(String(32), nullable=False, index=True)  # RiskLevel value
     scoring_period = Column(String(50))  # e.g., "2023-Q4", "2024-Annual"
-    scoring_date = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    scoring_date = Column(DateTime, nullable=False, server_default=func.timezone("utc", func.now()), index=True)
     
     # Domain-specific scores (JSON structure for flexibility)
-    domain_scores = Column(JSON)  # {"organization": 75, "classification": 60, "filtering": 80}
+    domain_scores = Column(JSONB)  # {"organization": 75, "classification": 60, "filtering": 80}
     
     # Calculation Details
     calculation_method = Column(String(100))  # "automatic", "manual", "hybrid"
-    weighting_factors = Column(JSON)  # Pondérations used in calculation
-    base_indicators = Column(JSON)  # Raw data used for scoring
+    weighting_factors = Column(JSONB)  # Pondérations used in calculation
+    base_indicators = Column(JSONB)  # Raw data used for scoring
     
     # Review and Validation
-    status = Column(Enum(ScoreStatus, values_callable=lambda obj: [e.value for e in obj]), default=ScoreStatus.DRAFT, index=True)
+    status = Column(String(32), default=ScoreStatus.DRAFT.value, index=True)  # ScoreStatus value
     reviewed_by = Column(Integer, ForeignKey("users.id"))
     review_date = Column(DateTime)
     approved_by = Column(Integer, ForeignKey("users.id"))
@@ -70,12 +79,21 @@ class RiskScore(Base):
     # Version Control
     version = Column(Integer, default=1)
     previous_score_id = Column(Integer, ForeignKey("risk_scores.id"))
-    is_current = Column(Boolean, default=True, index=True)
+    is_current = Column(Boolean, default=True)
     
     # Metadata
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.timezone("utc", func.now()))
+    updated_at = Column(DateTime, server_default=func.timezone("utc", func.now()), onupdate=func.timezone("utc", func.now()))
+    
+    __table_args__ = (
+        # Fixed vocabularies stored as plain strings; the enum classes above are the Python-side names
+        CheckConstraint("score_type IN ('inherent_risk', 'risk_management_device', 'net_risk')", name='ck_risk_scores_score_type'),
+        CheckConstraint("risk_level IN ('low', 'medium', 'high', 'critical')", name='ck_risk_scores_risk_level'),
+        CheckConstraint("status IN ('draft', 'pending_review', 'approved', 'rejected', 'archived')", name='ck_risk_scores_status'),
+        # Current score per entity, newest first; superseded versions stay out of the index
+        Index('idx_risk_scores_entity_current', 'entity_id', scoring_date.desc(), postgresql_where=text('is_current')),
+    )
     
     # Relationships
     entity = relationship("SupervisedEntity", back_populates="risk_scores")
@@ -97,17 +115,9 @@ class RiskScore(Base):
     @property
     def risk_level_from_score(self):
         """Calculate risk level based on final score"""
-        final = self.final_score
-        if final >= 80:
-            return RiskLevel.CRITICAL
-        elif final >= 60:
-            return RiskLevel.HIGH
-        elif final >= 40:
-            return RiskLevel.MEDIUM
-        else:
-            return RiskLevel.LOW
+        return _RISK_LEVEL_BY_BAND[_score_band(self.final_score)]
     
-    @property
+    @hybrid_property
     def is_overdue_for_review(self):
         """Check if score needs review (older than 12 months)"""
         if not self.scoring_date:
@@ -116,6 +126,14 @@ class RiskScore(Base):
         months_old = (datetime.utcnow() - self.scoring_date).days / 30
         return months_old > 12
     
+    @is_overdue_for_review.expression
+    def is_overdue_for_review(cls):
+        # More than 360 whole days old, as in the Python property; lets review queues use the scoring_date index
+        return or_(
+            cls.scoring_date.is_(None),
+            cls.scoring_date <= func.timezone("utc", func.now()) - timedelta(days=361)
+        )
+    
     @property
     def completion_percentage(self):
         """Calculate how complete the scoring is"""
@@ -152,11 +170,11 @@ class ScoringDomain(Base):
     
     # Weighting and Configuration
     default_weight = Column(Float, default=1.0)  # Default weighting factor
-    applicable_entity_types = Column(JSON)  # Which entity categories this applies to
+    applicable_entity_types = Column(JSONB)  # Which entity categories this applies to
     
     # Scoring Criteria
-    scoring_criteria = Column(JSON)  # Detailed scoring rubric
-    maturity_scale = Column(JSON)  # Maturity levels and descriptions
+    scoring_criteria = Column(JSONB)  # Detailed scoring rubric
+    maturity_scale = Column(JSONB)  # Maturity levels and descriptions
     
     # Status
     is_active = Column(Boolean, default=True, index=True)
@@ -164,8 +182,8 @@ class ScoringDomain(Base):
     
     # Metadata
     created_by = Column(Integer, ForeignKey("users.id"))
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.timezone("utc", func.now()))
+    updated_at = Column(DateTime, server_default=func.timezone("utc", func.now()), onupdate=func.timezone("utc", func.now()))
     
     # Relationships
     domain_analyses = relationship("ScoringDomainAnalysis", back_populates="domain", cascade="all, delete-orphan")
@@ -199,9 +217,9 @@ class ScoringDomainAnalysis(Base):
     recommendations = Column(Text)  # Recommended improvements
     
     # Supporting Evidence
-    evidence_sources = Column(JSON)  # List of evidence reviewed
-    questionnaire_responses = Column(JSON)  # Relevant questionnaire data
-    documentation_reviewed = Column(JSON)  # Documents analyzed
+    evidence_sources = Column(JSONB)  # List of evidence reviewed
+    questionnaire_responses = Column(JSONB)  # Relevant questionnaire data
+    documentation_reviewed = Column(JSONB)  # Documents analyzed
     
     # Expert Assessment
     maturity_level = Column(Integer)  # 1-5 maturity scale
@@ -211,13 +229,13 @@ class ScoringDomainAnalysis(Base):
     # Review Status
     is_complete = Column(Boolean, default=False)
     requires_follow_up = Column(Boolean, default=False)
-    follow_up_actions = Column(JSON)
+    follow_up_actions = Column(JSONB)
     
     # Metadata
     analyst_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    analysis_date = Column(DateTime, default=datetime.utcnow)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    analysis_date = Column(DateTime, server_default=func.timezone("utc", func.now()))
+    created_at = Column(DateTime, server_default=func.timezone("utc", func.now()))
+    updated_at = Column(DateTime, server_default=func.timezone("utc", func.now()), onupdate=func.timezone("utc", func.now()))
     
     # Relationships
     risk_score = relationship("RiskScore", back_populates="domain_analyses")
@@ -230,13 +248,4 @@ class ScoringDomainAnalysis(Base):
     @property
     def score_interpretation(self):
         """Get text interpretation of domain score"""
-        if self.domain_score >= 80:
-            return "Excellent"
-        elif self.domain_score >= 60:
-            return "Good"
-        elif self.domain_score >= 40:
-            return "Adequate"
-        elif self.domain_score >= 20:
-            return "Weak"
-        else:
-            return "Poor"
\ No newline at end of file
+        return _SCORE_INTERPRETATION_BY_BAND[_score_band(self.domain_score)]
\ No newline at end of file
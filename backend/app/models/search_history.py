@@ -1,12 +1,12 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, relationship
 from app.database import Base
-from datetime import datetime
 
 class SearchHistory(Base):
     __tablename__ = "search_history"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     query = Column(String, nullable=False)
     search_type = Column(String, default="Person")  # Person, Company, etc.
     results_count = Column(Integer, default=0)
@@ -14,12 +14,19 @@ class SearchHistory(Base):
     relevance_score = Column(Float, default=0.0)
     data_source = Column(String, default="opensanctions")  # opensanctions, mock
     execution_time_ms = Column(Integer, default=0)
+    job_id = Column(String(64), nullable=True, index=True)  # Batch screening job ID (batch searches only)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    results_data = Column(JSON, nullable=True)  # Store full search results
+    # Full search results; deferred so loading a search does not pull the TOASTed payload unless it is read
+    # (use options(undefer(SearchHistory.results_data)) when reading it for many rows)
+    results_data = deferred(Column(JSONB, nullable=True))
     notes = Column(Text, nullable=True)  # General notes for this search
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.timezone("utc", func.now()))
     
     # Relationships
     user = relationship("User", back_populates="search_history")
-    search_notes = relationship("SearchNote", back_populates="search_history", cascade="all, delete-orphan")
-    starred_entities = relationship("StarredEntity", back_populates="search_history", cascade="all, delete-orphan")
\ No newline at end of file
+    # passive_deletes: the ON DELETE CASCADE foreign keys remove children, so deleting a search
+    # does not first load its notes and starred entities
+    search_notes = relationship("SearchNote", back_populates="search_history", cascade="all, delete-orphan", passive_deletes=True)
+    starred_entities = relationship("StarredEntity", back_populates="search_history", cascade="all, delete-orphan", passive_deletes=True)
+    # Compressed full results of a batch search (results_data then only holds a summary reference)
+    results_artifact = relationship("BatchResultArtifact", back_populates="search_history", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
\ No newline at end of file
@@ -1,12 +1,11 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.database import Base
-from datetime import datetime
 
 class SearchNote(Base):
     __tablename__ = "search_notes"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     search_history_id = Column(Integer, ForeignKey("search_history.id"), nullable=False)
     entity_id = Column(String, nullable=False)  # ID of the specific entity from results
     entity_name = Column(String, nullable=False)  # Name of the entity for display
@@ -14,8 +13,11 @@ class SearchNote(Base):
     risk_assessment = Column(String, nullable=True)  # Additional risk notes
     action_taken = Column(String, nullable=True)  # What action was taken
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.timezone("utc", func.now()))
+    updated_at = Column(DateTime, server_default=func.timezone("utc", func.now()), onupdate=func.timezone("utc", func.now()))
+    
+    # Notes are loaded per search, optionally narrowed to one entity
+    __table_args__ = (Index('idx_search_notes_search_history_entity', 'search_history_id', 'entity_id'),)
     
     # Relationships
     search_history = relationship("SearchHistory", back_populates="search_notes")
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Text, Boolean, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, Enum, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.database import Base
-from datetime import datetime
 import enum
 
 class EntityCategory(str, enum.Enum):
@@ -48,7 +48,7 @@ class SupervisedEntity(Base):
     number_of_employees = Column(Integer)
     
     # Insurance Specific
-    activities_authorized = Column(JSON)  # List of authorized insurance activities
+    activities_authorized = Column(JSONB)  # List of authorized insurance activities
     license_number = Column(String(100))
     license_date = Column(DateTime)
     
@@ -78,8 +78,8 @@ class SupervisedEntity(Base):
     
     # Metadata
     created_by = Column(Integer, ForeignKey("users.id"))
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.timezone("utc", func.now()))
+    updated_at = Column(DateTime, server_default=func.timezone("utc", func.now()), onupdate=func.timezone("utc", func.now()))
     notes = Column(Text)
     
     # Relationships
@@ -1,7 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, func
 from sqlalchemy.orm import relationship
 from app.database import Base
-from datetime import datetime
 import enum
 
 class UserRole(str, enum.Enum):
@@ -23,7 +22,7 @@ class User(Base):
     department = Column(String)
     is_active = Column(Boolean, default=True)
     is_superuser = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.timezone("utc", func.now()))
     last_login = Column(DateTime)
     
     # Relationships
@@ -13,6 +13,7 @@ from fastapi import Request
 import re
 import hashlib
 
+from app.core.queued_writer import QueuedInsertWriter
 from app.models.audit_log import AuditLog
 from app.models.user import User
 
@@ -38,6 +39,9 @@ class AuditService:
         'LOW': ['LOGIN', 'LOGOUT', 'SEARCH_INDIVIDUAL', 'SEARCH_BATCH', 'EXPORT_CSV']
     }
     
+    # Written synchronously instead of through the queue, so they are committed before the request returns
+    SYNCHRONOUS_CATEGORIES = {'AUTHENTICATION', 'SECURITY', 'USER_MANAGEMENT'}
+    
     def __init__(self, db: Session):
         self.db = db
     
@@ -50,11 +54,18 @@ class AuditService:
         resource_type: str = None,
         success: bool = True,
         extra_data: Dict[str, Any] = None,
-        session_id: str = None
-    ) -> AuditLog:
+        session_id: str = None,
+        synchronous: bool = False
+    ) -> None:
         """
         Log a user action with comprehensive tracking
         
+        The row is handed to the queued audit writer and inserted in a batch after the
+        request, so audit logging never adds a database round trip to the caller.
+        Security, authentication and user management events, high-risk actions and
+        synchronous=True calls are committed before returning instead; that write blocks,
+        so async endpoints run those calls through asyncio.to_thread.
+        
         Args:
             user_id: ID of the user performing the action
             action: The action being performed (e.g., 'LOGIN', 'SEARCH', 'EXPORT')
@@ -64,9 +75,8 @@ class AuditService:
             success: Whether the action was successful
             extra_data: Additional context data
             session_id: Session identifier
+            synchronous: Write the row before returning instead of queueing it
         
-        Returns:
-            Created AuditLog instance
         """
         try:
             # Determine category
@@ -111,10 +121,10 @@ class AuditService:
                 # If enhanced fields don't exist, just use basic fields
                 pass
                 
-            audit_log = AuditLog(**audit_data)
-            
-            self.db.add(audit_log)
-            self.db.commit()
+            if synchronous or category in self.SYNCHRONOUS_CATEGORIES or risk_level == 'HIGH':
+                audit_log_writer.write_now(**audit_data)
+            else:
+                audit_log_writer.enqueue(**audit_data)
             
             # Log to application logs for monitoring
             log_level = logging.WARNING if not success or risk_level == 'HIGH' else logging.INFO
@@ -124,12 +134,9 @@ class AuditService:
                 f"from IP {ip_address} - {'SUCCESS' if success else 'FAILED'}"
             )
             
-            return audit_log
-            
         except Exception as e:
             logger.error(f"Failed to create audit log: {str(e)}")
             # Don't fail the main operation if audit logging fails
-            return None
     
     def log_authentication(
         self,
@@ -139,7 +146,7 @@ class AuditService:
         username: str = None,
         success: bool = True,
         failure_reason: str = None
-    ) -> AuditLog:
+    ) -> None:
         """Log authentication events with enhanced security tracking"""
         extra_data = {
             'username': username,
@@ -154,7 +161,8 @@ class AuditService:
             resource=username,
             resource_type='USER',
             success=success,
-            extra_data=extra_data
+            extra_data=extra_data,
+            synchronous=True
         )
     
     def log_search(
@@ -166,7 +174,7 @@ class AuditService:
         request: Request,
         filters: Dict[str, Any] = None,
         execution_time: float = None
-    ) -> AuditLog:
+    ) -> None:
         """Log search activities with detailed parameters"""
         extra_data = {
             'query': query[:100],  # Truncate long queries
@@ -195,7 +203,7 @@ class AuditService:
         request: Request,
         record_count: int = None,
         file_size: int = None
-    ) -> AuditLog:
+    ) -> None:
         """Log data export activities for compliance tracking"""
         extra_data = {
             'export_type': export_type,
@@ -222,7 +230,7 @@ class AuditService:
         entity_name: str,
         request: Request,
         reason: str = None
-    ) -> AuditLog:
+    ) -> None:
         """Log blacklist management actions for security tracking"""
         extra_data = {
             'entity_name': entity_name,
@@ -364,4 +372,18 @@ audit_service = None
 
 def get_audit_service(db: Session) -> AuditService:
     """Get audit service instance"""
-    return AuditService(db)
\ No newline at end of file
+    return AuditService(db)
+
+class AuditLogWriter(QueuedInsertWriter):
+    """
+    Queue-backed audit writer for high-volume request paths
+    
+    Endpoints enqueue AuditLog column dicts without touching the database, so request
+    handlers never wait on an audit round-trip.
+    """
+    
+    def __init__(self, max_batch_size: int = 500, flush_interval: float = 0.1):
+        super().__init__(AuditLog, timestamp_column='timestamp', max_batch_size=max_batch_size, flush_interval=flush_interval)
+
+# Global queued audit writer, started and stopped by the application lifespan
+audit_log_writer = AuditLogWriter()
@@ -2,18 +2,23 @@
 Batch Processing Service for Excel Upload and Screening
 Handles Excel file upload, validation, and batch screening operations
 """
-import pandas as pd
 import logging
 import asyncio
+import gzip
 import httpx
-from typing import List, Dict, Any, Optional, Tuple
+import openpyxl
+import orjson
+import xlsxwriter
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Union, BinaryIO
 from datetime import datetime
 from dataclasses import dataclass
 from io import BytesIO
 from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.core.http_client import get_http_client
 from app.models.user import User
 from app.models.audit_log import AuditLog
+from app.models.batch_result_artifact import BatchResultArtifact
 from app.models.search_history import SearchHistory
 from app.services.fuzzy_matching import fuzzy_matching_service
 
@@ -39,12 +44,12 @@ class BatchProcessingService:
         self.max_batch_size = 1000  # Maximum records per batch
         self.timeout_per_record = 5.0  # Timeout per record in seconds
         
-    def validate_excel_template(self, file_content: bytes, template_type: str = "screening") -> Dict[str, Any]:
+    def validate_excel_template(self, file_content: Union[bytes, BinaryIO], template_type: str = "screening") -> Dict[str, Any]:
         """
         Validate uploaded Excel file against expected template
         
         Args:
-            file_content: Raw Excel file content
+            file_content: Raw Excel file content, or a seekable binary file holding it
             template_type: Type of template ('screening', 'pep', 'sanctions')
             
         Returns:
@@ -52,80 +57,32 @@ class BatchProcessingService:
         """
         try:
             # Read Excel file
-            df = pd.read_excel(BytesIO(file_content))
-            
-            # Define required columns for different templates
-            required_columns = {
-                "screening": [
-                    "name",  # Full name (required)
-                    "type"   # Person/Company (required)
-                ],
-                "enhanced_screening": [
-                    "name",           # Full name (required) 
-                    "type",           # Person/Company (required)
-                    "date_of_birth",  # Optional
-                    "place_of_birth", # Optional
-                    "nationality",    # Optional
-                    "country",        # Optional
-                    "reference_id"    # Optional internal reference
-                ]
-            }
-            
-            # Get expected columns
-            template_cols = required_columns.get(template_type, required_columns["screening"])
-            required_cols = ["name", "type"]  # Always required
-            optional_cols = [col for col in template_cols if col not in required_cols]
-            
-            # Check for required columns
-            missing_required = [col for col in required_cols if col not in df.columns]
-            if missing_required:
-                return {
-                    "valid": False,
-                    "error": f"Missing required columns: {missing_required}",
-                    "required_columns": required_cols,
-                    "optional_columns": optional_cols,
-                    "found_columns": list(df.columns),
-                    "records_count": 0
-                }
-            
-            # Validate data types and content
-            validation_errors = []
-            
-            # Check for empty names
-            empty_names = df[df['name'].isna() | (df['name'].str.strip() == '')].index.tolist()
-            if empty_names:
-                validation_errors.append(f"Empty names found in rows: {[i+2 for i in empty_names[:10]]}")  # +2 for Excel row numbers
-            
-            # Validate type column
-            valid_types = ['Person', 'Company', 'Organization']
-            if 'type' in df.columns:
-                invalid_types = df[~df['type'].isin(valid_types)]['type'].unique().tolist()
-                if invalid_types:
-                    validation_errors.append(f"Invalid entity types found: {invalid_types}. Valid types: {valid_types}")
-            
-            # Check batch size
-            if len(df) > self.max_batch_size:
-                validation_errors.append(f"File contains {len(df)} records. Maximum allowed: {self.max_batch_size}")
-            
-            # Remove empty rows
-            df_clean = df.dropna(subset=['name']).copy()
-            df_clean['name'] = df_clean['name'].str.strip()
-            df_clean = df_clean[df_clean['name'] != '']
+            columns, rows = self._read_excel_rows(file_content)
+            return self._validate_rows(columns, rows, template_type)
             
+        except Exception as e:
+            logger.error(f"Error validating Excel template: {str(e)}")
             return {
-                "valid": len(validation_errors) == 0,
-                "errors": validation_errors,
-                "warnings": [],
+                "valid": False,
+                "error": f"Failed to process Excel file: {str(e)}",
                 "template_type": template_type,
-                "records_count": len(df_clean),
-                "total_rows": len(df),
-                "empty_rows_removed": len(df) - len(df_clean),
-                "required_columns": required_cols,
-                "optional_columns": optional_cols,
-                "found_columns": list(df.columns),
-                "sample_data": df_clean.head(3).to_dict('records') if len(df_clean) > 0 else []
+                "records_count": 0
             }
+    
+    def validate_and_parse(self, file_content: Union[bytes, BinaryIO], template_type: str = "screening") -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Validate and parse an uploaded Excel file, reading the workbook only once
+        
+        Args:
+            file_content: Raw Excel file content, or a seekable binary file holding it
+            template_type: Type of template ('screening', 'pep', 'sanctions')
             
+        Returns:
+            Tuple of (validation results, entities to screen); entities is empty when validation fails
+        """
+        try:
+            columns, rows = self._read_excel_rows(file_content)
+            validation = self._validate_rows(columns, rows, template_type)
         except Exception as e:
             logger.error(f"Error validating Excel template: {str(e)}")
             return {
@@ -133,48 +90,173 @@ class BatchProcessingService:
                 "error": f"Failed to process Excel file: {str(e)}",
                 "template_type": template_type,
                 "records_count": 0
+            }, []
+        
+        if not validation["valid"]:
+            return validation, []
+        
+        try:
+            return validation, self._parse_rows(rows)
+        except Exception as e:
+            logger.error(f"Error parsing Excel data: {str(e)}")
+            raise Exception(f"Failed to parse Excel file: {str(e)}")
+    
+    def _read_excel_rows(self, file_content: Union[bytes, BinaryIO]) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """
+        Read the first worksheet as header columns plus one dict per data row
+        
+        Uses openpyxl's read-only streaming mode so no cell/style model is built.
+        Trailing blank rows are dropped, blank rows in between are kept.
+        A file object is handed to openpyxl as is, so the upload is never copied into memory.
+        """
+        source = BytesIO(file_content) if isinstance(file_content, (bytes, bytearray)) else file_content
+        workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+        try:
+            sheet_rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(sheet_rows, ())
+            columns = [
+                str(value) if value is not None else f"Unnamed: {idx}"
+                for idx, value in enumerate(header)
+            ]
+            
+            rows = []
+            last_non_empty = 0
+            for values in sheet_rows:
+                row = dict(zip(columns, values))
+                for column in columns[len(values):]:
+                    row[column] = None
+                rows.append(row)
+                if any(value is not None for value in values):
+                    last_non_empty = len(rows)
+            
+            return columns, rows[:last_non_empty]
+        finally:
+            workbook.close()
+    
+    @staticmethod
+    def _clean_name(value: Any) -> str:
+        return value.strip() if isinstance(value, str) else ("" if value is None else str(value).strip())
+    
+    def _validate_rows(self, columns: List[str], rows: List[Dict[str, Any]], template_type: str) -> Dict[str, Any]:
+        """Validate Excel rows against the expected template"""
+        # Define required columns for different templates
+        required_columns = {
+            "screening": [
+                "name",  # Full name (required)
+                "type"   # Person/Company (required)
+            ],
+            "enhanced_screening": [
+                "name",           # Full name (required) 
+                "type",           # Person/Company (required)
+                "date_of_birth",  # Optional
+                "place_of_birth", # Optional
+                "nationality",    # Optional
+                "country",        # Optional
+                "reference_id"    # Optional internal reference
+            ]
+        }
+        
+        # Get expected columns
+        template_cols = required_columns.get(template_type, required_columns["screening"])
+        required_cols = ["name", "type"]  # Always required
+        optional_cols = [col for col in template_cols if col not in required_cols]
+        
+        # Check for required columns
+        missing_required = [col for col in required_cols if col not in columns]
+        if missing_required:
+            return {
+                "valid": False,
+                "error": f"Missing required columns: {missing_required}",
+                "required_columns": required_cols,
+                "optional_columns": optional_cols,
+                "found_columns": columns,
+                "records_count": 0
             }
+        
+        # Validate data types and content
+        validation_errors = []
+        
+        # Check for empty names
+        empty_names = [i for i, row in enumerate(rows) if not self._clean_name(row['name'])]
+        if empty_names:
+            validation_errors.append(f"Empty names found in rows: {[i+2 for i in empty_names[:10]]}")  # +2 for Excel row numbers
+        
+        # Validate type column
+        valid_types = ['Person', 'Company', 'Organization']
+        invalid_types = list(dict.fromkeys(row['type'] for row in rows if row['type'] not in valid_types))
+        if invalid_types:
+            validation_errors.append(f"Invalid entity types found: {invalid_types}. Valid types: {valid_types}")
+        
+        # Check batch size
+        if len(rows) > self.max_batch_size:
+            validation_errors.append(f"File contains {len(rows)} records. Maximum allowed: {self.max_batch_size}")
+        
+        # Remove empty rows
+        clean_rows = [
+            {**row, 'name': self._clean_name(row['name'])}
+            for row in rows if self._clean_name(row['name'])
+        ]
+        
+        return {
+            "valid": len(validation_errors) == 0,
+            "errors": validation_errors,
+            "warnings": [],
+            "template_type": template_type,
+            "records_count": len(clean_rows),
+            "total_rows": len(rows),
+            "empty_rows_removed": len(rows) - len(clean_rows),
+            "required_columns": required_cols,
+            "optional_columns": optional_cols,
+            "found_columns": columns,
+            "sample_data": clean_rows[:3]
+        }
     
-    def parse_excel_data(self, file_content: bytes) -> List[Dict[str, Any]]:
+    def parse_excel_data(self, file_content: Union[bytes, BinaryIO]) -> List[Dict[str, Any]]:
         """
         Parse Excel file and extract screening data
         
         Args:
-            file_content: Raw Excel file content
+            file_content: Raw Excel file content, or a seekable binary file holding it
             
         Returns:
             List of entities to screen
         """
         try:
-            df = pd.read_excel(BytesIO(file_content))
-            
-            # Clean and prepare data
-            df_clean = df.dropna(subset=['name']).copy()
-            df_clean['name'] = df_clean['name'].str.strip()
-            df_clean = df_clean[df_clean['name'] != '']
-            
-            # Convert to list of dictionaries
-            entities = []
-            for idx, row in df_clean.iterrows():
-                entity = {
-                    "row_number": idx + 1,  # Excel row number (1-based)
-                    "name": str(row['name']).strip(),
-                    "type": str(row.get('type', 'Person')).strip(),
-                    "date_of_birth": str(row.get('date_of_birth', '')).strip() if pd.notna(row.get('date_of_birth')) else '',
-                    "place_of_birth": str(row.get('place_of_birth', '')).strip() if pd.notna(row.get('place_of_birth')) else '',
-                    "nationality": str(row.get('nationality', '')).strip() if pd.notna(row.get('nationality')) else '',
-                    "country": str(row.get('country', '')).strip() if pd.notna(row.get('country')) else '',
-                    "reference_id": str(row.get('reference_id', '')).strip() if pd.notna(row.get('reference_id')) else '',
-                    "original_row": row.to_dict()  # Keep original data
-                }
-                entities.append(entity)
-            
-            return entities
+            _, rows = self._read_excel_rows(file_content)
+            return self._parse_rows(rows)
             
         except Exception as e:
             logger.error(f"Error parsing Excel data: {str(e)}")
             raise Exception(f"Failed to parse Excel file: {str(e)}")
     
+    def _parse_rows(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Extract screening entities from Excel rows"""
+        def optional_field(row: Dict[str, Any], column: str) -> str:
+            value = row.get(column)
+            return str(value).strip() if value is not None else ''
+        
+        entities = []
+        for idx, row in enumerate(rows):
+            # Skip rows without a name
+            name = self._clean_name(row.get('name'))
+            if not name:
+                continue
+            
+            entity = {
+                "row_number": idx + 1,  # Excel row number (1-based)
+                "name": name,
+                "type": optional_field(row, 'type') or 'Person',
+                "date_of_birth": optional_field(row, 'date_of_birth'),
+                "place_of_birth": optional_field(row, 'place_of_birth'),
+                "nationality": optional_field(row, 'nationality'),
+                "country": optional_field(row, 'country'),
+                "reference_id": optional_field(row, 'reference_id'),
+                "original_row": row  # Keep original data
+            }
+            entities.append(entity)
+        
+        return entities
+    
     async def process_batch_screening(
         self, 
         entities: List[Dict[str, Any]], 
@@ -207,10 +289,11 @@ class BatchProcessingService:
         try:
             # Process entities in parallel batches
             batch_size = min(50, len(entities))  # Process up to 50 entities at once
+            screenings = {}  # Shared across batches so repeated rows are screened once per job
             
             for i in range(0, len(entities), batch_size):
                 batch_entities = entities[i:i + batch_size]
-                batch_results = await self._process_entity_batch(batch_entities, dataset, job_id, date_filters, limit)
+                batch_results = await self._process_entity_batch(batch_entities, dataset, job_id, date_filters, limit, screenings)
                 
                 for entity_result in batch_results:
                     processed += 1
@@ -259,7 +342,8 @@ class BatchProcessingService:
         dataset: str,
         job_id: str,
         date_filters: Optional[Dict[str, str]] = None,
-        limit: int = 20
+        limit: int = 20,
+        screenings: Optional[Dict[Tuple[str, str, str], asyncio.Future]] = None
     ) -> List[Dict[str, Any]]:
         """
         Process a single batch of entities
@@ -268,41 +352,69 @@ class BatchProcessingService:
             entities: Batch of entities to process
             dataset: OpenSanctions dataset
             job_id: Batch job identifier
+            screenings: In-flight/finished screenings by screening key, shared across a job's batches
             
         Returns:
             List of results for this batch
         """
         batch_results = []
         opensanctions_url = settings.OPENSANCTIONS_BASE_URL
+        if screenings is None:
+            screenings = {}
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # Create tasks for parallel processing
-            tasks = []
-            for entity in entities:
-                task = self._screen_single_entity(client, entity, dataset, opensanctions_url, job_id, date_filters, limit)
-                tasks.append(task)
-            
-            # Process all entities in parallel
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Handle exceptions
-            final_results = []
-            for i, result in enumerate(batch_results):
-                if isinstance(result, Exception):
-                    logger.error(f"Error processing entity {entities[i]['name']}: {str(result)}")
-                    final_results.append({
-                        "entity_name": entities[i]['name'],
-                        "row_number": entities[i]['row_number'],
-                        "status": "error",
-                        "error": str(result),
-                        "results_count": 0,
-                        "matches": []
-                    })
-                else:
-                    final_results.append(result)
+        client = get_http_client()
+        # Create tasks for parallel processing; rows with the same name/country/type share one screening
+        tasks = []
+        for entity in entities:
+            key = self._screening_key(entity)
+            if key not in screenings:
+                screenings[key] = asyncio.ensure_future(
+                    self._screen_single_entity(client, entity, dataset, opensanctions_url, job_id, date_filters, limit)
+                )
+            tasks.append(screenings[key])
+        
+        # Process all entities in parallel
+        batch_results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Handle exceptions
+        final_results = []
+        for i, result in enumerate(batch_results):
+            if isinstance(result, Exception):
+                logger.error(f"Error processing entity {entities[i]['name']}: {str(result)}")
+                final_results.append({
+                    "entity_name": entities[i]['name'],
+                    "row_number": entities[i]['row_number'],
+                    "status": "error",
+                    "error": str(result),
+                    "results_count": 0,
+                    "matches": []
+                })
+            else:
+                final_results.append(self._result_for_entity(result, entities[i]))
         
         return final_results
     
+    @staticmethod
+    def _screening_key(entity: Dict[str, Any]) -> Tuple[str, str, str]:
+        """The entity fields that determine the OpenSanctions queries for a row"""
+        return (entity['name'], entity.get('country') or '', entity.get('type') or '')
+    
+    @staticmethod
+    def _result_for_entity(result: Dict[str, Any], entity: Dict[str, Any]) -> Dict[str, Any]:
+        """Re-label a shared screening result with the row-specific fields of a duplicate entity"""
+        if result.get("row_number") == entity['row_number']:
+            return result
+        relabelled = {**result, "row_number": entity['row_number']}
+        if "reference_id" in result:
+            relabelled["reference_id"] = entity.get('reference_id', '')
+            relabelled["additional_info"] = {
+                "date_of_birth": entity.get('date_of_birth', ''),
+                "place_of_birth": entity.get('place_of_birth', ''),
+                "nationality": entity.get('nationality', ''),
+                "country": entity.get('country', '')
+            }
+        return relabelled
+    
     async def _screen_single_entity(
         self, 
         client: httpx.AsyncClient, 
@@ -353,6 +465,7 @@ class BatchProcessingService:
                     params["changed_since"] = date_filters['date_from']
             
             # Try matching endpoint first for better fuzzy matching, fallback to search
+            opensanctions_data = None
             response = None
             try:
                 # Build matching query payload
@@ -386,7 +499,7 @@ class BatchProcessingService:
                 )
                 
                 if match_response.status_code == 200:
-                    match_data = match_response.json()
+                    match_data = orjson.loads(match_response.content)
                     match_results = match_data.get("results", [])
                     
                     # Convert matching results to search format
@@ -394,18 +507,13 @@ class BatchProcessingService:
                         query_matches = match_results[0].get("results", [])
                         
                         if len(query_matches) > 0:
-                            # Convert to search response format
-                            search_format_data = {
+                            opensanctions_data = {
                                 "results": query_matches,
                                 "total": {"value": len(query_matches)}
                             }
-                            response = type('Response', (), {
-                                'status_code': 200,
-                                'json': lambda: search_format_data
-                            })()
                 
                 # Fallback to search endpoint if matching fails
-                if not response or response.status_code != 200:
+                if opensanctions_data is None:
                     response = await client.get(
                         f"{opensanctions_url}/search/{dataset}",
                         params=params
@@ -417,8 +525,10 @@ class BatchProcessingService:
                     params=params
                 )
             
-            if response.status_code == 200:
-                opensanctions_data = response.json()
+            if opensanctions_data is None and response.status_code == 200:
+                opensanctions_data = orjson.loads(response.content)
+            
+            if opensanctions_data is not None:
                 opensanctions_results = opensanctions_data.get("results", [])
                 
                 # Enhance results with fuzzy matching
@@ -516,6 +626,72 @@ class BatchProcessingService:
         elif score_percent >= 50: return "MEDIUM"
         else: return "LOW"
     
+    def build_results_artifact(self, batch_result: BatchJobResult) -> Tuple[BatchResultArtifact, Dict[str, Any]]:
+        """
+        Compress full batch results into a gzip JSON export document
+        
+        CPU-bound; async callers should run it in a worker thread.
+        
+        Args:
+            batch_result: Results from batch processing
+            
+        Returns:
+            The artifact row to attach to the SearchHistory entry, and the
+            reference to store in SearchHistory.results_data
+        """
+        summary = {
+            "total_records": batch_result.total_records,
+            "successful_records": batch_result.successful_records,
+            "failed_records": batch_result.failed_records,
+            "processing_time_ms": batch_result.processing_time_ms,
+            "status": batch_result.status
+        }
+        document = orjson.dumps({
+            "job_id": batch_result.job_id,
+            "summary": summary,
+            "results": batch_result.results,
+            "errors": batch_result.errors
+        }, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        blob = gzip.compress(document)
+        
+        reference = {
+            "artifact": batch_result.job_id,
+            "size": len(blob),
+            "records": len(batch_result.results) + len(batch_result.errors),
+            "summary": summary
+        }
+        return BatchResultArtifact(data=blob, size=len(blob)), reference
+    
+    def get_results_artifact(self, db: Session, search_history_id: int) -> Optional[bytes]:
+        """Compressed export document of a batch search, or None if it is not stored"""
+        return db.query(BatchResultArtifact.data).filter(
+            BatchResultArtifact.search_history_id == search_history_id
+        ).scalar()
+    
+    def iter_results_artifact(self, blob: bytes, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Stream the decompressed JSON export document of a stored batch artifact"""
+        with gzip.GzipFile(fileobj=BytesIO(blob), mode="rb") as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+    
+    def load_results_artifact(self, blob: bytes) -> Dict[str, Any]:
+        """Parse a stored batch artifact (job_id, summary, results, errors)"""
+        return orjson.loads(gzip.decompress(blob))
+    
+    def load_batch_results(self, db: Session, search_history_id: int, results_data: Any) -> Optional[List[Dict[str, Any]]]:
+        """
+        Resolve SearchHistory.results_data to the list of per-entity results
+        
+        Returns None when results_data references an artifact that is no longer stored.
+        """
+        if isinstance(results_data, dict) and results_data.get("artifact"):
+            blob = self.get_results_artifact(db, search_history_id)
+            if blob is None:
+                return None
+            document = self.load_results_artifact(blob)
+            return document["results"] + document["errors"]
+        return results_data or []
+    
     def generate_results_excel(self, batch_result: BatchJobResult) -> bytes:
         """
         Generate Excel file with batch screening results
@@ -529,12 +705,12 @@ class BatchProcessingService:
         try:
             # Prepare summary data
             summary_data = {
-                "Job ID": [batch_result.job_id],
-                "Total Records": [batch_result.total_records],
-                "Successful": [batch_result.successful_records],
-                "Failed": [batch_result.failed_records],
-                "Processing Time (ms)": [batch_result.processing_time_ms],
-                "Status": [batch_result.status]
+                "Job ID": batch_result.job_id,
+                "Total Records": batch_result.total_records,
+                "Successful": batch_result.successful_records,
+                "Failed": batch_result.failed_records,
+                "Processing Time (ms)": batch_result.processing_time_ms,
+                "Status": batch_result.status
             }
             
             # Prepare detailed results
@@ -590,47 +766,52 @@ class BatchProcessingService:
                 }
                 detailed_results.append(error_data)
             
-            # Create Excel file in memory
+            # Prepare matches details (first 100 matches)
+            matches_data = []
+            for result in batch_result.results[:100]:  # Limit to first 100 entities
+                for match in result.get("matches", [])[:5]:  # Top 5 matches per entity
+                    matches_data.append({
+                        "Entity Name": result.get("entity_name", ""),
+                        "Row Number": result.get("row_number", ""),
+                        "Match Name": match.get("caption", ""),
+                        "Match Score": round(match.get("score", 0) * 100, 2),
+                        "Match Confidence": match.get("match_confidence", 0),
+                        "Match Type": match.get("match_type", ""),
+                        "Risk Level": match.get("risk_level", ""),
+                        "Entity Type": match.get("schema", ""),
+                        "Countries": ", ".join(match.get("properties", {}).get("country", [])),
+                        "Topics": ", ".join(match.get("properties", {}).get("topics", [])),
+                        "OpenSanctions ID": match.get("id", "")
+                    })
+            
+            # Create Excel file in memory; every sheet is written row by row so constant_memory mode is safe
             output = BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                # Write summary sheet
-                summary_df = pd.DataFrame(summary_data)
-                summary_df.to_excel(writer, sheet_name='Summary', index=False)
-                
-                # Write detailed results
-                results_df = pd.DataFrame(detailed_results)
-                results_df.to_excel(writer, sheet_name='Results', index=False)
-                
-                # Write matches details (first 100 matches)
-                if batch_result.results:
-                    matches_data = []
-                    for result in batch_result.results[:100]:  # Limit to first 100 entities
-                        for match in result.get("matches", [])[:5]:  # Top 5 matches per entity
-                            match_data = {
-                                "Entity Name": result.get("entity_name", ""),
-                                "Row Number": result.get("row_number", ""),
-                                "Match Name": match.get("caption", ""),
-                                "Match Score": round(match.get("score", 0) * 100, 2),
-                                "Match Confidence": match.get("match_confidence", 0),
-                                "Match Type": match.get("match_type", ""),
-                                "Risk Level": match.get("risk_level", ""),
-                                "Entity Type": match.get("schema", ""),
-                                "Countries": ", ".join(match.get("properties", {}).get("country", [])),
-                                "Topics": ", ".join(match.get("properties", {}).get("topics", [])),
-                                "OpenSanctions ID": match.get("id", "")
-                            }
-                            matches_data.append(match_data)
-                    
-                    if matches_data:
-                        matches_df = pd.DataFrame(matches_data)
-                        matches_df.to_excel(writer, sheet_name='Matches', index=False)
+            workbook = xlsxwriter.Workbook(output, {
+                "constant_memory": True,
+                "strings_to_formulas": False,
+                "strings_to_urls": False
+            })
+            header_format = workbook.add_format({"bold": True, "border": 1})
+            
+            self._write_sheet(workbook, "Summary", [summary_data], header_format)
+            self._write_sheet(workbook, "Results", detailed_results, header_format)
+            if matches_data:
+                self._write_sheet(workbook, "Matches", matches_data, header_format)
             
-            output.seek(0)
+            workbook.close()
             return output.getvalue()
             
         except Exception as e:
             logger.error(f"Error generating results Excel: {str(e)}")
             raise Exception(f"Failed to generate results Excel: {str(e)}")
+    
+    def _write_sheet(self, workbook: "xlsxwriter.Workbook", name: str, rows: List[Dict[str, Any]], header_format) -> None:
+        """Write dict rows to a new worksheet; columns are the union of keys in first-seen order"""
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        worksheet = workbook.add_worksheet(name)
+        worksheet.write_row(0, 0, columns, header_format)
+        for row_idx, row in enumerate(rows, start=1):
+            worksheet.write_row(row_idx, 0, [row.get(column) for column in columns])
 
 # Global instance
 batch_processing_service = BatchProcessingService()
\ No newline at end of file
@@ -9,6 +9,8 @@ import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
@@ -16,10 +18,14 @@ import hashlib
 import json
 
 from app.core.config import settings
+from app.models.data_source import DataSource, EntitySource
 from app.services.audit_service import get_audit_service
 
 logger = logging.getLogger(__name__)
 
+# Rows per INSERT ... ON CONFLICT statement when recording synced entities
+ENTITY_SOURCE_UPSERT_BATCH_SIZE = 1000
+
 @dataclass
 class DataSourceConfig:
     """Configuration for a data source"""
@@ -358,31 +364,32 @@ class DataSourceManager:
             last_update = self._get_last_update(adapter.config.name)
             raw_entities = await adapter.fetch_data(since=last_update)
             
-            # Process and normalize entities
+            # Process and normalize entities, keyed by source id so a repeated record upserts once
             processed_count = 0
-            new_count = 0
-            updated_count = 0
+            entity_rows: Dict[str, Dict[str, Any]] = {}
             
             for raw_entity in raw_entities:
                 try:
                     normalized_entity = adapter.normalize_entity(raw_entity)
+                    source_entity_id = raw_entity.get('id')
+                    if source_entity_id is None:
+                        raise ValueError("entity has no source id")
                     
-                    # Here you would typically save to database
-                    # For now, we'll just count
-                    entity_hash = self._calculate_entity_hash(normalized_entity)
-                    
-                    # Check if entity exists (simplified)
-                    if self._entity_exists(entity_hash):
-                        updated_count += 1
-                    else:
-                        new_count += 1
-                    
+                    entity_rows[str(source_entity_id)] = {
+                        'entity_id': normalized_entity['id'],
+                        'source_entity_id': str(source_entity_id),
+                        'entity_hash': self._calculate_entity_hash(normalized_entity),
+                        'raw_data': raw_entity,
+                        'normalized_data': normalized_entity
+                    }
                     processed_count += 1
                     
                 except Exception as e:
                     logger.warning(f"Failed to process entity: {str(e)}")
                     continue
             
+            new_count, updated_count = self._upsert_entity_sources(adapter.config.name, list(entity_rows.values()))
+            
             # Update last sync time
             self._update_last_sync(adapter.config.name, start_time)
             
@@ -432,19 +439,56 @@ class DataSourceManager:
         pass
     
     def _calculate_entity_hash(self, entity: Dict[str, Any]) -> str:
-        """Calculate hash for entity deduplication"""
-        # Create a hash based on key entity fields
-        key_data = {
-            'name': entity.get('name', ''),
-            'schema': entity.get('schema', ''),
-            'id': entity.get('id', '')
-        }
-        return hashlib.md5(json.dumps(key_data, sort_keys=True).encode()).hexdigest()
+        """Calculate hash of the normalized entity for change detection"""
+        # last_seen falls back to the sync time, so it would make every record look changed
+        content = {key: value for key, value in entity.items() if key != 'last_seen'}
+        return hashlib.md5(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
     
-    def _entity_exists(self, entity_hash: str) -> bool:
-        """Check if entity already exists in database"""
-        # This would typically check the database
-        return False
+    def _upsert_entity_sources(self, source_name: str, rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Record synced entities with one INSERT ... ON CONFLICT per batch
+        
+        Rows whose hash is unchanged are left untouched. Returns (new, updated) counts.
+        """
+        data_source_id = self.db.query(DataSource.id).filter(DataSource.name == source_name).scalar()
+        if data_source_id is None:
+            logger.warning(f"Data source {source_name} is not registered - synced entities were not recorded")
+            return 0, 0
+        
+        new_count = 0
+        updated_count = 0
+        try:
+            for start in range(0, len(rows), ENTITY_SOURCE_UPSERT_BATCH_SIZE):
+                batch = [
+                    {**row, 'data_source_id': data_source_id}
+                    for row in rows[start:start + ENTITY_SOURCE_UPSERT_BATCH_SIZE]
+                ]
+                stmt = insert(EntitySource).values(batch)
+                stmt = stmt.on_conflict_do_update(
+                    constraint='uq_entity_source_src',
+                    set_={
+                        'entity_id': stmt.excluded.entity_id,
+                        'entity_hash': stmt.excluded.entity_hash,
+                        'raw_data': stmt.excluded.raw_data,
+                        'normalized_data': stmt.excluded.normalized_data,
+                        'is_active': True,
+                        'last_seen': func.timezone('utc', func.now()),
+                        'last_modified': func.timezone('utc', func.now())
+                    },
+                    where=EntitySource.entity_hash.is_distinct_from(stmt.excluded.entity_hash)
+                ).returning(literal_column("xmax = 0").label("inserted"))  # xmax is 0 only for freshly inserted rows
+                
+                for inserted, in self.db.execute(stmt):
+                    if inserted:
+                        new_count += 1
+                    else:
+                        updated_count += 1
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        
+        return new_count, updated_count
     
     async def get_source_status(self, source_name: Optional[str] = None) -> Dict[str, DataSourceStatus]:
         """Get status of data sources"""
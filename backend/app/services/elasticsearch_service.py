@@ -3,6 +3,7 @@ import json
 import logging
 from typing import Dict, Any, Optional
 from app.core.config import settings
+from app.core.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -15,30 +16,30 @@ class ElasticsearchService:
     async def index_entity(self, entity: Dict[str, Any]) -> bool:
         """Index an entity in Elasticsearch for searching"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                # Create the index if it doesn't exist
-                await self._ensure_index_exists(client)
-                
-                # Index the entity
-                entity_id = entity.get("id")
-                index_url = f"{self.es_url}/{self.index_name}/_doc/{entity_id}"
-                
-                # Prepare entity data for indexing
-                indexed_data = self._prepare_entity_for_index(entity)
-                
-                response = await client.put(
-                    index_url,
-                    headers={"Content-Type": "application/json"},
-                    json=indexed_data
-                )
+            client = get_http_client()
+            # Create the index if it doesn't exist
+            await self._ensure_index_exists(client)
+            
+            # Index the entity
+            entity_id = entity.get("id")
+            index_url = f"{self.es_url}/{self.index_name}/_doc/{entity_id}"
+            
+            # Prepare entity data for indexing
+            indexed_data = self._prepare_entity_for_index(entity)
+            
+            response = await client.put(
+                index_url,
+                headers={"Content-Type": "application/json"},
+                json=indexed_data
+            )
+            
+            if response.status_code in [200, 201]:
+                logger.info(f"Successfully indexed entity {entity_id}")
+                return True
+            else:
+                logger.error(f"Failed to index entity {entity_id}: {response.status_code} - {response.text}")
+                return False
                 
-                if response.status_code in [200, 201]:
-                    logger.info(f"Successfully indexed entity {entity_id}")
-                    return True
-                else:
-                    logger.error(f"Failed to index entity {entity_id}: {response.status_code} - {response.text}")
-                    return False
-                    
         except Exception as e:
             logger.error(f"Error indexing entity: {str(e)}")
             return False
@@ -50,18 +51,18 @@ class ElasticsearchService:
     async def delete_entity(self, entity_id: int) -> bool:
         """Delete an entity from Elasticsearch"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                delete_url = f"{self.es_url}/{self.index_name}/_doc/{entity_id}"
-                
-                response = await client.delete(delete_url)
+            client = get_http_client()
+            delete_url = f"{self.es_url}/{self.index_name}/_doc/{entity_id}"
+            
+            response = await client.delete(delete_url)
+            
+            if response.status_code in [200, 404]:  # 404 is OK - entity not found
+                logger.info(f"Successfully deleted entity {entity_id} from index")
+                return True
+            else:
+                logger.error(f"Failed to delete entity {entity_id}: {response.status_code}")
+                return False
                 
-                if response.status_code in [200, 404]:  # 404 is OK - entity not found
-                    logger.info(f"Successfully deleted entity {entity_id} from index")
-                    return True
-                else:
-                    logger.error(f"Failed to delete entity {entity_id}: {response.status_code}")
-                    return False
-                    
         except Exception as e:
             logger.error(f"Error deleting entity from index: {str(e)}")
             return False
@@ -13,7 +13,7 @@ import Levenshtein
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True)
 class MatchResult:
     """Result of a fuzzy match operation"""
     score: float  # Confidence score 0-100
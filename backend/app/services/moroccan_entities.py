@@ -12,6 +12,8 @@ import os
 from datetime import datetime
 from pathlib import Path
 import logging
+import numpy as np
+import pandas as pd
 
 class MoroccanEntitiesService:
     
@@ -20,6 +22,8 @@ class MoroccanEntitiesService:
         self.jsonl_file_path = self._find_jsonl_file()
         self.entities = []
         self.last_modified = None
+        self.entities_version = 0
+        self._filter_options: Dict[str, Any] = {}
         self._load_entities_from_file()
     
     def _find_jsonl_file(self) -> Optional[str]:
@@ -42,8 +46,9 @@ class MoroccanEntitiesService:
     def _load_entities_from_file(self):
         """Load entities from JSONL file or fallback to hardcoded data"""
         if not self.jsonl_file_path or not os.path.exists(self.jsonl_file_path):
-            self.logger.warning("JSONL file not available, using hardcoded fallback data")
-            self.entities = self._load_fallback_entities()
+            if not self.entities:
+                self.logger.warning("JSONL file not available, using hardcoded fallback data")
+                self._set_entities(self._load_fallback_entities())
             return
         
         try:
@@ -70,14 +75,79 @@ class MoroccanEntitiesService:
                         self.logger.error(f"Invalid JSON on line {line_num}: {e}")
                         continue
             
-            self.entities = entities
             self.last_modified = current_modified
+            self._set_entities(entities)
             self.logger.info(f"Successfully loaded {len(entities)} entities from JSONL file")
             
         except Exception as e:
             self.logger.error(f"Failed to load JSONL file: {e}")
             if not self.entities:  # Only use fallback if no entities loaded yet
-                self.entities = self._load_fallback_entities()
+                self._set_entities(self._load_fallback_entities())
+    
+    def _set_entities(self, entities: List[Dict[str, Any]]):
+        """Replace the loaded entities and rebuild everything derived from them"""
+        self.entities = entities
+        self.entities_version += 1
+        self._filter_options = self._build_filter_options(entities)
+    
+    def _build_filter_options(self, entities: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Aggregate Morocco-specific filter options in one columnar pass over the entities"""
+        df = pd.DataFrame(entities, columns=["risk_level", "datasets", "properties"])
+        properties = df["properties"].map(lambda p: p if isinstance(p, dict) else {})
+        
+        def property_values(key: str) -> pd.Series:
+            values = properties.map(lambda p: p.get(key) or []).explode().dropna()
+            return values[values.astype(bool)]
+        
+        # Collect unique values
+        parties = property_values("politicalParty").unique()
+        regions = property_values("region").unique()
+        
+        # Count risk levels
+        risk_counts = df["risk_level"].fillna("LOW").value_counts()
+        risk_levels = {level: int(risk_counts.get(level, 0)) for level in ("HIGH", "MEDIUM", "LOW")}
+        
+        # Count position types (first matching dataset family wins)
+        datasets = df["datasets"].map(lambda d: d if isinstance(d, list) else []).explode().fillna("").astype(str)
+        position = np.select(
+            [
+                datasets.str.contains("parliament", regex=False).groupby(level=0).any().reindex(df.index, fill_value=False),
+                datasets.str.contains("regional", regex=False).groupby(level=0).any().reindex(df.index, fill_value=False),
+                datasets.str.contains("communal", regex=False).groupby(level=0).any().reindex(df.index, fill_value=False),
+            ],
+            ["parliament", "regional", "municipal"],
+            default=""
+        )
+        position_counts = pd.Series(position, dtype=object).value_counts()
+        position_types = {name: int(position_counts.get(name, 0)) for name in ("parliament", "regional", "municipal")}
+        
+        # Collect mandate years
+        mandates = property_values("mandate").astype(str)
+        mandate_years = mandates[mandates.str.fullmatch(r"\d{4}")].unique()
+        
+        return {
+            "political_parties": [
+                {"name": party, "label": party, "count": 0} 
+                for party in sorted(parties)
+            ],
+            "regions": [
+                {"name": region, "label": region, "count": 0} 
+                for region in sorted(regions)
+            ],
+            "risk_levels": [
+                {"name": level, "label": level, "count": count} 
+                for level, count in risk_levels.items()
+            ],
+            "position_types": [
+                {"name": "parliament", "label": "Parliament Members", "count": position_types["parliament"]},
+                {"name": "regional", "label": "Regional Officials", "count": position_types["regional"]},
+                {"name": "municipal", "label": "Municipal Officials", "count": position_types["municipal"]}
+            ],
+            "mandate_years": [
+                {"name": year, "label": year, "count": 0} 
+                for year in sorted(mandate_years, reverse=True)
+            ]
+        }
     
     def _enhance_jsonl_entity(self, entity_data: Dict[str, Any]) -> Dict[str, Any]:
         """Convert JSONL entity to full FollowTheMoney structure"""
@@ -366,6 +436,17 @@ class MoroccanEntitiesService:
     def get_all_entities(self) -> List[Dict[str, Any]]:
         """Get all Moroccan entities"""
         return self.entities.copy()
+    
+    def get_entities_version(self) -> str:
+        """Content version of the loaded entities (changes whenever the dataset is reloaded)"""
+        # Pick up file changes so derived data is rebuilt on hot-reload
+        self._load_entities_from_file()
+        return str(self.entities_version)
+    
+    def get_filter_options(self) -> Dict[str, Any]:
+        """Morocco-specific filter options, precomputed whenever the entities are (re)loaded"""
+        self._load_entities_from_file()
+        return self._filter_options
 
 # Global instance
 moroccan_entities_service = MoroccanEntitiesService()
\ No newline at end of file
@@ -649,7 +649,7 @@ class RiskScoringEngine:
             entity_id=entity_id,
             score_type=score_type,
             final_score=score_record.final_score,
-            risk_level=score_record.risk_level,
+            risk_level=RiskLevel(score_record.risk_level),
             domain_scores=[],  # Would need to load from domain_analyses
             calculation_details=score_record.base_indicators or {},
             confidence_level=0.8,  # Default
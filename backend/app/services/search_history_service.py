@@ -5,12 +5,16 @@ Provides comprehensive search history tracking, analytics, and management featur
 """
 
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+import orjson
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc, asc
+from sqlalchemy import and_, or_, func, desc, asc, delete, exists, tuple_
 from fastapi import HTTPException
+from rapidfuzz import fuzz, process
 
+from app.core.cache import get_redis
+from app.core.queued_writer import QueuedInsertWriter
 from app.models.search_history import SearchHistory
 from app.models.search_notes import SearchNote
 from app.models.starred_entity import StarredEntity
@@ -18,6 +22,116 @@ from app.models.user import User
 
 logger = logging.getLogger(__name__)
 
+HISTORY_CACHE_TTL_SECONDS = 60
+
+# /similar scores at most this many trigram candidates, and drops matches below the cutoff (0-100)
+SIMILARITY_CANDIDATE_LIMIT = 500
+SIMILARITY_SCORE_CUTOFF = 60
+
+# Every cached history page/report key embeds the user's history version. Writes bump the
+# version (one INCR, no keyspace SCAN), so older entries are never read again and expire on
+# their TTL. A read that started before a write caches under the old version, so it cannot
+# serve a stale page afterwards either.
+HISTORY_VERSION_TTL_SECONDS = 24 * 60 * 60
+
+def _history_version_key(user_id: int) -> str:
+    return f"history_version:{user_id}"
+
+async def get_history_cache_version(user_id: int) -> Optional[int]:
+    """Current history cache version for a user; read it before querying the database.
+    None when Redis is unavailable (callers then skip the cache)."""
+    try:
+        version = await get_redis().get(_history_version_key(user_id))
+        return int(version) if version else 0
+    except Exception as e:
+        logger.warning(f"Search history cache version read failed: {str(e)}")
+        return None
+
+def _history_cache_key(user_id: int, version: int, limit: int, offset: int) -> str:
+    return f"history:{user_id}:{version}:{limit}:{offset}"
+
+async def get_cached_history_page(user_id: int, version: Optional[int], limit: int, offset: int) -> Optional[Dict[str, Any]]:
+    """Get a cached /search/history page, or None on a miss (or when Redis is unavailable)"""
+    if version is None:
+        return None
+    try:
+        cached = await get_redis().get(_history_cache_key(user_id, version, limit, offset))
+        return orjson.loads(cached) if cached else None
+    except Exception as e:
+        logger.warning(f"Search history cache read failed: {str(e)}")
+        return None
+
+async def cache_history_page(user_id: int, version: Optional[int], limit: int, offset: int, page: Dict[str, Any]) -> None:
+    """Cache a /search/history page until the user's history next changes (or the TTL expires)"""
+    if version is None:
+        return
+    try:
+        await get_redis().set(_history_cache_key(user_id, version, limit, offset), orjson.dumps(page), ex=HISTORY_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Search history cache write failed: {str(e)}")
+
+ANALYTICS_CACHE_TTL_SECONDS = 60
+
+def _analytics_cache_key(user_id: int, version: int, report: str) -> str:
+    return f"history:{user_id}:{version}:{report}"
+
+async def get_cached_analytics(user_id: int, version: Optional[int], report: str = "analytics") -> Optional[Dict[str, Any]]:
+    """Get a cached analytics report (e.g. /search/analytics) for a user, or None on a miss (or when Redis is unavailable)"""
+    if version is None:
+        return None
+    try:
+        cached = await get_redis().get(_analytics_cache_key(user_id, version, report))
+        return orjson.loads(cached) if cached else None
+    except Exception as e:
+        logger.warning(f"Search analytics cache read failed: {str(e)}")
+        return None
+
+async def cache_analytics(user_id: int, version: Optional[int], analytics: Dict[str, Any], report: str = "analytics") -> None:
+    """Cache an analytics report for a user for ANALYTICS_CACHE_TTL_SECONDS or until their history changes"""
+    if version is None:
+        return
+    try:
+        await get_redis().set(_analytics_cache_key(user_id, version, report), orjson.dumps(analytics), ex=ANALYTICS_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Search analytics cache write failed: {str(e)}")
+
+async def invalidate_history_cache(user_id: int) -> None:
+    """Retire every cached history page and report for a user; call after any insert/delete of their search history"""
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            pipe.incr(_history_version_key(user_id))
+            pipe.expire(_history_version_key(user_id), HISTORY_VERSION_TTL_SECONDS)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Search history cache invalidation failed: {str(e)}")
+
+async def _invalidate_written_history(rows: List[Dict[str, Any]]) -> None:
+    for user_id in {row.get("user_id") for row in rows}:
+        await invalidate_history_cache(user_id)
+
+# Global queued history writer for interactive searches, started and stopped by the application lifespan
+search_history_writer = QueuedInsertWriter(
+    SearchHistory,
+    timestamp_column="created_at",
+    max_batch_size=200,
+    flush_interval=0.5,
+    after_write=_invalidate_written_history
+)
+
+# Columns behind the advanced history / export items, so list queries never load results_data
+HISTORY_ITEM_COLUMNS = (
+    SearchHistory.id,
+    SearchHistory.query,
+    SearchHistory.search_type,
+    SearchHistory.results_count,
+    SearchHistory.risk_level,
+    SearchHistory.relevance_score,
+    SearchHistory.created_at,
+    SearchHistory.data_source,
+    SearchHistory.execution_time_ms,
+    SearchHistory.notes
+)
+
 class AdvancedSearchHistoryService:
     """Advanced service for search history management and analytics"""
     
@@ -40,7 +154,9 @@ class AdvancedSearchHistoryService:
         min_results: int = None,
         max_results: int = None,
         sort_by: str = "created_at",
-        sort_order: str = "desc"
+        sort_order: str = "desc",
+        before_created_at: datetime = None,
+        before_id: int = None
     ) -> Dict[str, Any]:
         """
         Get search history with comprehensive filtering and sorting options
@@ -61,6 +177,8 @@ class AdvancedSearchHistoryService:
             max_results: Maximum number of results
             sort_by: Field to sort by
             sort_order: Sort order (asc/desc)
+            before_created_at: Keyset cursor (with before_id) from next_cursor; replaces offset when sorting by created_at
+            before_id: Keyset cursor tiebreaker
             
         Returns:
             Dict containing search history with pagination info
@@ -95,45 +213,60 @@ class AdvancedSearchHistoryService:
                 query = query.filter(SearchHistory.results_count <= max_results)
             
             if has_notes is not None:
-                if has_notes:
-                    query = query.join(SearchNote).distinct()
-                else:
-                    query = query.outerjoin(SearchNote).filter(SearchNote.id.is_(None))
+                notes_exist = exists().where(SearchNote.search_history_id == SearchHistory.id)
+                query = query.filter(notes_exist if has_notes else ~notes_exist)
             
             if has_starred is not None:
-                if has_starred:
-                    query = query.join(StarredEntity).distinct()
-                else:
-                    query = query.outerjoin(StarredEntity).filter(StarredEntity.id.is_(None))
+                starred_exist = exists().where(StarredEntity.search_history_id == SearchHistory.id)
+                query = query.filter(starred_exist if has_starred else ~starred_exist)
             
             # Get total count before applying limit/offset
             total = query.count()
             
-            # Apply sorting
+            # Apply sorting; id breaks ties so pages never overlap or skip rows
             sort_column = getattr(SearchHistory, sort_by, SearchHistory.created_at)
-            if sort_order.lower() == "desc":
-                query = query.order_by(desc(sort_column))
+            direction = desc if sort_order.lower() == "desc" else asc
+            use_cursor = sort_column is SearchHistory.created_at and before_created_at is not None and before_id is not None
+            if use_cursor:
+                # Keyset page: seek past the last row the client has seen instead of scanning offset rows
+                cursor_key = tuple_(SearchHistory.created_at, SearchHistory.id)
+                cursor = tuple_(before_created_at, before_id)
+                query = query.filter(cursor_key < cursor if direction is desc else cursor_key > cursor)
             else:
-                query = query.order_by(asc(sort_column))
-            
-            # Apply pagination
-            searches = query.offset(offset).limit(limit).all()
+                if offset and sort_column is SearchHistory.created_at:
+                    # Legacy offset paging: Postgres still reads and discards every skipped row
+                    logger.warning(f"Offset pagination (offset={offset}) on search history for user {user_id}; clients should page with next_cursor")
+                query = query.offset(offset)
+            
+            # Sort and paginate search_history alone (WITH page), then count notes/starred for the page rows only
+            # Only the listed columns are selected and rows come back as plain tuples, not ORM instances
+            page = query.with_entities(*HISTORY_ITEM_COLUMNS, sort_column.label("sort_key"))\
+                .order_by(direction(sort_column), direction(SearchHistory.id)).limit(limit).cte("page")
+            # One grouped aggregate per table over the page IDs, left-joined onto the page
+            page_ids = self.db.query(page.c.id)
+            notes_counts = self.db.query(
+                SearchNote.search_history_id,
+                func.count(SearchNote.id).label("count")
+            ).filter(SearchNote.search_history_id.in_(page_ids)).group_by(SearchNote.search_history_id).subquery()
+            starred_counts = self.db.query(
+                StarredEntity.search_history_id,
+                func.count(StarredEntity.id).label("count")
+            ).filter(StarredEntity.search_history_id.in_(page_ids)).group_by(StarredEntity.search_history_id).subquery()
+            searches = self.db.query(
+                *(page.c[column.key] for column in HISTORY_ITEM_COLUMNS),
+                func.coalesce(notes_counts.c.count, 0).label("notes_count"),
+                func.coalesce(starred_counts.c.count, 0).label("starred_count")
+            ).select_from(page)\
+                .outerjoin(notes_counts, notes_counts.c.search_history_id == page.c.id)\
+                .outerjoin(starred_counts, starred_counts.c.search_history_id == page.c.id)\
+                .order_by(direction(page.c.sort_key), direction(page.c.id)).all()
             
             # Enhanced search history items with additional metadata
+            now = datetime.utcnow()
             items = []
             for search in searches:
-                # Get notes count
-                notes_count = self.db.query(SearchNote).filter(
-                    SearchNote.search_history_id == search.id
-                ).count()
-                
-                # Get starred entities count
-                starred_count = self.db.query(StarredEntity).filter(
-                    StarredEntity.search_history_id == search.id
-                ).count()
-                
                 # Calculate days since search
-                days_since = (datetime.utcnow() - search.created_at).days
+                days_since = (now - search.created_at).days
                 
                 item = {
                     "id": search.id,
@@ -145,11 +278,11 @@ class AdvancedSearchHistoryService:
                     "created_at": search.created_at.isoformat(),
                     "data_source": search.data_source,
                     "execution_time_ms": search.execution_time_ms,
-                    "notes_count": notes_count,
-                    "starred_count": starred_count,
+                    "notes_count": search.notes_count,
+                    "starred_count": search.starred_count,
                     "days_since": days_since,
-                    "has_notes": notes_count > 0,
-                    "has_starred": starred_count > 0,
+                    "has_notes": search.notes_count > 0,
+                    "has_starred": search.starred_count > 0,
                     "notes": search.notes
                 }
                 items.append(item)
@@ -161,6 +294,10 @@ class AdvancedSearchHistoryService:
                 "pages": (total + limit - 1) // limit,
                 "limit": limit,
                 "offset": offset,
+                "next_cursor": {
+                    "before_created_at": items[-1]["created_at"],
+                    "before_id": items[-1]["id"]
+                } if sort_column is SearchHistory.created_at and len(items) == limit else None,
                 "filters_applied": {
                     "query_filter": query_filter,
                     "date_from": date_from.isoformat() if date_from else None,
@@ -183,6 +320,68 @@ class AdvancedSearchHistoryService:
             logger.error(f"Error getting filtered search history: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Failed to retrieve search history: {str(e)}")
     
+    def count_search_history(self, user_id: int, date_from: datetime = None) -> int:
+        """Count a user's searches, optionally only those since date_from"""
+        query = self.db.query(func.count(SearchHistory.id)).filter(SearchHistory.user_id == user_id)
+        if date_from:
+            query = query.filter(SearchHistory.created_at >= date_from)
+        return query.scalar()
+    
+    def iter_search_history_export(
+        self,
+        user_id: int,
+        date_from: datetime = None,
+        batch_size: int = 500
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a user's search history (newest first) for export
+        
+        Rows are fetched batch_size at a time from a server-side cursor, with note and
+        starred counts computed in the same query, so memory stays flat for any history size.
+        
+        Args:
+            user_id: User ID to export
+            date_from: Only export searches from this date
+            batch_size: Rows fetched per cursor round trip
+            
+        Yields:
+            Search history items in the get_search_history_with_filters item format
+        """
+        notes_count = self.db.query(func.count(SearchNote.id))\
+            .filter(SearchNote.search_history_id == SearchHistory.id)\
+            .correlate(SearchHistory).scalar_subquery()
+        starred_count = self.db.query(func.count(StarredEntity.id))\
+            .filter(StarredEntity.search_history_id == SearchHistory.id)\
+            .correlate(SearchHistory).scalar_subquery()
+        
+        query = self.db.query(
+            *HISTORY_ITEM_COLUMNS,
+            notes_count.label("notes_count"),
+            starred_count.label("starred_count")
+        ).filter(SearchHistory.user_id == user_id)
+        if date_from:
+            query = query.filter(SearchHistory.created_at >= date_from)
+        
+        now = datetime.utcnow()
+        for search in query.order_by(SearchHistory.created_at.desc()).yield_per(batch_size):
+            yield {
+                "id": search.id,
+                "query": search.query,
+                "search_type": search.search_type,
+                "results_count": search.results_count,
+                "risk_level": search.risk_level,
+                "relevance_score": search.relevance_score,
+                "created_at": search.created_at.isoformat(),
+                "data_source": search.data_source,
+                "execution_time_ms": search.execution_time_ms,
+                "notes_count": search.notes_count,
+                "starred_count": search.starred_count,
+                "days_since": (now - search.created_at).days,
+                "has_notes": search.notes_count > 0,
+                "has_starred": search.starred_count > 0,
+                "notes": search.notes
+            }
+    
     def get_search_analytics(
         self,
         user_id: int,
@@ -350,27 +549,46 @@ class AdvancedSearchHistoryService:
             List of similar search history items
         """
         try:
-            # Simple similarity search using LIKE and trigram similarity (if available)
-            query_words = query.lower().split()
-            
-            # Build OR conditions for each word in the query
-            conditions = []
-            for word in query_words:
-                if len(word) > 2:  # Only search for words longer than 2 characters
-                    conditions.append(SearchHistory.query.ilike(f"%{word}%"))
-            
-            if not conditions:
-                return []
-            
-            similar_searches = self.db.query(SearchHistory).filter(
+            # A ratio of at least the cutoff needs the lengths within this band (edit distance >= length difference)
+            cutoff = SIMILARITY_SCORE_CUTOFF / 100
+            min_length = int(len(query) * cutoff / (2 - cutoff))
+            max_length = int(len(query) * (2 - cutoff) / cutoff) + 1
+            
+            # Trigram index lookup narrows the user's history to the closest candidates,
+            # which are then scored in C (rapidfuzz)
+            candidates = self.db.query(SearchHistory.id, SearchHistory.query).filter(
                 SearchHistory.user_id == user_id,
-                or_(*conditions),
+                SearchHistory.query.op("%")(query),
+                func.length(SearchHistory.query).between(min_length, max_length),
                 SearchHistory.query != query  # Exclude exact match
-            ).order_by(SearchHistory.created_at.desc()).limit(limit).all()
+            ).order_by(
+                func.similarity(SearchHistory.query, query).desc()
+            ).limit(SIMILARITY_CANDIDATE_LIMIT).all()
+            
+            matches = process.extract(
+                query,
+                {search_id: search_query for search_id, search_query in candidates},
+                scorer=fuzz.ratio,
+                limit=limit,
+                score_cutoff=SIMILARITY_SCORE_CUTOFF
+            )
+            if not matches:
+                return []
             
-            # Format results
+            scores = {search_id: score for _, score, search_id in matches}
+            similar_searches = self.db.query(
+                SearchHistory.id,
+                SearchHistory.query,
+                SearchHistory.search_type,
+                SearchHistory.results_count,
+                SearchHistory.risk_level,
+                SearchHistory.created_at,
+                SearchHistory.data_source
+            ).filter(SearchHistory.id.in_(scores)).all()
+            
+            # Format results, best match first
             results = []
-            for search in similar_searches:
+            for search in sorted(similar_searches, key=lambda search: scores[search.id], reverse=True):
                 results.append({
                     "id": search.id,
                     "query": search.query,
@@ -378,7 +596,8 @@ class AdvancedSearchHistoryService:
                     "results_count": search.results_count,
                     "risk_level": search.risk_level,
                     "created_at": search.created_at.isoformat(),
-                    "data_source": search.data_source
+                    "data_source": search.data_source,
+                    "similarity_score": round(scores[search.id], 1)
                 })
             
             return results
@@ -441,18 +660,21 @@ class AdvancedSearchHistoryService:
             Dict with deletion results
         """
         try:
-            deleted_count = 0
-            failed_ids = []
+            # One DELETE for every ID, scoped to the user's own rows; the ON DELETE CASCADE
+            # foreign keys remove notes and starred entities in the same statement
+            deleted_ids = set(self.db.execute(
+                delete(SearchHistory)
+                .where(SearchHistory.user_id == user_id, SearchHistory.id.in_(search_history_ids))
+                .returning(SearchHistory.id)
+                .execution_options(synchronize_session=False)
+            ).scalars())
+            self.db.commit()
             
-            for search_id in search_history_ids:
-                try:
-                    if self.delete_search_history(user_id, search_id):
-                        deleted_count += 1
-                except:
-                    failed_ids.append(search_id)
+            failed_ids = [search_id for search_id in search_history_ids if search_id not in deleted_ids]
+            logger.info(f"Bulk deleted {len(deleted_ids)} search history items for user {user_id}")
             
             return {
-                "deleted_count": deleted_count,
+                "deleted_count": len(deleted_ids),
                 "total_requested": len(search_history_ids),
                 "failed_ids": failed_ids,
                 "success": len(failed_ids) == 0
@@ -460,6 +682,7 @@ class AdvancedSearchHistoryService:
             
         except Exception as e:
             logger.error(f"Error in bulk delete: {str(e)}")
+            self.db.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to bulk delete: {str(e)}")
 
 # Service factory function
@@ -10,6 +10,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__)))
 from app.database import SessionLocal
 from app.models.user import User
 from app.core.auth import verify_password, get_password_hash
+from app.core.config import setup_logging
 
 def debug_admin_login():
     """Debug admin login credentials"""
@@ -92,4 +93,5 @@ def debug_admin_login():
         db.close()
 
 if __name__ == "__main__":
+    setup_logging()
     debug_admin_login()
\ No newline at end of file
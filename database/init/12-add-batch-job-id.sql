@@ -0,0 +1,14 @@
+-- Add indexed job_id column to search_history for batch result lookups
+-- 12-add-batch-job-id.sql
+
+ALTER TABLE search_history ADD COLUMN IF NOT EXISTS job_id VARCHAR(64);
+
+-- Backfill existing batch rows (data_source is stored as 'batch_<job_id>')
+UPDATE search_history
+SET job_id = substring(data_source FROM 7)
+WHERE job_id IS NULL AND search_type = 'Batch' AND data_source LIKE 'batch\_%';
+
+-- Only batch searches carry a job_id
+CREATE INDEX IF NOT EXISTS idx_search_history_job_id ON search_history(job_id) WHERE job_id IS NOT NULL;
+
+COMMENT ON COLUMN search_history.job_id IS 'Batch screening job identifier (NULL for interactive searches)';
@@ -0,0 +1,9 @@
+-- Indexes backing the per-user aggregates in /search/analytics
+-- 13-add-search-history-analytics-indexes.sql
+
+-- Recent activity: per-user range scan on created_at
+CREATE INDEX IF NOT EXISTS idx_search_history_user_created_at ON search_history(user_id, created_at DESC);
+
+-- Risk/source distribution and top queries: index-only group-bys per user
+CREATE INDEX IF NOT EXISTS idx_search_history_user_risk_source ON search_history(user_id, risk_level, data_source);
+CREATE INDEX IF NOT EXISTS idx_search_history_user_query ON search_history(user_id, query, created_at);
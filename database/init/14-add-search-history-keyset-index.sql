@@ -0,0 +1,8 @@
+-- Composite index for keyset pagination of /search/history
+-- 14-add-search-history-keyset-index.sql
+
+-- Pages are ordered by (created_at DESC, id DESC) per user and seek past the previous page's last row
+CREATE INDEX IF NOT EXISTS idx_search_history_user_created_at_id ON search_history(user_id, created_at DESC, id DESC);
+
+-- Superseded by the index above
+DROP INDEX IF EXISTS idx_search_history_user_created_at;
@@ -0,0 +1,9 @@
+-- Compress stored search results with lz4 instead of the default pglz
+-- 15-compress-search-results-lz4.sql
+
+-- results_data holds the full enriched result set of each search and dominates row size.
+-- lz4 (PostgreSQL 14+) compresses and decompresses these TOASTed JSONB values much faster than pglz;
+-- it applies to values written from now on, existing rows keep pglz until rewritten.
+ALTER TABLE search_history ALTER COLUMN results_data SET COMPRESSION lz4;
+
+COMMENT ON COLUMN search_history.results_data IS 'Full search results (JSONB, lz4-compressed TOAST); batch searches store a reference to the gzip results artifact';
@@ -0,0 +1,12 @@
+-- Composite indexes for per-user history summaries and audit trails
+-- 16-add-history-and-audit-composite-indexes.sql
+
+-- High-risk search counts per user (search history summary)
+CREATE INDEX IF NOT EXISTS idx_search_history_user_high_risk ON search_history(user_id) WHERE risk_level = 'HIGH';
+
+-- Per-user audit trail, newest first
+CREATE INDEX IF NOT EXISTS idx_audit_logs_user_timestamp ON audit_logs(user_id, timestamp DESC);
+
+-- Single-column user indexes are covered by the leading column of the composites above and in 13/14
+DROP INDEX IF EXISTS idx_search_history_user_id;
+DROP INDEX IF EXISTS idx_audit_logs_user_id;
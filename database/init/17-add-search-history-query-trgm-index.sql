@@ -0,0 +1,7 @@
+-- Trigram index for similar-search candidate lookup
+-- 17-add-search-history-query-trgm-index.sql
+
+CREATE EXTENSION IF NOT EXISTS "pg_trgm";
+
+-- Serves "query % :q" so /similar only scores trigram-close candidates
+CREATE INDEX IF NOT EXISTS idx_search_history_query_trgm ON search_history USING gin (query gin_trgm_ops);
@@ -0,0 +1,12 @@
+-- Composite indexes for loading notes and starred entities per search
+-- 18-add-notes-and-starred-composite-indexes.sql
+
+-- Notes for a search (optionally one entity of it): WHERE search_history_id IN (...) [AND entity_id = ...]
+CREATE INDEX IF NOT EXISTS idx_search_notes_search_history_entity ON search_notes(search_history_id, entity_id);
+
+-- Starred entities for a search and user
+CREATE INDEX IF NOT EXISTS idx_starred_entities_search_history_user ON starred_entities(search_history_id, user_id);
+
+-- Single-column search_history_id indexes are covered by the leading column of the composites above
+DROP INDEX IF EXISTS idx_search_notes_search_history_id;
+DROP INDEX IF EXISTS idx_starred_entities_search_history_id;
@@ -0,0 +1,9 @@
+-- Store the remaining JSON columns as JSONB
+-- 19-convert-data-source-json-to-jsonb.sql
+
+-- Every other JSON column is already JSONB; JSONB is stored parsed and supports containment operators and GIN indexes
+ALTER TABLE data_sources ALTER COLUMN headers TYPE JSONB USING headers::jsonb;
+ALTER TABLE data_source_sync_logs ALTER COLUMN metadata TYPE JSONB USING metadata::jsonb;
+ALTER TABLE entity_sources
+    ALTER COLUMN raw_data TYPE JSONB USING raw_data::jsonb,
+    ALTER COLUMN normalized_data TYPE JSONB USING normalized_data::jsonb;
@@ -0,0 +1,15 @@
+-- Partial indexes for the active/current row filters
+-- 20-add-active-and-current-partial-indexes.sql
+
+-- Only the "true" rows are queried; indexing just those keeps the indexes small
+CREATE INDEX IF NOT EXISTS idx_entity_directors_entity_active ON entity_directors(entity_id) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_entity_lbc_contacts_entity_primary_active ON entity_lbc_contacts(entity_id, is_primary_contact) WHERE is_active;
+
+-- Current risk score per entity, newest first
+CREATE INDEX IF NOT EXISTS idx_risk_scores_entity_current ON risk_scores(entity_id, scoring_date DESC) WHERE is_current;
+
+-- Whole-column boolean indexes are superseded by the partial indexes above
+DROP INDEX IF EXISTS idx_entity_directors_is_active;
+DROP INDEX IF EXISTS idx_entity_lbc_contacts_is_active;
+DROP INDEX IF EXISTS idx_entity_lbc_contacts_is_primary;
+DROP INDEX IF EXISTS idx_risk_scores_is_current;
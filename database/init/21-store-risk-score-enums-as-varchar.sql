@@ -0,0 +1,27 @@
+-- Store the risk score vocabularies as VARCHAR + CHECK instead of native ENUM types
+-- 21-store-risk-score-enums-as-varchar.sql
+
+-- Adding a value to a CHECK is a constraint swap; a native ENUM needs ALTER TYPE
+ALTER TABLE risk_scores
+    ALTER COLUMN score_type TYPE VARCHAR(32) USING score_type::text,
+    ALTER COLUMN risk_level TYPE VARCHAR(32) USING risk_level::text,
+    ALTER COLUMN status DROP DEFAULT,
+    ALTER COLUMN status TYPE VARCHAR(32) USING status::text,
+    ALTER COLUMN status SET DEFAULT 'draft';
+
+ALTER TABLE risk_scores DROP CONSTRAINT IF EXISTS ck_risk_scores_score_type;
+ALTER TABLE risk_scores ADD CONSTRAINT ck_risk_scores_score_type
+    CHECK (score_type IN ('inherent_risk', 'risk_management_device', 'net_risk'));
+
+ALTER TABLE risk_scores DROP CONSTRAINT IF EXISTS ck_risk_scores_risk_level;
+ALTER TABLE risk_scores ADD CONSTRAINT ck_risk_scores_risk_level
+    CHECK (risk_level IN ('low', 'medium', 'high', 'critical'));
+
+ALTER TABLE risk_scores DROP CONSTRAINT IF EXISTS ck_risk_scores_status;
+ALTER TABLE risk_scores ADD CONSTRAINT ck_risk_scores_status
+    CHECK (status IN ('draft', 'pending_review', 'approved', 'rejected', 'archived'));
+
+-- risk_scores was the only user of these types
+DROP TYPE IF EXISTS score_type;
+DROP TYPE IF EXISTS risk_level;
+DROP TYPE IF EXISTS score_status;
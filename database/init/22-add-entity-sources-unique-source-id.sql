@@ -0,0 +1,15 @@
+-- One entity_sources row per source record, so syncs can upsert instead of SELECT-then-INSERT/UPDATE
+-- 22-add-entity-sources-unique-source-id.sql
+
+-- Keep the newest row of any existing duplicates
+DELETE FROM entity_sources older
+USING entity_sources newer
+WHERE older.data_source_id = newer.data_source_id
+  AND older.source_entity_id = newer.source_entity_id
+  AND older.id < newer.id;
+
+ALTER TABLE entity_sources DROP CONSTRAINT IF EXISTS uq_entity_source_src;
+ALTER TABLE entity_sources ADD CONSTRAINT uq_entity_source_src UNIQUE (data_source_id, source_entity_id);
+
+-- The unique index leads with data_source_id, so the single-column index is redundant
+DROP INDEX IF EXISTS idx_entity_sources_data_source;
@@ -0,0 +1,13 @@
+-- Compressed batch screening results, kept in the database next to their search
+-- 23-add-batch-result-artifacts.sql
+
+-- One gzip-compressed JSON export document per batch search; deleted with the search
+CREATE TABLE IF NOT EXISTS batch_result_artifacts (
+    search_history_id INTEGER PRIMARY KEY REFERENCES search_history(id) ON DELETE CASCADE,
+    data BYTEA NOT NULL,
+    size INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Already gzip-compressed, so skip TOAST compression
+ALTER TABLE batch_result_artifacts ALTER COLUMN data SET STORAGE EXTERNAL;
@@ -0,0 +1,39 @@
+-- Default naive TIMESTAMP columns to UTC wall-clock time instead of the session time zone
+-- 24-use-utc-timestamp-defaults.sql
+
+-- TIMESTAMPTZ columns (users, search_history, search_notes, starred_entities) keep NOW(),
+-- which already stores an absolute instant
+ALTER TABLE audit_logs ALTER COLUMN timestamp SET DEFAULT timezone('utc', now());
+
+ALTER TABLE supervised_entities ALTER COLUMN created_at SET DEFAULT timezone('utc', now());
+ALTER TABLE supervised_entities ALTER COLUMN updated_at SET DEFAULT timezone('utc', now());
+ALTER TABLE entity_directors ALTER COLUMN created_at SET DEFAULT timezone('utc', now());
+ALTER TABLE entity_directors ALTER COLUMN updated_at SET DEFAULT timezone('utc', now());
+ALTER TABLE entity_lbc_contacts ALTER COLUMN created_at SET DEFAULT timezone('utc', now());
+ALTER TABLE entity_lbc_contacts ALTER COLUMN updated_at SET DEFAULT timezone('utc', now());
+
+ALTER TABLE risk_scores ALTER COLUMN scoring_date SET DEFAULT timezone('utc', now());
+ALTER TABLE risk_scores ALTER COLUMN created_at SET DEFAULT timezone('utc', now());
+ALTER TABLE risk_scores ALTER COLUMN updated_at SET DEFAULT timezone('utc', now());
+ALTER TABLE scoring_domains ALTER COLUMN created_at SET DEFAULT timezone('utc', now());
+ALTER TABLE scoring_domains ALTER COLUMN updated_at SET DEFAULT timezone('utc', now());
+ALTER TABLE scoring_domain_analyses ALTER COLUMN analysis_date SET DEFAULT timezone('utc', now());
+ALTER TABLE scoring_domain_analyses ALTER COLUMN created_at SET DEFAULT timezone('utc', now());
+ALTER TABLE scoring_domain_analyses ALTER COLUMN updated_at SET DEFAULT timezone('utc', now());
+
+ALTER TABLE data_sources ALTER COLUMN created_at SET DEFAULT timezone('utc', now());
+ALTER TABLE data_sources ALTER COLUMN updated_at SET DEFAULT timezone('utc', now());
+ALTER TABLE entity_sources ALTER COLUMN first_seen SET DEFAULT timezone('utc', now());
+ALTER TABLE entity_sources ALTER COLUMN last_seen SET DEFAULT timezone('utc', now());
+ALTER TABLE entity_sources ALTER COLUMN last_modified SET DEFAULT timezone('utc', now());
+
+ALTER TABLE batch_result_artifacts ALTER COLUMN created_at SET DEFAULT timezone('utc', now());
+
+-- Shared updated_at trigger for the tables above
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = timezone('utc', now());
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
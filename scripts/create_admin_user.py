@@ -15,6 +15,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 from app.database import SessionLocal
 from app.models.user import User
 from app.core.auth import get_password_hash
+from app.core.config import setup_logging
 
 def create_admin_user():
     """Create or update admin user with proper credentials"""
@@ -69,4 +70,5 @@ def create_admin_user():
         db.close()
 
 if __name__ == "__main__":
+    setup_logging()
     create_admin_user()
\ No newline at end of file